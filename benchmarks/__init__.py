@@ -0,0 +1,36 @@
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+"""
+Benchmarks of texplot.
+
+The modules ``suite_*.py`` are benchmarks for airspeed velocity (asv),
+configured by ``asv.conf.json`` in the root directory. To record a baseline
+for the current commit and compare a change against the ``main`` branch:
+
+.. code-block:: bash
+
+    pip install asv
+    asv machine --yes
+    asv run main^!
+    asv continuous --factor 1.2 main HEAD
+
+The last command fails if any benchmark is slower by more than 20%. The
+results of each commit are stored locally in ``.asv/results``, and
+``asv publish`` renders them as a website.
+
+The benchmark workflow of the pull requests does not keep baselines between
+runs, since the timings of different CI machines are not comparable.
+Instead, it benchmarks ``main`` and the pull request on the same machine in
+each run, and uploads the results as an artifact of the run.
+
+Where an optimization has a slower alternative, such as ``plt.subplots``
+against ``texplot.subplots``, or ``decimate=False`` against
+``decimate=True``, both are parameters of the same benchmark, so that they
+can be compared within a run.
+"""
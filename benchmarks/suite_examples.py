@@ -0,0 +1,132 @@
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib
+import matplotlib.pyplot as plt
+import texplot
+from texplot.examples import plot_function, plot_lorenz, \
+    plot_bifurcation_diagram
+from texplot.examples.plot_lorenz import _solve_ivp, _lorenz, \
+    _solve_ivp_numpy, _lorenz_numpy
+import numpy
+import os
+import shutil
+import tempfile
+
+matplotlib.use('agg')
+
+
+# ==============
+# example figure
+# ==============
+
+class _ExampleFigure(object):
+    """
+    Creates a figure with the theme before each benchmark, and closes it
+    after.
+    """
+
+    def setup(self, *params):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False)
+        self.theme.__enter__()
+        self.fig, self.ax = plt.subplots()
+
+    def teardown(self, *params):
+        plt.close(self.fig)
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# ============
+# PlotFunction
+# ============
+
+class PlotFunction(_ExampleFigure):
+    """
+    Benchmarks of the function example.
+    """
+
+    def time_plot(self):
+        plot_function(self.ax)
+
+    def time_plot_and_save(self):
+        plot_function(self.ax)
+        texplot.save_plot(plt, os.path.join(self.directory, 'function'))
+
+
+# ==========
+# PlotLorenz
+# ==========
+
+class PlotLorenz(_ExampleFigure):
+    """
+    Benchmarks of the Lorenz attractor example with each ODE solver.
+    """
+
+    params = ['python', 'numpy']
+    param_names = ['solver']
+
+    def time_plot(self, solver):
+        plot_lorenz(self.ax, solver=solver)
+
+
+# ===========
+# SolveLorenz
+# ===========
+
+class SolveLorenz(object):
+    """
+    Benchmarks of the RK45 solvers of the Lorenz system for a batch of
+    initial conditions. The Python solver solves them one by one.
+    """
+
+    params = [[1, 16], ['python', 'numpy']]
+    param_names = ['batch_size', 'solver']
+    timeout = 300
+
+    def setup(self, batch_size, solver):
+        rng = numpy.random.RandomState(0)
+        self.y0 = 1.0 + rng.uniform(-1, 1, size=(batch_size, 3))
+
+    def time_solve(self, batch_size, solver):
+        if solver == 'numpy':
+            _solve_ivp_numpy(_lorenz_numpy, [0, 10], self.y0)
+        else:
+            for y0 in self.y0:
+                _solve_ivp(_lorenz, [0, 10], list(y0))
+
+
+# ======================
+# PlotBifurcationDiagram
+# ======================
+
+class PlotBifurcationDiagram(_ExampleFigure):
+    """
+    Benchmarks of the bifurcation diagram example at several numbers of
+    points, drawn as points or as a density image.
+    """
+
+    params = [[1000, 4000, 10000], [False, True]]
+    param_names = ['resolution', 'density']
+    timeout = 300
+
+    def time_plot(self, resolution, density):
+        plot_bifurcation_diagram(self.ax, resolution=resolution,
+                                 density=density)
+
+    def time_plot_and_save(self, resolution, density):
+        plot_bifurcation_diagram(self.ax, resolution=resolution,
+                                 density=density)
+        texplot.save_plot(plt, os.path.join(self.directory, 'bifurcation'),
+                          formats=['pdf', 'png'], rasterize=True)
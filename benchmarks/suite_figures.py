@@ -0,0 +1,124 @@
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib
+import matplotlib.pyplot as plt
+import texplot
+from texplot.examples import plot_function
+import numpy
+import os
+import shutil
+import tempfile
+
+matplotlib.use('agg')
+
+
+# ==========
+# FigurePool
+# ==========
+
+class FigurePool(object):
+    """
+    Benchmarks of creating and closing figures with ``plt.subplots``, and
+    with the pool of ``texplot.subplots``.
+    """
+
+    params = ['plt.subplots', 'texplot.subplots']
+    param_names = ['method']
+
+    def setup(self, method):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False)
+        self.theme.__enter__()
+
+        # The pool holds an idle figure
+        texplot.reset_figure_pool()
+        fig, _ = texplot.subplots()
+        texplot.release_figure(fig)
+
+    def teardown(self, method):
+        texplot.reset_figure_pool()
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _subplots(self, method):
+        if method == 'plt.subplots':
+            return plt.subplots()
+        else:
+            return texplot.subplots()
+
+    def _close(self, method, fig):
+        if method == 'plt.subplots':
+            plt.close(fig)
+        else:
+            texplot.release_figure(fig)
+
+    def time_create_close(self, method):
+        fig, ax = self._subplots(method)
+        self._close(method, fig)
+
+    def time_plot_save_close(self, method):
+        fig, ax = self._subplots(method)
+        plot_function(ax)
+        texplot.save_plot(plt, os.path.join(self.directory, 'function.png'),
+                          dpi=100)
+        self._close(method, fig)
+
+
+# ===============
+# FigureLifecycle
+# ===============
+
+class FigureLifecycle(object):
+    """
+    Benchmarks of the memory that is retained after saving many figures,
+    when they are left open, and when ``save_plot`` closes them.
+    """
+
+    params = [False, True]
+    param_names = ['close']
+    num_plots = 50
+
+    def setup(self, close):
+        self.directory = tempfile.mkdtemp()
+
+        # Leaving the figures open is the leak to be measured
+        self.theme = texplot.theme(use_latex=False,
+                                   rc={'figure.max_open_warning': 0})
+        self.theme.__enter__()
+
+        plt.close('all')
+        texplot.reset_figure_info()
+
+    def teardown(self, close):
+        plt.close('all')
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _save_figures(self, close):
+        x = numpy.linspace(0, 1, 10000)
+        filename = os.path.join(self.directory, 'plot.png')
+
+        for i in range(self.num_plots):
+            fig, ax = plt.subplots()
+            ax.plot(x, numpy.sin(i * x))
+            texplot.save_plot(plt, filename, dpi=50, close=close)
+
+    def track_retained_memory(self, close):
+        self._save_figures(close)
+        return texplot.get_figure_info()['memory']
+
+    track_retained_memory.unit = 'bytes'
+
+    def peakmem_save_figures(self, close):
+        self._save_figures(close)
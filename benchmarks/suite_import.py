@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import sys
+
+# The texplot import time is measured in a new interpreter with asv's
+# timeraw benchmarks, which are not affected by the modules imported here.
+
+
+# ==============
+# import texplot
+# ==============
+
+def timeraw_import_texplot():
+    """
+    Import time of texplot, which should not import pyplot.
+    """
+
+    return 'import texplot'
+
+
+# =======================
+# import texplot examples
+# =======================
+
+def timeraw_import_texplot_examples():
+    """
+    Import time of texplot and its examples.
+    """
+
+    return 'import texplot.examples'
+
+
+# ===================
+# track pyplot import
+# ===================
+
+def track_pyplot_imported():
+    """
+    Whether importing texplot imports pyplot, which should be zero.
+    """
+
+    import subprocess
+
+    code = 'import sys, texplot; print(int("matplotlib.pyplot" in ' + \
+        'sys.modules))'
+    output = subprocess.check_output([sys.executable, '-c', code])
+
+    return int(output.strip())
+
+
+track_pyplot_imported.unit = 'imported'
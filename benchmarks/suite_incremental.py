@@ -0,0 +1,139 @@
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib
+import matplotlib.pyplot as plt
+import texplot
+from texplot.examples.plot_lorenz import _solve_ivp_numpy, _lorenz_numpy
+import numpy
+import os
+import shutil
+import tempfile
+
+matplotlib.use('agg')
+
+
+# ==========
+# AppendData
+# ==========
+
+class AppendData(object):
+    """
+    Benchmarks of appending points to a line that has many points, and
+    saving a png file, by setting the data of the line and saving the whole
+    figure, and by appending and drawing only the new points.
+    """
+
+    params = [[10**4, 10**5], ['set_data', 'append_data']]
+    param_names = ['num_points', 'method']
+
+    # Each sample starts from a line with num_points points
+    number = 1
+
+    def setup(self, num_points, method):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False)
+        self.theme.__enter__()
+
+        self.rng = numpy.random.default_rng(0)
+        self.fig, ax = plt.subplots()
+        self.line, = ax.plot([], [], color='k')
+        ax.set_xlim(0, 2 * num_points)
+        ax.set_ylim(-5, 5)
+
+        self.x = numpy.arange(num_points, dtype=float)
+        self.y = self.rng.standard_normal(num_points)
+        self.filename = os.path.join(self.directory, 'monitor.png')
+
+        if method == 'set_data':
+            self.line.set_data(self.x, self.y)
+            self.fig.savefig(self.filename)
+        else:
+            texplot.append_data(self.line, self.x, self.y)
+            texplot.draw_appended(self.fig, self.filename)
+
+    def teardown(self, num_points, method):
+        plt.close(self.fig)
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_append_and_save(self, num_points, method):
+        x = numpy.arange(num_points, num_points + 1000, dtype=float)
+        y = self.rng.standard_normal(x.size)
+
+        if method == 'set_data':
+            self.line.set_data(numpy.concatenate([self.x, x]),
+                               numpy.concatenate([self.y, y]))
+            self.fig.savefig(self.filename)
+        else:
+            texplot.append_data(self.line, x, y)
+            texplot.draw_appended(self.fig, self.filename)
+
+
+# ============
+# StreamFrames
+# ============
+
+class StreamFrames(object):
+    """
+    Benchmarks of writing the frames of the Lorenz trajectory as a png
+    sequence, by one ``save_plot`` call per frame, and by streaming the
+    frames of a single figure, either drawn in full or blitted.
+    """
+
+    params = ['save_plot', 'full', 'blit']
+    param_names = ['method']
+    num_frames = 20
+    timeout = 300
+
+    def setup(self, method):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False)
+        self.theme.__enter__()
+
+        self.t, y = _solve_ivp_numpy(_lorenz_numpy, [0, 30], [1, 1, 1])
+        self.y = y[:, 0]
+        self.ends = [(i + 1) * self.t.size // self.num_frames
+                     for i in range(self.num_frames)]
+
+    def teardown(self, method):
+        plt.close('all')
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _create_figure(self):
+        fig, ax = plt.subplots(figsize=(9, 3))
+        line, = ax.plot([], [], color='k')
+        ax.set_xlim(self.t[0], self.t[-1])
+        ax.set_ylim(self.y.min(), self.y.max())
+        return fig, line
+
+    def time_write_frames(self, method):
+        if method == 'save_plot':
+            for i, end in enumerate(self.ends):
+                fig, line = self._create_figure()
+                line.set_data(self.t[:end], self.y[:end])
+                filename = os.path.join(self.directory, 'save%05d.png' % i)
+                texplot.save_plot(plt, filename, dpi=100)
+                plt.close(fig)
+
+        else:
+            fig, line = self._create_figure()
+            artists = [line] if method == 'blit' else None
+            filename = os.path.join(self.directory, 'stream.png')
+            with texplot.stream_frames(fig, filename, artists=artists,
+                                       dpi=100) as write_frame:
+                for end in self.ends:
+                    line.set_data(self.t[:end], self.y[:end])
+                    write_frame()
+            plt.close(fig)
@@ -0,0 +1,181 @@
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib
+import matplotlib.pyplot as plt
+import texplot
+from texplot.examples import plot_function, plot_bifurcation_diagram
+import numpy
+import os
+import shutil
+import tempfile
+
+matplotlib.use('agg')
+
+
+# ========
+# SavePlot
+# ========
+
+class SavePlot(object):
+    """
+    Benchmarks of saving a figure in each file format, with and without the
+    tight bounding box.
+    """
+
+    params = [['svg', 'pdf', 'png'], ['tight', None]]
+    param_names = ['format', 'bbox_inches']
+
+    def setup(self, format, bbox_inches):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False)
+        self.theme.__enter__()
+        self.fig, ax = plt.subplots()
+        plot_function(ax)
+
+    def teardown(self, format, bbox_inches):
+        plt.close(self.fig)
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_save_plot(self, format, bbox_inches):
+        filename = os.path.join(self.directory, 'plot.' + format)
+        texplot.save_plot(plt, filename, bbox_inches=bbox_inches)
+
+    def peakmem_save_plot(self, format, bbox_inches):
+        filename = os.path.join(self.directory, 'plot.' + format)
+        texplot.save_plot(plt, filename, bbox_inches=bbox_inches)
+
+
+# =============
+# SavePlotMulti
+# =============
+
+class SavePlotMulti(object):
+    """
+    Benchmarks of saving a figure in several formats and dots per inch with
+    a single call.
+    """
+
+    def setup(self):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False)
+        self.theme.__enter__()
+        self.fig, ax = plt.subplots()
+        plot_function(ax)
+
+    def teardown(self):
+        plt.close(self.fig)
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_savefig_formats(self):
+        # Each format recomputes the tight bounding box
+        for format in ['svg', 'pdf', 'png']:
+            plt.savefig(os.path.join(self.directory, 'plot.' + format),
+                        dpi=200, transparent=True, bbox_inches='tight',
+                        pad_inches=0.1)
+
+    def time_save_plot_formats(self):
+        texplot.save_plot(plt, os.path.join(self.directory, 'plot'),
+                          formats=['svg', 'pdf', 'png'])
+
+    def time_save_plot_formats_concurrent(self):
+        texplot.save_plot(plt, os.path.join(self.directory, 'plot'),
+                          formats=['svg', 'pdf', 'png'], workers=None)
+
+    def time_save_plot_dpis(self):
+        texplot.save_plot(plt, os.path.join(self.directory, 'plot.png'),
+                          dpi=[300, 150, 75])
+
+    def time_save_plot_dpis_separate(self):
+        for dpi in [300, 150, 75]:
+            texplot.save_plot(
+                plt, os.path.join(self.directory, 'plot%d.png' % dpi),
+                dpi=dpi)
+
+
+# =============
+# SavePlotDense
+# =============
+
+class SavePlotDense(object):
+    """
+    Benchmarks of saving a dense line in vector formats, with and without
+    decimation.
+    """
+
+    params = [[10**4, 10**5, 10**6], ['svg', 'pdf'], [False, True]]
+    param_names = ['size', 'format', 'decimate']
+    timeout = 300
+
+    def setup(self, size, format, decimate):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False)
+        self.theme.__enter__()
+        self.fig, ax = plt.subplots()
+        rng = numpy.random.RandomState(0)
+        x = numpy.linspace(0, 10, size)
+        ax.plot(x, numpy.sin(x**2) + 0.1 * rng.randn(size), lw=0.5)
+        self.filename = os.path.join(self.directory, 'plot.' + format)
+
+    def teardown(self, size, format, decimate):
+        plt.close(self.fig)
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_save_plot(self, size, format, decimate):
+        texplot.save_plot(plt, self.filename, decimate=decimate)
+
+    def track_file_size(self, size, format, decimate):
+        texplot.save_plot(plt, self.filename, decimate=decimate)
+        return os.path.getsize(self.filename)
+
+    track_file_size.unit = 'bytes'
+
+
+# =================
+# SavePlotRasterize
+# =================
+
+class SavePlotRasterize(object):
+    """
+    Benchmarks of saving the bifurcation diagram in vector formats, with and
+    without the rasterization policy.
+    """
+
+    params = [[1000, 4000], ['svg', 'pdf'], [None, True]]
+    param_names = ['resolution', 'format', 'rasterize']
+    timeout = 300
+
+    def setup(self, resolution, format, rasterize):
+        self.directory = tempfile.mkdtemp()
+        self.theme = texplot.theme(use_latex=False, style='dark_background')
+        self.theme.__enter__()
+        self.fig, ax = plt.subplots()
+        plot_bifurcation_diagram(ax, resolution=resolution)
+        self.filename = os.path.join(self.directory, 'plot.' + format)
+
+    def teardown(self, resolution, format, rasterize):
+        plt.close(self.fig)
+        self.theme.__exit__(None, None, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def time_save_plot(self, resolution, format, rasterize):
+        texplot.save_plot(plt, self.filename, rasterize=rasterize)
+
+    def track_file_size(self, resolution, format, rasterize):
+        texplot.save_plot(plt, self.filename, rasterize=rasterize)
+        return os.path.getsize(self.filename)
+
+    track_file_size.unit = 'bytes'
@@ -0,0 +1,52 @@
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import texplot
+
+
+# =====
+# Theme
+# =====
+
+class Theme(object):
+    """
+    Benchmarks of creating and applying themes.
+    """
+
+    params = [None, 'dark_background']
+    param_names = ['style']
+
+    def setup(self, style):
+        texplot.reset_theme()
+
+    def teardown(self, style):
+        texplot.reset_theme()
+
+    def time_get_theme(self, style):
+        texplot.get_theme(use_latex=False)
+
+    def time_get_theme_uncached(self, style):
+        texplot.reset_theme_cache()
+        texplot.get_theme(use_latex=False)
+
+    def time_set_theme(self, style):
+        texplot.set_theme(style=style, use_latex=False)
+
+    def time_theme_enter_exit(self, style):
+        with texplot.theme(style=style, use_latex=False):
+            pass
+
+    def time_theme_nested(self, style):
+        with texplot.theme(style=style, use_latex=False):
+            with texplot.theme(context='talk', style=style, use_latex=False):
+                pass
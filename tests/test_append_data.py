@@ -0,0 +1,150 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib.pyplot as plt
+import matplotlib.image
+import texplot
+import numpy
+import os
+import tempfile
+
+
+# ================
+# test append data
+# ================
+
+def test_append_data():
+    """
+    Test for `append_data` and `draw_appended` functions.
+    """
+
+    rng = numpy.random.default_rng(0)
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+        line, = ax.plot([], [], color='k')
+        ax.set_xlim(-10, 3010)
+        ax.set_ylim(-6, 6)
+
+        # The buffer grows beyond its initial capacity
+        filename = os.path.join(directory, 'monitor.png')
+        for i in range(3):
+            x = numpy.arange(1000 * i, 1000 * (i + 1))
+            texplot.append_data(line, x, rng.standard_normal(x.size))
+            info = texplot.draw_appended(fig, filename)
+            assert info['full'] == (i == 0)
+            assert info['points'] == 1000
+
+        x, y = line.get_data()
+        assert numpy.array_equal(x, numpy.arange(3000))
+
+        # Only the antialiased edges differ from drawing the whole figure
+        appended = matplotlib.image.imread(filename)
+        fig.canvas.draw()
+        drawn = numpy.asarray(fig.canvas.buffer_rgba()) / 255.0
+        assert appended.shape == drawn.shape
+        assert numpy.mean(numpy.abs(appended - drawn).max(axis=-1) > 0.25) \
+            < 0.001
+
+        # A draw by another function, or a change of the figure, draws it in
+        # full
+        assert texplot.draw_appended(fig)['full']
+
+        texplot.save_plot(plt, os.path.join(directory, 'monitor.svg'))
+        assert texplot.draw_appended(fig)['full']
+
+        ax.set_title('Monitor')
+        assert texplot.draw_appended(fig)['full']
+
+        # Nothing is drawn when nothing is appended
+        info = texplot.draw_appended(fig)
+        assert (info['full'], info['points']) == (False, 0)
+
+        plt.close(fig)
+
+        # Autoscaled axes are drawn in full when the limits change
+        fig, ax = plt.subplots()
+        line, = ax.plot([0], [0])
+        texplot.append_data(line, [1, 2], [1, 2])
+        texplot.draw_appended(fig)
+        assert ax.get_xlim()[1] >= 2
+
+        texplot.append_data(line, 1.5, 1.5)
+        assert not texplot.draw_appended(fig)['full']
+        texplot.append_data(line, 3, 3)
+        assert texplot.draw_appended(fig)['full']
+        assert ax.get_xlim()[1] >= 3
+
+        plt.close(fig)
+
+        # Appended points are autoscaled, and the tight bbox is recomputed,
+        # when the figure is drawn by another function
+        fig, ax = plt.subplots()
+        line, = ax.plot([0, 1, 2], [0, 1, 2])
+        bbox = texplot.get_tight_bbox(fig)
+        texplot.append_data(line, 3, 1000)
+        assert fig.stale
+        texplot.save_plot(plt, os.path.join(directory, 'appended.svg'))
+
+        new_fig, new_ax = plt.subplots()
+        new_ax.plot([0, 1, 2, 3], [0, 1, 2, 1000])
+        assert ax.get_ylim() == new_ax.get_ylim()
+        assert texplot.get_tight_bbox(fig).bounds == \
+            texplot.get_tight_bbox(new_fig).bounds
+        assert texplot.get_tight_bbox(fig).bounds != bbox.bounds
+        plt.close(new_fig)
+        plt.close(fig)
+
+        # Points are appended to the data that were set by set_data
+        fig, ax = plt.subplots()
+        line, = ax.plot([], [])
+        texplot.append_data(line, [0, 1], [0, 1])
+        texplot.draw_appended(fig)
+        line.set_data([5, 6, 7], [5, 6, 7])
+        texplot.append_data(line, 8, 8)
+        x, y = line.get_data()
+        assert numpy.array_equal(x, [5, 6, 7, 8])
+        assert numpy.array_equal(y, [5, 6, 7, 8])
+
+        info = texplot.draw_appended(fig)
+        assert info['full'] and (info['points'] == 4)
+        texplot.append_data(line, 7.5, 7.5)
+        info = texplot.draw_appended(fig)
+        assert (info['full'], info['points']) == (False, 1)
+        plt.close(fig)
+
+        try:
+            texplot.append_data(line, [0, 1], [0])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('Size error was not raised.')
+
+        try:
+            texplot.draw_appended(fig, 'monitor.pdf')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('"filename" error was not raised.')
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_append_data()
@@ -0,0 +1,94 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import texplot
+from texplot.examples import plot_function, plot_lorenz
+import os
+import tempfile
+
+
+# ==========
+# plot crash
+# ==========
+
+def plot_crash(ax):
+    """
+    Kills the worker process that plots the figure.
+    """
+
+    os._exit(1)
+
+
+# ==========
+# test batch
+# ==========
+
+def test_batch():
+    """
+    Test for `batch` function, both in worker processes and sequentially.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        for workers in [2, 1]:
+
+            filenames = [
+                os.path.join(directory, 'function%d.pdf' % workers),
+                os.path.join(directory, 'lorenz%d.svg' % workers),
+                os.path.join(directory, 'nonexistent', 'function.pdf')]
+
+            reports = texplot.batch(
+                [plot_function, plot_lorenz, plot_function], filenames,
+                font_scale=1.2, use_latex=False, save_kwargs={'dpi': 100},
+                tex_strings=[r'$\sin(x)$'], workers=workers, verbose=True)
+
+            assert len(reports) == len(filenames)
+
+            # The first two figures succeed
+            for report, filename in zip(reports[:2], filenames[:2]):
+                assert report['error'] is None
+                assert report['filename'] == filename
+                assert report['plot_time'] >= 0
+                assert report['save_time'] >= 0
+                assert os.path.isfile(filename)
+
+            # The last figure fails since its directory does not exist
+            assert reports[2]['error'] is not None
+            assert 'not writable' in reports[2]['error']
+
+        # A figure that kills its worker does not fail the other figures
+        plot_functions = [plot_function] * 5
+        plot_functions.insert(2, plot_crash)
+        filenames = [os.path.join(directory, 'crash%d.pdf' % i)
+                     for i in range(len(plot_functions))]
+
+        reports = texplot.batch(plot_functions, filenames, use_latex=False,
+                                save_kwargs={'dpi': 50}, workers=2)
+
+        for i, (report, filename) in enumerate(zip(reports, filenames)):
+            assert report['filename'] == filename
+            if plot_functions[i] is plot_crash:
+                assert 'BrokenProcessPool' in report['error']
+            else:
+                assert report['error'] is None
+                assert os.path.isfile(filename)
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_batch()
@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib.pyplot as plt
+import texplot
+import numpy
+import os
+import tempfile
+
+
+# =====================
+# test figure lifecycle
+# =====================
+
+def test_figure_lifecycle():
+    """
+    Test for closing the saved figures and `get_figure_info` function.
+    """
+
+    plt.close('all')
+    texplot.reset_figure_info()
+    texplot.reset_figure_pool()
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        filename = os.path.join(directory, 'plot.png')
+
+        # Only the saved figure is closed
+        other_fig, other_ax = plt.subplots()
+        for i in range(5):
+            fig, ax = plt.subplots()
+            ax.plot(numpy.arange(1000))
+            texplot.save_plot(plt, filename, dpi=50)
+            assert plt.fignum_exists(fig.number)
+
+            texplot.save_plot(plt, filename, dpi=50, close=True)
+            assert not plt.fignum_exists(fig.number)
+            assert plt.fignum_exists(other_fig.number)
+
+        plt.close(other_fig)
+
+        # Figures that are no longer referenced are freed
+        del fig, ax, other_fig, other_ax
+        info = texplot.get_figure_info()
+        assert info['open'] == 0
+        assert info['saved'] == 10
+        assert info['closed'] == 5
+        assert info['alive'] == 0
+        assert info['retained'] == 0
+        assert info['memory'] == 0
+
+        # A closed figure that is still referenced is retained
+        fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+        ax.plot(numpy.arange(10000.0))
+        texplot.show_or_save_plot(plt, filename, dpi=50)
+        assert not plt.fignum_exists(fig.number)
+
+        info = texplot.get_figure_info()
+        assert (info['open'] == 0) and (info['retained'] == 1)
+        assert info['memory'] >= 10000 * 8
+
+        # The figures of texplot.subplots are only closed, and freed, unless
+        # they are released explicitly
+        del fig, ax
+        fig, ax = texplot.subplots()
+        texplot.save_plot(plt, filename, dpi=50, close=True)
+        del fig, ax
+        info = texplot.get_figure_info()
+        assert (info['retained'] == 0) and (info['pooled'] == 0)
+        assert info['alive'] == 0
+
+        # Pooled figures are not retained
+        fig, ax = texplot.subplots()
+        texplot.save_plot(plt, filename, dpi=50)
+        assert texplot.release_figure(fig)
+        info = texplot.get_figure_info()
+        assert (info['retained'] == 0) and (info['pooled'] == 1)
+        assert info['alive'] == 1
+
+    texplot.reset_figure_pool()
+    texplot.reset_figure_info()
+    del fig, ax
+    assert texplot.get_figure_info()['alive'] == 0
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_figure_lifecycle()
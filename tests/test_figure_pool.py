@@ -0,0 +1,165 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib.pyplot as plt
+import matplotlib.image
+import texplot
+from texplot.examples import plot_function, plot_bifurcation_diagram
+import numpy
+import os
+import tempfile
+
+
+# =========
+# plot odd
+# =========
+
+def _plot_odd(ax):
+    """
+    Changes the properties of an axes that a pooled figure restores.
+    """
+
+    ax.plot([1, 2, 3], [3, 1, 2], label='line')
+    ax.set_title('Title')
+    ax.set_xlabel('x')
+    ax.set_xscale('log')
+    ax.set_xlim(3, 1)
+    ax.set_yticks([1, 2])
+    ax.grid(True)
+    ax.legend()
+
+
+# ================
+# test figure pool
+# ================
+
+def test_figure_pool():
+    """
+    Test for `subplots` and `release_figure` functions.
+    """
+
+    plot_functions = [
+        plot_function,
+        lambda ax: plot_bifurcation_diagram(ax, resolution=200),
+        _plot_odd,
+    ]
+
+    texplot.reset_figure_pool()
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        # A reused figure is drawn as a new figure, after any other plot
+        for i, previous in enumerate(plot_functions):
+            for j, plot in enumerate(plot_functions):
+                fig, ax = texplot.subplots(figsize=(4, 3), dpi=50)
+                previous(ax)
+                fig.savefig(os.path.join(directory, 'previous.png'))
+                assert texplot.release_figure(fig)
+
+                pooled_fig, ax = texplot.subplots(figsize=(4, 3), dpi=50)
+                assert pooled_fig is fig
+                assert plt.gcf() is fig
+                plot(ax)
+                pooled = os.path.join(directory, 'pooled.png')
+                texplot.save_plot(plt, pooled, bbox_inches=None)
+                texplot.release_figure(fig)
+
+                fig, ax = plt.subplots(figsize=(4, 3), dpi=50)
+                plot(ax)
+                new = os.path.join(directory, 'new.png')
+                texplot.save_plot(plt, new, bbox_inches=None)
+                plt.close(fig)
+
+                assert numpy.array_equal(matplotlib.image.imread(pooled),
+                                         matplotlib.image.imread(new))
+
+        info = texplot.get_figure_pool_info()
+        assert info['hits'] == 2 * len(plot_functions)**2 - 1
+        assert info['misses'] == 1
+        assert info['size'] == 1
+
+        # Figures with other arguments or themes are not reused
+        fig, ax = texplot.subplots(figsize=(4, 3), dpi=100)
+        assert texplot.get_figure_pool_info()['misses'] == 2
+        texplot.release_figure(fig)
+
+    with texplot.theme(use_latex=False, font_scale=2):
+        fig, ax = texplot.subplots(figsize=(4, 3), dpi=50)
+        assert texplot.get_figure_pool_info()['misses'] == 3
+
+        # Figures that cannot be cleared are discarded
+        ax.twinx()
+        assert not texplot.release_figure(fig)
+
+        fig, ax = texplot.subplots()
+        fig.suptitle('Title')
+        assert not texplot.release_figure(fig)
+
+        fig, ax = texplot.subplots()
+        for label in ax.get_xticklabels():
+            label.set_rotation(45)
+        assert not texplot.release_figure(fig)
+        assert texplot.get_figure_pool_info()['discarded'] == 3
+
+        # Figures that were not created by the pool are only closed
+        fig, ax = plt.subplots()
+        assert not texplot.release_figure(fig)
+        assert not plt.fignum_exists(fig.number)
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        # Figures that are closed after saving, rather than released, are not
+        # pooled
+        size = texplot.get_figure_pool_info()['size']
+        fig, ax = texplot.subplots(nrows=2, ncols=3)
+        texplot.show_or_save_plot(plt, os.path.join(directory, 'grid.png'),
+                                  bbox_inches=None)
+        assert not plt.fignum_exists(fig.number)
+        assert texplot.get_figure_pool_info()['size'] == size
+
+        # A reused grid of axes has the same shape
+        fig, ax = texplot.subplots(nrows=2, ncols=3)
+        assert texplot.release_figure(fig)
+        pooled_fig, pooled_ax = texplot.subplots(nrows=2, ncols=3)
+        assert (pooled_fig is fig) and (pooled_ax.shape == ax.shape)
+        assert all(pooled_ax_ is ax_ for pooled_ax_, ax_ in
+                   zip(pooled_ax.ravel(), ax.ravel()))
+        assert texplot.release_figure(fig)
+
+    # The pool is bounded
+    texplot.set_figure_pool(max_size=1)
+    info = texplot.get_figure_pool_info()
+    assert (info['size'] == 1) and (info['maxsize'] == 1)
+
+    try:
+        texplot.set_figure_pool(max_size=-1)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('ValueError was not raised.')
+
+    texplot.set_figure_pool()
+    texplot.reset_figure_pool()
+    assert texplot.get_figure_pool_info()['size'] == 0
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_figure_pool()
@@ -0,0 +1,81 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import subprocess
+import sys
+
+
+# ===========
+# import time
+# ===========
+
+def import_time(statement):
+    """
+    Runs a statement in a new interpreter with ``-X importtime`` and returns a
+    dictionary of the imported modules and their cumulative import time in
+    microseconds.
+    """
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        capture_output=True, text=True, check=True)
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+
+        fields = line[len('import time:'):].split('|')
+        try:
+            cumulative = int(fields[1])
+        except ValueError:
+            # Header line
+            continue
+
+        modules[fields[2].strip()] = cumulative
+
+    return modules
+
+
+# ================
+# test import time
+# ================
+
+def test_import_time():
+    """
+    Test that importing texplot does not import pyplot, the examples, or
+    IPython, which are only imported on first use.
+    """
+
+    modules = import_time('import texplot; texplot.get_theme()')
+
+    assert 'texplot' in modules
+    for module in ['matplotlib.pyplot', 'texplot.examples.plot_function',
+                   'IPython']:
+        assert module not in modules, '"%s" is imported.' % module
+
+    print('texplot import time: %0.1f ms' % (modules['texplot'] / 1000.0))
+
+    # Lazily imported attributes
+    modules = import_time('import texplot; texplot.examples.plot_function')
+    assert 'texplot.examples.plot_function' in modules
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_import_time()
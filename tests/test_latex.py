@@ -0,0 +1,114 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import texplot
+import os
+import sys
+import stat
+import tempfile
+
+
+# ===============
+# make fake latex
+# ===============
+
+def make_fake_latex(directory, returncode):
+    """
+    Creates a ``latex`` script that prints its version, and otherwise exits
+    with the given return code.
+    """
+
+    filename = os.path.join(directory, 'latex')
+    with open(filename, 'w') as file:
+        file.write('#!/bin/sh\n')
+        file.write('if [ "$1" = "--version" ]; then\n')
+        file.write('    echo "Fake TeX 1.0"\n')
+        file.write('    exit 0\n')
+        file.write('fi\n')
+        file.write('exit %d\n' % returncode)
+
+    os.chmod(filename, os.stat(filename).st_mode | stat.S_IEXEC)
+
+
+# ===================
+# test get latex info
+# ===================
+
+def test_get_latex_info():
+    """
+    Test for `get_latex_info` and `reset_latex_info` functions.
+    """
+
+    texplot.reset_latex_info()
+    latex_info = texplot.get_latex_info()
+
+    assert set(latex_info.keys()) == \
+        {'executable', 'version', 'packages', 'available'}
+    assert set(latex_info['packages'].keys()) == {'amsmath', 'amsfonts'}
+
+    # Modifying the returned dictionary does not modify the cache
+    latex_info['packages']['amsmath'] = None
+    assert texplot.get_latex_info()['packages']['amsmath'] is not None
+
+    # A theme without LaTeX does not probe LaTeX
+    texplot.reset_latex_info()
+    texplot.reset_theme_cache()
+    texplot.get_theme(use_latex=False)
+    assert texplot.latex_utilities._latex_info is None
+
+    if sys.platform.startswith('win'):
+        return
+
+    # Probe a fake latex executable with and without working packages
+    path = os.environ.get('PATH', '')
+    try:
+        for returncode in [0, 1]:
+            with tempfile.TemporaryDirectory() as directory:
+                make_fake_latex(directory, returncode)
+                os.environ['PATH'] = directory
+
+                # The cache is kept until it is reset
+                latex_info = texplot.get_latex_info(refresh=True)
+                os.environ['PATH'] = path
+                assert texplot.get_latex_info() == latex_info
+
+                assert latex_info['executable'] == \
+                    os.path.join(directory, 'latex')
+                assert latex_info['version'] == 'Fake TeX 1.0'
+                assert latex_info['available'] is (returncode == 0)
+
+                # Theme can only require latex if the packages compile
+                if returncode != 0:
+                    try:
+                        texplot.get_theme(use_latex=True)
+                    except RuntimeError:
+                        pass
+                    else:
+                        raise AssertionError('LaTeX error was not raised.')
+                else:
+                    rc = texplot.get_theme(use_latex=True)
+                    assert rc['text.usetex'] is True
+
+    finally:
+        os.environ['PATH'] = path
+        texplot.reset_latex_info()
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_get_latex_info()
@@ -0,0 +1,64 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+from texplot.examples.plot_lorenz import _solve_ivp, _lorenz, \
+    _solve_ivp_numpy, _lorenz_numpy
+import numpy
+
+
+# ==============
+# test solve ivp
+# ==============
+
+def test_solve_ivp():
+    """
+    Test that the numpy RK45 solver agrees with the pure Python solver, with
+    a batch of initial conditions, and with dense output.
+    """
+
+    t_span = [0, 2]
+    y0 = [[1.0, 1.0, 1.0], [2.0, 0.5, 1.5]]
+
+    # Single initial condition
+    t, y = _solve_ivp(_lorenz, t_span, y0[0])
+    t_np, y_np = _solve_ivp_numpy(_lorenz_numpy, t_span, y0[0])
+
+    assert y_np.shape == (t_np.size, 3)
+    assert numpy.allclose(numpy.array(y)[-1], y_np[-1], atol=1e-3)
+
+    # Batch of initial conditions
+    t_batch, y_batch = _solve_ivp_numpy(_lorenz_numpy, t_span, y0)
+    assert y_batch.shape == (t_batch.size, 2, 3)
+
+    for i in range(len(y0)):
+        t, y = _solve_ivp(_lorenz, t_span, y0[i])
+        assert numpy.allclose(numpy.array(y)[-1], y_batch[-1, i], atol=1e-3)
+
+    # Dense output
+    t_eval = numpy.linspace(t_span[0], t_span[1], 51)
+    t_dense, y_dense = _solve_ivp_numpy(_lorenz_numpy, t_span, y0,
+                                        t_eval=t_eval)
+    assert numpy.array_equal(t_dense, t_eval)
+    assert y_dense.shape == (t_eval.size, 2, 3)
+    assert numpy.allclose(y_dense[0], y0)
+    assert numpy.allclose(y_dense[-1], y_batch[-1])
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_solve_ivp()
@@ -0,0 +1,91 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+import texplot
+import os
+import json
+import tempfile
+
+
+# ============
+# test profile
+# ============
+
+def test_profile():
+    """
+    Test for `profile` function.
+    """
+
+    draw = Figure.draw
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        for format in ['json', 'chrome']:
+            profile_filename = os.path.join(directory, 'profile.' + format)
+
+            with texplot.profile(profile_filename, format=format) as report:
+                texplot.reset_theme_cache()
+                with texplot.theme(use_latex=False):
+                    fig, ax = plt.subplots()
+                    ax.plot([0, 1, 2], [0, 1, 0])
+                    texplot.save_plot(plt, os.path.join(directory, 'plot'),
+                                      formats=['svg', 'png'], workers=1)
+                    plt.close(fig)
+
+            summary = report['summary']
+            for name in ['get_theme', 'set_theme', 'rcparams.update',
+                         'save_plot', 'bbox', 'draw']:
+                assert summary[name]['count'] >= 1
+                assert summary[name]['total'] >= 0
+
+            # One write per format
+            assert summary['write']['count'] == 2
+            formats = {event['args']['format'] for event in report['events']
+                       if event['name'] == 'write'}
+            assert formats == {'.svg', '.png'}
+
+            with open(profile_filename) as file:
+                data = json.load(file)
+
+            if format == 'json':
+                assert data['summary'].keys() == summary.keys()
+            else:
+                assert len(data['traceEvents']) == len(report['events'])
+                assert all(event['ph'] == 'X'
+                           for event in data['traceEvents'])
+
+    # The instrumentation is removed on exit
+    assert Figure.draw is draw
+    with texplot.profile() as report:
+        pass
+    assert report['events'] == []
+
+    try:
+        with texplot.profile(format='xml'):
+            pass
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('"format" error was not raised.')
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_profile()
@@ -0,0 +1,140 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from concurrent.futures import ThreadPoolExecutor
+import texplot
+from texplot.examples import plot_function, plot_bifurcation_diagram
+import json
+import os
+import tempfile
+
+
+# ===========
+# plot figure
+# ===========
+
+def _plot_figure(i):
+    """
+    Creates a figure without pyplot. The example functions call
+    fig.tight_layout(), which is not thread-safe, so the figures are created
+    before they are passed to the threads.
+    """
+
+    fig = Figure(figsize=(4, 3))
+    ax = fig.subplots()
+
+    if i % 2 == 0:
+        plot_function(ax)
+    else:
+        plot_bifurcation_diagram(ax, resolution=200)
+    ax.set_title('Figure %d' % i)
+
+    return fig
+
+
+# ==========
+# read files
+# ==========
+
+def _read_files(directory, num_figures):
+    """
+    Reads the saved files of the figures.
+    """
+
+    contents = {}
+    for i in range(num_figures):
+        for extension in ['.svg', '.pdf', '.png']:
+            filename = os.path.join(directory, 'figure-%d%s' % (i, extension))
+            with open(filename, 'rb') as file:
+                contents[(i, extension)] = file.read()
+
+    return contents
+
+
+# ================
+# test save figure
+# ================
+
+def test_save_figure():
+    """
+    Test for `save_figure` function from a pool of threads.
+    """
+
+    num_figures = 4
+    save_kwargs = {
+        'formats': ['svg', 'pdf', 'png'],
+        'dpi': 50,
+        'deterministic': True,
+        'workers': 1,
+    }
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as sequential_directory, \
+            tempfile.TemporaryDirectory() as concurrent_directory:
+
+        fignums = plt.get_fignums()
+
+        for i in range(num_figures):
+            texplot.save_figure(
+                _plot_figure(i),
+                os.path.join(sequential_directory, 'figure-%d' % i),
+                **save_kwargs)
+
+        figures = [_plot_figure(i) for i in range(num_figures)]
+
+        def save(i):
+            texplot.save_figure(
+                figures[i],
+                os.path.join(concurrent_directory, 'figure-%d' % i),
+                incremental=True, **save_kwargs)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(save, range(num_figures)))
+
+        # The files do not depend on the other threads
+        assert _read_files(sequential_directory, num_figures) == \
+            _read_files(concurrent_directory, num_figures)
+
+        # The manifest has the files of all threads
+        with open(os.path.join(concurrent_directory,
+                               '.texplot_manifest.json'), 'r') as file:
+            assert len(json.load(file)) == 3 * num_figures
+
+        # The deterministic settings are restored
+        assert plt.rcParams['svg.hashsalt'] is None
+        assert 'SOURCE_DATE_EPOCH' not in os.environ
+
+        # Pyplot is not used
+        assert plt.get_fignums() == fignums
+
+        # A figure of pyplot keeps its canvas and manager
+        fig, ax = plt.subplots()
+        plot_function(ax)
+        canvas = fig.canvas
+        manager = canvas.manager
+        texplot.save_figure(
+            fig, os.path.join(sequential_directory, 'pyplot.png'), dpi=50)
+        assert (fig.canvas is canvas) and (canvas.manager is manager)
+        plt.close(fig)
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_save_figure()
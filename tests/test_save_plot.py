@@ -0,0 +1,417 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib
+import matplotlib.image
+import matplotlib.pyplot as plt
+import texplot
+from texplot import async_utilities
+import numpy
+import io
+import os
+import contextlib
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
+
+
+# ==============
+# test save plot
+# ==============
+
+def test_save_plot():
+    """
+    Test for saving multiple file formats with `save_plot`.
+    """
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots()
+        texplot.examples.plot_function(ax)
+
+        # Write formats concurrently and sequentially
+        for workers in [None, 1, 3]:
+            filename = os.path.join(directory, 'function%s' % workers)
+            texplot.save_plot(plt, filename=filename,
+                              formats=['svg', '.pdf', 'png'], workers=workers,
+                              transparent_background=True, dpi=100,
+                              verbose=True)
+
+            for extension in ['.svg', '.pdf', '.png']:
+                assert os.path.isfile(filename + extension)
+
+        # Check unsupported format
+        try:
+            texplot.save_plot(plt, filename=os.path.join(directory, 'func'),
+                              formats=['nonexistent'])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('Unsupported format was not detected.')
+
+        plt.close(fig)
+
+
+# =============
+# test decimate
+# =============
+
+def test_decimate():
+    """
+    Test for decimating lines with `save_plot`.
+    """
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots()
+        x = numpy.linspace(0, 1, 100000)
+        y = numpy.sin(200 * x)
+        ax.plot(x, y)
+
+        # Lines with markers or nan are not decimated
+        ax.plot(x[:1000], y[:1000], 'o')
+        ax.plot(x, numpy.where(x < 0.5, y, numpy.nan))
+
+        sizes = []
+        for decimate in [False, True]:
+            filename = os.path.join(directory, 'decimate%s.svg' % decimate)
+            texplot.save_plot(plt, filename=filename, decimate=decimate,
+                              dpi=100, verbose=True)
+            sizes.append(os.path.getsize(filename))
+
+        assert sizes[1] < sizes[0]
+
+        # The original data are restored
+        assert [line.get_xdata().size for line in ax.lines] == \
+            [x.size, 1000, x.size]
+
+        plt.close(fig)
+
+
+# ==============
+# test rasterize
+# ==============
+
+def test_rasterize():
+    """
+    Test for the rasterization policy of `save_plot`.
+    """
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots()
+        rng = numpy.random.RandomState(0)
+        scatter = ax.scatter(rng.rand(20000), rng.rand(20000), s=1)
+        line, = ax.plot([0, 1], [0, 1])
+        ax.set_title('Title')
+
+        sizes = []
+        for rasterize in [None, True]:
+            filename = os.path.join(directory, 'rasterize%s.svg' % rasterize)
+            texplot.save_plot(plt, filename=filename, rasterize=rasterize,
+                              dpi=50, verbose=True)
+            sizes.append(os.path.getsize(filename))
+
+            with open(filename) as file:
+                content = file.read()
+            assert ('<image' in content) is (rasterize is True)
+            assert 'Title' in content
+
+        assert sizes[1] < sizes[0]
+
+        # The original setting of the artists is restored
+        assert not scatter.get_rasterized()
+        assert not line.get_rasterized()
+
+        plt.close(fig)
+
+
+# ================
+# test incremental
+# ================
+
+def test_incremental():
+    """
+    Test for the incremental mode of `save_plot`, which skips the files of
+    unchanged figures.
+    """
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        filename = os.path.join(directory, 'incremental')
+        filenames = [filename + '.svg', filename + '.png']
+
+        def save(y, dpi=50):
+            """
+            Plots and saves a figure, and returns the written files.
+            """
+
+            fig, ax = plt.subplots()
+            ax.plot([0, 1, 2], y)
+            ax.set_title('Title')
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout):
+                texplot.save_plot(plt, filename=filename,
+                                  formats=['svg', 'png'], dpi=dpi,
+                                  incremental=True, verbose=True)
+            plt.close(fig)
+
+            return [name for name in filenames
+                    if 'saved to "%s"' % name in stdout.getvalue()]
+
+        assert save([0, 1, 0]) == filenames
+        assert os.path.isfile(os.path.join(directory,
+                                           '.texplot_manifest.json'))
+
+        # The same figure is not written again
+        assert save([0, 1, 0]) == []
+
+        # A removed file is written again
+        os.remove(filenames[1])
+        assert save([0, 1, 0]) == filenames[1:]
+
+        # Changes of the data, the arguments, or the rcParams are detected
+        assert save([0, 2, 0]) == filenames
+        assert save([0, 2, 0], dpi=60) == filenames
+        with matplotlib.rc_context({'lines.linewidth': 3}):
+            assert save([0, 2, 0], dpi=60) == filenames
+
+
+# ==================
+# test deterministic
+# ==================
+
+def test_deterministic():
+    """
+    Test for the deterministic mode of `save_plot`, which writes identical
+    files for the same figure.
+    """
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots()
+        ax.plot([0, 1, 2], [0, 1, 0], label='Line')
+        ax.legend()
+
+        contents = []
+        for workers in [1, 2]:
+            filename = os.path.join(directory, 'deterministic%d' % workers)
+            texplot.save_plot(plt, filename=filename, formats=['svg', 'pdf'],
+                              workers=workers, deterministic=True)
+
+            content = []
+            for extension in ['.svg', '.pdf']:
+                with open(filename + extension, 'rb') as file:
+                    content.append(file.read())
+            contents.append(content)
+
+        assert contents[0] == contents[1]
+        assert b'<dc:date>' not in contents[0][0]
+        assert b'CreationDate' not in contents[0][1]
+
+        # The environment is restored
+        assert 'SOURCE_DATE_EPOCH' not in os.environ
+        assert matplotlib.rcParams['svg.hashsalt'] is None
+
+        plt.close(fig)
+
+
+# ==================
+# test multiple dpis
+# ==================
+
+def test_multiple_dpis():
+    """
+    Test for saving raster formats at several dots per inch from a single
+    rendering in `save_plot`.
+    """
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots(figsize=(8.8, 2.1))
+        ax.plot([0, 1, 2], [0, 1, 0])
+        ax.set_xlabel('x')
+        ax.set_title('Title')
+
+        dpis = [300, 200, 100, 50, 30]
+        filename = os.path.join(directory, 'dpis')
+        texplot.save_plot(plt, filename=filename, formats=['png', 'pdf'],
+                          dpi=dpis)
+
+        # The vector formats are saved once
+        assert os.path.isfile(filename + '.pdf')
+        assert not os.path.isfile(filename + '.png')
+
+        # Formats that Pillow names differently than their extension
+        texplot.save_plot(plt, filename=filename, formats=['tif', 'jpg'],
+                          dpi=[100, 30])
+
+        # The downsampled images have the size of the direct renderings
+        expected_filename = os.path.join(directory, 'expected.png')
+        for dpi in dpis:
+            fig.savefig(expected_filename, dpi=dpi, bbox_inches='tight',
+                        pad_inches=0.1, transparent=True)
+            expected = matplotlib.image.imread(expected_filename)
+
+            image = matplotlib.image.imread(filename + '-%ddpi.png' % dpi)
+            assert image.shape == expected.shape
+            assert image.dtype == expected.dtype
+
+            if dpi in [100, 30]:
+                for extension in ['.tif', '.jpg']:
+                    image = matplotlib.image.imread(
+                        filename + '-%ddpi' % dpi + extension)
+                    assert image.shape[:2] == expected.shape[:2]
+
+        plt.close(fig)
+
+
+# ===================
+# test get tight bbox
+# ===================
+
+def test_get_tight_bbox():
+    """
+    Test for `get_tight_bbox` function, and its cache in `save_plot`.
+    """
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots()
+        texplot.examples.plot_function(ax)
+
+        # The same bounding box as matplotlib computes for savefig
+        expected = fig.get_tightbbox().padded(0.2)
+        bbox = texplot.get_tight_bbox(fig, pad_inches=0.2)
+        assert numpy.allclose(bbox.bounds, expected.bounds)
+
+        # The bounding box is computed once for the dpi of the files until the
+        # figure is changed, and savefig draws the figure once for each format
+        filename = os.path.join(directory, 'bbox')
+        texplot.save_plot(plt, filename, formats=['svg', 'pdf'], workers=1)
+        for changed in [False, False, True]:
+            if changed:
+                ax.set_title('Changed')
+
+            with texplot.profile() as report:
+                texplot.save_plot(plt, filename, formats=['svg', 'pdf'],
+                                  workers=1)
+
+            summary = report['summary']
+            assert summary['draw']['count'] == (3 if changed else 2)
+            assert ('bbox' in summary) == changed
+
+        # The file is cropped as with bbox_inches='tight', since the texts
+        # are measured at the dpi of the file
+        for dpi in [50, 300]:
+            texplot.save_plot(plt, filename + '.png', dpi=dpi)
+            fig.savefig(filename + '_tight.png', dpi=dpi,
+                        bbox_inches='tight', pad_inches=0.1,
+                        transparent=True)
+            image = matplotlib.image.imread(filename + '.png')
+            expected = matplotlib.image.imread(filename + '_tight.png')
+            assert image.shape == expected.shape
+
+        plt.close(fig)
+
+
+# ====================
+# test save plot async
+# ====================
+
+def test_save_plot_async():
+    """
+    Test for `save_plot_async` and `wait_all` functions.
+    """
+
+    with tempfile.TemporaryDirectory() as directory:
+
+        with texplot.theme(use_latex=False):
+            fig, ax = plt.subplots()
+            ax.plot([0, 1, 2], [0, 1, 0])
+            filename = os.path.join(directory, 'async')
+            future = texplot.save_plot_async(plt, filename,
+                                             formats=['svg', 'png'])
+
+        # The figure can be modified and closed while it is written
+        ax.set_title('Modified')
+        plt.close(fig)
+
+        assert future.result(timeout=120) is None
+        with open(filename + '.svg') as file:
+            assert 'Modified' not in file.read()
+        assert os.path.isfile(filename + '.png')
+
+        # Errors are raised by the future
+        fig, ax = plt.subplots()
+        future = texplot.save_plot_async(
+            plt, os.path.join(directory, 'nonexistent', 'async.pdf'))
+        assert texplot.wait_all(timeout=120) == 0
+        assert future.done()
+        assert isinstance(future.exception(), RuntimeError)
+
+        # A figure that cannot be pickled is saved synchronously
+        ax.xaxis.set_major_formatter(lambda x, pos: '%0.1f' % x)
+        future = texplot.save_plot_async(
+            plt, os.path.join(directory, 'lambda.pdf'))
+        assert future.done()
+        assert os.path.isfile(os.path.join(directory, 'lambda.pdf'))
+        plt.close(fig)
+
+        # The figure is closed once it is copied
+        fig, ax = plt.subplots()
+        future = texplot.save_plot_async(
+            plt, os.path.join(directory, 'closed.pdf'), close=True)
+        assert not plt.fignum_exists(fig.number)
+        assert future.result(timeout=120) is None
+        assert os.path.isfile(os.path.join(directory, 'closed.pdf'))
+
+        # A new process replaces the process that died
+        executor = async_utilities._get_executor()
+        try:
+            executor.submit(os._exit, 1).result(timeout=120)
+        except BrokenProcessPool:
+            pass
+        else:
+            raise AssertionError('Process pool was not broken.')
+
+        fig, ax = plt.subplots()
+        future = texplot.save_plot_async(
+            plt, os.path.join(directory, 'restarted.pdf'), close=True)
+        assert future.result(timeout=120) is None
+        assert async_utilities._get_executor() is not executor
+        assert os.path.isfile(os.path.join(directory, 'restarted.pdf'))
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_save_plot()
+    test_decimate()
+    test_rasterize()
+    test_incremental()
+    test_deterministic()
+    test_multiple_dpis()
+    test_get_tight_bbox()
+    test_save_plot_async()
@@ -0,0 +1,126 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import matplotlib
+import matplotlib.pyplot as plt
+import matplotlib.image
+import texplot
+import numpy
+import os
+import sys
+import stat
+import tempfile
+
+
+# ================
+# make fake ffmpeg
+# ================
+
+def make_fake_ffmpeg(directory):
+    """
+    Creates an ``ffmpeg`` script that writes the raw frames of its standard
+    input to the output file.
+    """
+
+    filename = os.path.join(directory, 'ffmpeg')
+    with open(filename, 'w') as file:
+        file.write('#!/bin/sh\n')
+        file.write('for last; do :; done\n')
+        file.write('cat > "$last"\n')
+
+    os.chmod(filename, os.stat(filename).st_mode | stat.S_IEXEC)
+
+    return filename
+
+
+# ==================
+# test stream frames
+# ==================
+
+def test_stream_frames():
+    """
+    Test for `stream_frames` function.
+    """
+
+    t = numpy.linspace(0, 10, 200)
+
+    with texplot.theme(use_latex=False), \
+            tempfile.TemporaryDirectory() as directory:
+
+        fig, ax = plt.subplots(figsize=(3, 2))
+        line, = ax.plot([], [], color='k')
+        ax.set_xlim(-1, 11)
+        ax.set_ylim(-1.5, 1.5)
+        canvas = fig.canvas
+
+        # Blitting gives the same frames as drawing the whole figure
+        frames = {}
+        for artists, name in [([line], 'blit'), (None, 'full')]:
+            filename = os.path.join(directory, name + '.png')
+            with texplot.stream_frames(fig, filename, artists=artists,
+                                       dpi=50) as write_frame:
+                for i in range(3):
+                    n = 50 * (i + 1)
+                    line.set_data(t[:n], numpy.sin(t[:n]))
+                    assert write_frame() == i
+
+            frames[name] = [matplotlib.image.imread(
+                os.path.join(directory, name + '-%05d.png' % i))
+                for i in range(3)]
+
+        for blit, full in zip(frames['blit'], frames['full']):
+            assert blit.shape == (100, 150, 4)
+            assert numpy.array_equal(blit, full)
+        assert not numpy.array_equal(frames['blit'][0], frames['blit'][2])
+
+        # The state of the figure is restored
+        assert not line.get_animated()
+        assert fig.canvas is canvas
+        assert fig.dpi != 50
+
+        # Raw frames are piped to ffmpeg
+        if not sys.platform.startswith('win'):
+            ffmpeg_path = matplotlib.rcParams['animation.ffmpeg_path']
+            matplotlib.rcParams['animation.ffmpeg_path'] = \
+                make_fake_ffmpeg(directory)
+
+            try:
+                filename = os.path.join(directory, 'wave.mp4')
+                with texplot.stream_frames(fig, filename, artists=[line],
+                                           dpi=50) as write_frame:
+                    for i in range(4):
+                        write_frame()
+            finally:
+                matplotlib.rcParams['animation.ffmpeg_path'] = ffmpeg_path
+
+            assert os.path.getsize(filename) == 4 * 100 * 150 * 4
+
+        try:
+            with texplot.stream_frames(fig, 'wave.txt'):
+                pass
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('"filename" error was not raised.')
+
+        plt.close(fig)
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_stream_frames()
@@ -0,0 +1,218 @@
+#! /usr/bin/env python
+
+# SPDX-FileCopyrightText: Copyright 2022, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the license found in the LICENSE.txt file in the root directory
+# of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import texplot
+from texplot import tex_cache_utilities
+from matplotlib.texmanager import TexManager
+import os
+import sys
+import stat
+import tempfile
+
+
+# =======================
+# fake checked subprocess
+# =======================
+
+def fake_checked_subprocess(cls, command, tex, *, cwd=None):
+    """
+    Replaces the latex and dvipng calls of matplotlib by writing the output
+    file that the command would produce.
+    """
+
+    if command[0] == 'latex':
+        output = 'file.dvi'
+    else:
+        output = command[command.index('-o') + 1]
+
+    with open(os.path.join(cwd, output), 'w') as file:
+        file.write(tex)
+
+    return b''
+
+
+# ===============
+# make fake latex
+# ===============
+
+def make_fake_latex(directory):
+    """
+    Creates a ``latex`` script that succeeds, so that the themes render text
+    with LaTeX.
+    """
+
+    filename = os.path.join(directory, 'latex')
+    with open(filename, 'w') as file:
+        file.write('#!/bin/sh\n')
+        file.write('echo "Fake TeX 1.0"\n')
+
+    os.chmod(filename, os.stat(filename).st_mode | stat.S_IEXEC)
+
+
+# ==============
+# test tex cache
+# ==============
+
+def test_tex_cache():
+    """
+    Test for `set_tex_cache`, `get_tex_cache_info`, and `reset_tex_cache`
+    functions, without a LaTeX installation.
+    """
+
+    run_checked_subprocess = TexManager.__dict__['_run_checked_subprocess']
+    TexManager._run_checked_subprocess = classmethod(fake_checked_subprocess)
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            texplot.set_tex_cache(directory)
+            texplot.reset_tex_cache()
+
+            info = texplot.get_tex_cache_info()
+            assert info['directory'] == directory
+            assert info['files'] == 0
+
+            # The first render is a miss, and the next one is a hit
+            dvi = TexManager.make_dvi(r'$x$', 12)
+            assert dvi.startswith(directory)
+            assert TexManager.make_dvi(r'$x$', 12) == dvi
+
+            info = texplot.get_tex_cache_info()
+            assert (info['hits'], info['misses']) == (1, 1)
+
+            # Another font size or preamble is a different entry
+            TexManager.make_dvi(r'$x$', 14)
+            TexManager.make_png(r'$x$', 12, 100)
+            info = texplot.get_tex_cache_info()
+            assert info['misses'] == 3
+
+            # make_png calls make_dvi, which is not counted separately
+            assert info['hits'] == 1
+
+            # The arguments can be passed by keyword
+            TexManager.make_png(r'$x$', 12, dpi=100)
+            TexManager.make_png(tex=r'$x$', fontsize=12, dpi=100)
+            TexManager.make_dvi(r'$x$', fontsize=12)
+            info = texplot.get_tex_cache_info()
+            assert (info['hits'], info['misses']) == (4, 3)
+            assert info['files'] > 0
+            assert info['size'] > 0
+
+            # Old files are evicted when the cache exceeds its size
+            for root, _, names in os.walk(directory):
+                for name in names:
+                    os.utime(os.path.join(root, name), (0, 0))
+
+            texplot.set_tex_cache(directory, max_size=0)
+            info = texplot.get_tex_cache_info()
+            assert info['files'] == 0
+            assert info['evicted'] > 0
+            assert info['max_size'] == 0
+
+            # The cache is scanned when it exceeds its size, not on each miss
+            list_files = tex_cache_utilities._list_files
+            scans = []
+
+            def count_scans(directory):
+                scans.append(directory)
+                return list_files(directory)
+
+            tex_cache_utilities._list_files = count_scans
+            try:
+                texplot.set_tex_cache(directory, max_size=2**20)
+                for fontsize in range(20, 30):
+                    TexManager.make_dvi(r'$x$', fontsize)
+                assert len(scans) == 1
+
+                size = texplot.get_tex_cache_info()['size']
+                texplot.set_tex_cache(directory, max_size=size + 1)
+                TexManager.make_dvi(r'$y$', 12)
+                assert len(scans) == 4
+            finally:
+                tex_cache_utilities._list_files = list_files
+
+            try:
+                texplot.set_tex_cache(directory, max_size=-1)
+            except ValueError:
+                pass
+            else:
+                raise AssertionError('"max_size" error was not raised.')
+
+    finally:
+        TexManager._run_checked_subprocess = run_checked_subprocess
+        texplot.set_tex_cache()
+        texplot.reset_tex_cache()
+
+
+# ===================
+# test warm tex cache
+# ===================
+
+def test_warm_tex_cache():
+    """
+    Test for `warm_tex_cache` function, without a LaTeX installation.
+    """
+
+    if sys.platform.startswith('win'):
+        return
+
+    run_checked_subprocess = TexManager.__dict__['_run_checked_subprocess']
+    TexManager._run_checked_subprocess = classmethod(fake_checked_subprocess)
+    path = os.environ.get('PATH', '')
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            make_fake_latex(directory)
+            os.environ['PATH'] = directory
+            texplot.reset_latex_info()
+
+            texplot.set_tex_cache(os.path.join(directory, 'cache'))
+            strings = [r'$x$', r'Time $t$', r'$x$']
+
+            report = texplot.warm_tex_cache(strings, font_scale=1.2,
+                                            fontsizes=[10, 12], workers=2)
+            assert report['renders'] == 4
+            assert report['compiled'] == 4
+            assert report['failed'] == []
+
+            # The second time, all strings are cached
+            report = texplot.warm_tex_cache(strings, font_scale=1.2,
+                                            fontsizes=[10, 12])
+            assert report['cached'] == 4
+
+            # The font sizes of the theme, and the rasterized strings
+            report = texplot.warm_tex_cache(strings, dpi=100)
+            assert report['renders'] > 0
+            assert report['renders'] % 2 == 0
+
+    finally:
+        os.environ['PATH'] = path
+        TexManager._run_checked_subprocess = run_checked_subprocess
+        texplot.reset_latex_info()
+        texplot.set_tex_cache()
+        texplot.reset_tex_cache()
+
+    # Without LaTeX, nothing is rendered
+    if not texplot.get_latex_info()['available']:
+        report = texplot.warm_tex_cache([r'$x$'])
+        assert report['renders'] == 0
+
+
+# ===========
+# Script main
+# ===========
+
+if __name__ == "__main__":
+    test_tex_cache()
+    test_warm_tex_cache()
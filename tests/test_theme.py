@@ -15,8 +15,12 @@
 
 import matplotlib.pyplot as plt
 import texplot
+from texplot import rc_utilities
+from matplotlib.figure import Figure
 import os
 import glob
+import tempfile
+import threading
 
 # import warnings
 # warnings.resetwarnings()
@@ -93,14 +97,251 @@ def test_theme():
         texplot.save_plot(plt, filename='bifircation.pdf',
                           transparent_background=True, dpi=200, verbose=True)
 
+        # Plot the diagram as a density image
+        fig5, ax5 = plt.subplots()
+        texplot.examples.plot_bifurcation_diagram(
+            ax5, resolution=2000, iterations=100, burn_in=1000, density=True,
+            bins=(900, 400))
+        texplot.save_plot(plt, filename='bifircation_density.pdf',
+                          transparent_background=True, dpi=200, verbose=True)
+
     # Remove outputs
     remove_file('*.svg')
     remove_file('*.pdf')
 
 
+# ================
+# test theme cache
+# ================
+
+def test_theme_cache():
+    """
+    Test for the cache of `get_theme`.
+    """
+
+    texplot.reset_theme_cache()
+
+    rc = {'font.sans-serif': ['Arial'], 'axes.grid': True}
+    theme1 = texplot.get_theme(font_scale=1.2, use_latex=False, rc=rc)
+    theme2 = texplot.get_theme(font_scale=1.2, use_latex=False,
+                               rc={'axes.grid': True,
+                                   'font.sans-serif': ['Arial']})
+    theme3 = texplot.get_theme(font_scale=1.5, use_latex=False, rc=rc)
+
+    assert theme1 is theme2
+    assert theme1 is not theme3
+    assert theme1['axes.grid'] is True
+
+    cache_info = texplot.get_theme_cache_info()
+    assert cache_info['hits'] == 1
+    assert cache_info['misses'] == 2
+    assert cache_info['size'] == 2
+
+    # Themes are read-only
+    try:
+        theme1['axes.grid'] = False
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('Theme is not read-only.')
+
+    # Modifying rc does not modify the cached theme
+    rc['font.sans-serif'].append('DejaVu Sans')
+    assert theme1['font.sans-serif'] == ('Arial', )
+
+    # The values of themes are read-only, so that changing a returned theme
+    # does not change the theme of the next call
+    theme4 = texplot.get_theme(use_latex=False)
+    font_family = list(theme4['font.family'])
+    try:
+        theme4['font.family'].append('cursive')
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError('Theme value is not read-only.')
+    assert list(texplot.get_theme(use_latex=False)['font.family']) == \
+        font_family
+
+    texplot.reset_theme_cache()
+    assert texplot.get_theme_cache_info()['size'] == 0
+
+
+# ==================
+# test theme context
+# ==================
+
+def test_theme_context():
+    """
+    Test that `theme` restores the rcParams that it changes on exit.
+    """
+
+    texplot.reset_theme()
+    original_rc_params = dict(plt.rcParams.copy())
+
+    # Named style, a style dictionary, and a style known only once applied
+    for style in [None, 'dark_background', {'axes.grid': True}, 'default']:
+        with texplot.theme(font_scale=1.5, style=style, use_latex=False):
+            font_size = plt.rcParams['font.size']
+
+            # Nested theme
+            with texplot.theme(context='talk', style=style,
+                               use_latex=False, rc={'font.size': 20}):
+                if style is None:
+                    assert plt.rcParams['font.size'] == 20
+
+            assert plt.rcParams['font.size'] == font_size
+
+        assert dict(plt.rcParams.copy()) == original_rc_params
+
+    # rcParams are restored when an error is raised within the context
+    try:
+        with texplot.theme(style='dark_background', use_latex=False):
+            raise ValueError
+    except ValueError:
+        pass
+
+    assert dict(plt.rcParams.copy()) == original_rc_params
+
+
+# =======================
+# test thread local theme
+# =======================
+
+def test_thread_local_theme():
+    """
+    Test for `theme` with ``thread_local=True`` in concurrent threads.
+    """
+
+    texplot.reset_theme()
+    original_rc_params = dict(plt.rcParams.copy())
+
+    font_scales = [1, 2]
+    barrier = threading.Barrier(len(font_scales))
+    results = {}
+    errors = []
+
+    def plot(font_scale, filename):
+        fig = Figure(figsize=(4, 3), dpi=50)
+        ax = fig.subplots()
+        ax.plot([0, 1, 2], [1, 0, 2])
+        ax.set_title('Title')
+        texplot.save_figure(fig, filename, bbox_inches=None,
+                            deterministic=True)
+        return ax.title.get_fontsize()
+
+    def render(font_scale, directory):
+        try:
+            with texplot.theme(use_latex=False, font_scale=font_scale,
+                               thread_local=True):
+
+                # Both threads are within their themes at the same time
+                barrier.wait()
+                font_size = plt.rcParams['font.size']
+
+                # rc_context within a thread-local theme is also local
+                with plt.rc_context({'axes.grid': True}):
+                    barrier.wait()
+                    assert plt.rcParams['axes.grid'] is True
+
+                filename = os.path.join(directory, 'thread-%d.svg'
+                                        % font_scale)
+                results[font_scale] = (font_size,
+                                       plot(font_scale, filename))
+        except BaseException as error:
+            errors.append(error)
+
+    with tempfile.TemporaryDirectory() as directory:
+        threads = [threading.Thread(target=render,
+                                    args=(font_scale, directory))
+                   for font_scale in font_scales]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            raise errors[0]
+
+        # The global rcParams are not changed by the threads
+        assert dict(plt.rcParams.copy()) == original_rc_params
+
+        # Each thread rendered with its own theme, as with a global theme
+        assert results[2][0] == 2 * results[1][0]
+        for font_scale in font_scales:
+            with texplot.theme(use_latex=False, font_scale=font_scale):
+                assert plt.rcParams['font.size'] == results[font_scale][0]
+                filename = os.path.join(directory, 'global.svg')
+                assert plot(font_scale, filename) == results[font_scale][1]
+
+            with open(os.path.join(directory, 'thread-%d.svg'
+                                   % font_scale), 'rb') as file:
+                thread_output = file.read()
+            with open(filename, 'rb') as file:
+                assert file.read() == thread_output
+
+        # The workers that write several formats concurrently use the
+        # thread-local theme of the thread that saves
+        def save_formats():
+            try:
+                with texplot.theme(use_latex=False, thread_local=True,
+                                   rc={'svg.fonttype': 'none'}):
+                    fig = Figure(figsize=(4, 3), dpi=50)
+                    ax = fig.subplots()
+                    ax.set_title('Title')
+                    texplot.save_figure(fig, os.path.join(directory, 'text'),
+                                        formats=['svg', 'pdf'], workers=2)
+            except BaseException as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=save_formats)
+        thread.start()
+        thread.join()
+
+        if errors:
+            raise errors[0]
+
+        with open(os.path.join(directory, 'text.svg'), 'r') as file:
+            assert '>Title</text>' in file.read()
+        assert os.path.isfile(os.path.join(directory, 'text.pdf'))
+
+    # A persistent thread-local theme is removed by reset_theme
+    def persistent():
+        texplot.set_theme(use_latex=False, font_scale=3, thread_local=True)
+        results['persistent'] = plt.rcParams['font.size']
+        texplot.reset_theme(thread_local=True)
+        results['reset'] = plt.rcParams['font.size']
+
+    thread = threading.Thread(target=persistent)
+    thread.start()
+    thread.join()
+
+    assert results['persistent'] != original_rc_params['font.size']
+    assert results['reset'] == original_rc_params['font.size']
+    assert dict(plt.rcParams.copy()) == original_rc_params
+
+    # Thread-local themes are refused if matplotlib lacks the methods of the
+    # rcParams that they override
+    rc_params_methods = rc_utilities._RC_PARAMS_METHODS
+    rc_utilities._RC_PARAMS_METHODS = rc_params_methods + ['_missing']
+    try:
+        with texplot.theme(use_latex=False, font_scale=3, thread_local=True):
+            pass
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError('Thread-local theme was not refused.')
+    finally:
+        rc_utilities._RC_PARAMS_METHODS = rc_params_methods
+
+    assert dict(plt.rcParams.copy()) == original_rc_params
+
+
 # ===========
 # Script main
 # ===========
 
 if __name__ == "__main__":
     test_theme()
+    test_theme_cache()
+    test_theme_context()
+    test_thread_local_theme()
@@ -12,11 +12,51 @@
 # =======
 
 from .plot_utilities import theme, get_theme, set_theme, reset_theme, \
-    save_plot, show_or_save_plot
+    get_theme_cache_info, reset_theme_cache, save_plot, save_figure, \
+    show_or_save_plot
+from .layout_utilities import get_tight_bbox
+from .pool_utilities import subplots, release_figure, set_figure_pool, \
+    get_figure_pool_info, reset_figure_pool
+from .lifecycle_utilities import get_figure_info, reset_figure_info
+from .async_utilities import save_plot_async, wait_all
+from .batch_utilities import batch
+from .stream_utilities import stream_frames
+from .append_utilities import append_data, draw_appended
+from .latex_utilities import get_latex_info, reset_latex_info
+from .tex_cache_utilities import set_tex_cache, get_tex_cache_info, \
+    reset_tex_cache, warm_tex_cache
 from .display_utilities import is_notebook
-from . import examples
+from .profile_utilities import profile, _profile_from_environ
 
 __all__ = ['theme', 'get_theme', 'set_theme', 'reset_theme',
-           'save_plot', 'show_or_save_plot', 'examples', 'is_notebook']
+           'get_theme_cache_info', 'reset_theme_cache', 'save_plot',
+           'save_figure', 'show_or_save_plot', 'get_tight_bbox', 'subplots',
+           'release_figure', 'set_figure_pool', 'get_figure_pool_info',
+           'reset_figure_pool', 'get_figure_info', 'reset_figure_info',
+           'save_plot_async', 'wait_all', 'batch', 'stream_frames',
+           'append_data', 'draw_appended', 'get_latex_info',
+           'reset_latex_info', 'set_tex_cache', 'get_tex_cache_info',
+           'reset_tex_cache', 'warm_tex_cache', 'profile', 'examples',
+           'is_notebook']
 
 from .__version__ import __version__                          # noqa: F401 E402
+
+# Profile the whole session if TEXPLOT_PROFILE is set
+_profile_from_environ()
+
+
+# ========
+# get attr
+# ========
+
+def __getattr__(name):
+    """
+    Imports the examples subpackage on first access, since it imports numpy.
+    """
+
+    if name == 'examples':
+        import importlib
+        return importlib.import_module('.examples', __name__)
+
+    raise AttributeError(
+        'module %s has no attribute %s' % (repr(__name__), repr(name)))
@@ -0,0 +1,427 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import weakref
+import numpy
+from .profile_utilities import _record
+from .raster_utilities import _RASTER_EXTENSIONS
+from .layout_utilities import _watch_figure
+
+__all__ = ['append_data', 'draw_appended']
+
+# Capacity of the buffer of a line when it is created
+_INITIAL_CAPACITY = 1024
+
+# Buffers of the lines that data are appended to, and the state of the
+# figures at their last draw, which are released with the lines and figures.
+# The states refer to the canvases weakly, since a canvas refers to its
+# figure.
+_buffers = weakref.WeakKeyDictionary()
+_figure_states = weakref.WeakKeyDictionary()
+
+# The number of changes of each figure that were made by appending data,
+# which are not counted as changes by draw_appended.
+_appended_mutations = weakref.WeakKeyDictionary()
+
+
+# ==========
+# get buffer
+# ==========
+
+def _get_buffer(line):
+    """
+    Returns the buffer of a line, and creates it from the data of the line
+    on first use, or if the data of the line were replaced since.
+    """
+
+    buffer = _buffers.get(line, None)
+
+    # The data of the line are replaced by other functions, such as
+    # Line2D.set_data, in which case the line no longer refers to the
+    # arrays of its buffer.
+    xdata = line.get_xdata(orig=True)
+    ydata = line.get_ydata(orig=True)
+    if (buffer is not None) and \
+            ((xdata is not buffer['xdata']) or (ydata is not buffer['ydata'])):
+        buffer = None
+
+    if buffer is None:
+        x = numpy.asarray(xdata, dtype=float).ravel()
+        y = numpy.asarray(ydata, dtype=float).ravel()
+        capacity = max(_INITIAL_CAPACITY, 2 * x.size)
+
+        buffer = {
+            'x': numpy.empty(capacity, dtype=float),
+            'y': numpy.empty(capacity, dtype=float),
+            'xdata': xdata,
+            'ydata': ydata,
+            'size': x.size,
+            'drawn': 0,
+            'segment': None,
+        }
+        buffer['x'][:x.size] = x
+        buffer['y'][:y.size] = y
+
+        _buffers[line] = buffer
+
+    return buffer
+
+
+# ===========
+# append data
+# ===========
+
+def append_data(line, x, y):
+    """
+    Appends points to a line.
+
+    Parameters
+    ----------
+
+    line : matplotlib.lines.Line2D
+        A line of a figure, such as the one returned by ``ax.plot([], [])``.
+
+    x : float or array_like
+        The x coordinates of the new points.
+
+    y : float or array_like
+        The y coordinates of the new points, with the same size as ``x``.
+
+    Raises
+    ------
+
+    ValueError
+        If ``x`` and ``y`` do not have the same size.
+
+    See Also
+    --------
+
+    texplot.draw_appended
+
+    Notes
+    -----
+
+    The data of the line are kept in preallocated arrays, whose capacity is
+    doubled when they are full. Appending points and updating the data
+    limits of the axes takes time proportional to the number of new points,
+    not to the number of all points of the line. The line refers to the
+    arrays without copying them, so it can be drawn by any function, such as
+    :func:`texplot.show_or_save_plot`. Axes that autoscale are autoscaled to
+    the new points when they are drawn. If the data of the line are set by
+    other functions, such as ``line.set_data``, the points are appended to
+    the new data.
+
+    The coordinates are stored as floats, so dates and categories should be
+    converted to numbers first.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+
+        >>> fig, ax = plt.subplots()
+        >>> line, = ax.plot([], [], color='k')
+        >>> texplot.append_data(line, [0, 1, 2], [0, 1, 4])
+        >>> texplot.append_data(line, 3, 9)
+        >>> line.get_xdata()
+        array([0., 1., 2., 3.])
+    """
+
+    x = numpy.asarray(x, dtype=float).ravel()
+    y = numpy.asarray(y, dtype=float).ravel()
+
+    if x.size != y.size:
+        raise ValueError('"x" and "y" should have the same size.')
+
+    buffer = _get_buffer(line)
+    start = buffer['size']
+    end = start + x.size
+
+    # Amortized doubling of the capacity
+    capacity = buffer['x'].size
+    if end > capacity:
+        capacity = max(2 * capacity, end)
+        for key in ['x', 'y']:
+            array = numpy.empty(capacity, dtype=float)
+            array[:start] = buffer[key][:start]
+            buffer[key] = array
+
+    buffer['x'][start:end] = x
+    buffer['y'][start:end] = y
+    buffer['size'] = end
+
+    # The line refers to views of the buffer, since Line2D.set_data copies
+    # its input, which would take time proportional to all points.
+    line._xorig = buffer['x'][:end]
+    line._yorig = buffer['y'][:end]
+    line._invalidx = True
+    line._invalidy = True
+    buffer['xdata'] = line._xorig
+    buffer['ydata'] = line._yorig
+
+    # Extend the data limits by the new points only
+    ax = line.axes
+    if (ax is not None) and (x.size > 0):
+        updatex, updatey = \
+            line.get_transform().contains_branch_seperately(ax.transData)
+        if updatex or updatey:
+            ax.update_datalim(numpy.column_stack([x, y]), updatex=updatex,
+                              updatey=updatey)
+            ax._request_autoscale_view()
+
+    # Mark the figure as stale, so that it is redrawn and its cached tight
+    # bbox is recomputed. These changes are counted, so that draw_appended
+    # still draws only the appended points.
+    fig = line.figure
+    if fig is None:
+        line.stale = True
+    else:
+        layout_state = _watch_figure(fig)
+        mutations = layout_state['mutations']
+        line.stale = True
+        _appended_mutations[fig] = _appended_mutations.get(fig, 0) + \
+            layout_state['mutations'] - mutations
+
+
+# ===========
+# get segment
+# ===========
+
+def _get_segment(line, buffer):
+    """
+    Returns a line with the style of the given line, which draws the points
+    that are not drawn yet.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.lines import Line2D
+
+    if buffer['segment'] is None:
+        buffer['segment'] = Line2D([], [])
+
+    segment = buffer['segment']
+    segment.update_from(line)
+    segment.set_figure(line.figure)
+
+    # Continue the line from its last drawn point
+    start = buffer['drawn']
+    if (start > 0) and (line.get_linestyle() not in ['None', '', ' ']):
+        start -= 1
+
+    segment.set_data(buffer['x'][start:buffer['size']],
+                     buffer['y'][start:buffer['size']])
+
+    return segment
+
+
+# ==========
+# get limits
+# ==========
+
+def _get_limits(fig):
+    """
+    Returns the size and resolution of a figure, and the view limits of its
+    axes, which determine where each point is drawn.
+    """
+
+    return (tuple(fig.bbox.bounds), fig.dpi,
+            tuple(tuple(ax.viewLim.bounds) for ax in fig.axes))
+
+
+# ==========
+# count draw
+# ==========
+
+def _count_draw(event):
+    """
+    Counts the draws of a figure, which is called after each draw.
+    """
+
+    state = _figure_states.get(event.canvas.figure, None)
+    if state is not None:
+        state['draws'] += 1
+
+
+# =============
+# draw appended
+# =============
+
+def draw_appended(fig, filename=None, verbose=False):
+    """
+    Draws the points appended to the lines of a figure since the last draw,
+    and optionally writes the figure to a raster file.
+
+    Parameters
+    ----------
+
+    fig : matplotlib.figure.Figure
+        The figure, whose canvas should be an Agg canvas (the default for
+        non-interactive backends, and the base of most interactive ones).
+
+    filename : str, default=None
+        If given, the drawn figure is written to this file. The format is
+        determined by the extension, and should be a raster format, such as
+        ``.png``. The image is the full figure, with no tight bounding box.
+
+    verbose : bool, default=False
+        If `True`, the filename is printed.
+
+    Returns
+    -------
+
+    info : dict
+        A dictionary with the following keys:
+
+        * ``full``: `True` if the whole figure was drawn, and `False` if only
+          the appended points were drawn.
+        * ``points``: the number of points that were drawn.
+
+    Raises
+    ------
+
+    ValueError
+        If the extension of the file is not a raster format.
+
+    RuntimeError
+        If the canvas of the figure is not an Agg canvas.
+
+    See Also
+    --------
+
+    texplot.append_data
+    texplot.save_plot
+
+    Notes
+    -----
+
+    The figure is drawn in full on the first call, and when it changed other
+    than by :func:`texplot.append_data`, for instance when its size, a
+    title, or the view limits of an axes changed. Axes that autoscale are
+    autoscaled first, so points that fall outside of the current limits
+    cause a full draw.
+
+    Otherwise, only the appended points of each line are drawn over the
+    image of the previous draw, so drawing and writing the file take time
+    proportional to the number of new points and to the size of the image,
+    not to the number of all points. The appended points are drawn on top of
+    the other artists of the figure, regardless of their ``zorder``.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import numpy
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+
+        >>> with texplot.theme(use_latex=False):
+        ...     fig, ax = plt.subplots()
+        ...     line, = ax.plot([], [], color='k')
+        ...     ax.set_xlim(0, 1000)
+        ...     ax.set_ylim(-5, 5)
+        ...
+        ...     for i in range(100):
+        ...         x = numpy.arange(10 * i, 10 * (i + 1))
+        ...         texplot.append_data(line, x, numpy.random.randn(10))
+        ...         texplot.draw_appended(fig, 'monitor.png')
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    import matplotlib.image
+
+    if filename is not None:
+        fullpath_filename = os.path.abspath(os.path.expanduser(filename))
+        extension = os.path.splitext(fullpath_filename)[1].lower()
+        if extension not in _RASTER_EXTENSIONS:
+            raise ValueError('"filename" should have one of the extensions: ' +
+                             ', '.join(_RASTER_EXTENSIONS) + '.')
+
+    canvas = fig.canvas
+    if not isinstance(canvas, FigureCanvasAgg):
+        raise RuntimeError('The canvas of the figure should be an Agg ' +
+                           'canvas, but it is "%s".' % type(canvas).__name__)
+
+    lines = [(line, _get_buffer(line)) for line in list(_buffers.keys())
+             if line.figure is fig]
+
+    state = _figure_states.get(fig, None)
+    if (state is None) or (state['canvas']() is not canvas):
+        state = {
+            'canvas': weakref.ref(canvas),
+            'limits': None,
+            'draws': 0,
+            'drawn': None,
+            'mutations': None,
+        }
+        _figure_states[fig] = state
+        canvas.mpl_connect('draw_event', _count_draw)
+
+    # Whether the figure was changed by anything other than appending
+    layout_state = _watch_figure(fig)
+    mutations = layout_state['mutations'] - _appended_mutations.pop(fig, 0)
+    changed = (mutations != state['mutations'])
+
+    axes = {line.axes for line, _ in lines if line.axes is not None}
+    for ax in axes:
+        if ax.get_autoscalex_on() or ax.get_autoscaley_on():
+            ax.autoscale_view()
+
+    # The image of the canvas is replaced when the figure is drawn by another
+    # function, such as savefig.
+    full = changed or (state['drawn'] != state['draws']) or \
+        (state['limits'] != _get_limits(fig))
+
+    with _record('draw_appended', 'draw', full=full):
+        if full:
+            points = sum(buffer['size'] for _, buffer in lines)
+            canvas.draw()
+
+        else:
+            # Autoscaling did not change the limits, so the figure is not
+            # stale
+            for ax in axes:
+                ax.stale = False
+            fig.stale = False
+
+            points = 0
+            renderer = canvas.get_renderer()
+            for line, buffer in lines:
+                if (buffer['size'] > buffer['drawn']) and line.get_visible():
+                    segment = _get_segment(line, buffer)
+                    segment.draw(renderer)
+                    points += buffer['size'] - buffer['drawn']
+
+        for _, buffer in lines:
+            buffer['drawn'] = buffer['size']
+
+    state['limits'] = _get_limits(fig)
+    state['drawn'] = state['draws']
+    state['mutations'] = layout_state['mutations']
+
+    if filename is not None:
+        with _record('write', 'save', filename=fullpath_filename,
+                     format=extension):
+            matplotlib.image.imsave(fullpath_filename,
+                                    numpy.asarray(canvas.buffer_rgba()),
+                                    dpi=fig.dpi)
+
+        if verbose:
+            print('Plot saved to "%s".' % fullpath_filename)
+
+    return {'full': full, 'points': points}
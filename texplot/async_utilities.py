@@ -0,0 +1,301 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import atexit
+import pickle
+import functools
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import matplotlib
+from .plot_utilities import _save_figure, _pickle_figure
+from .lifecycle_utilities import _close_figure
+from .tex_cache_utilities import set_tex_cache, _get_tex_cache_config
+
+__all__ = ['save_plot_async', 'wait_all']
+
+# Background process that writes the files, and the pending writes, guarded
+# by a lock
+_executor = None
+_pending = set()
+_async_lock = threading.Lock()
+
+
+# =================
+# initialize writer
+# =================
+
+def _initialize_writer(tex_cache_kwargs):
+    """
+    Initializes the background process of :func:`save_plot_async`.
+    """
+
+    matplotlib.use('agg')
+
+    if tex_cache_kwargs is not None:
+        set_tex_cache(**tex_cache_kwargs)
+
+
+# ============
+# write figure
+# ============
+
+def _write_figure(fig_data, rc_params, filename, save_kwargs):
+    """
+    Unpickles a figure and saves it with the rcParams of the process that
+    submitted it. This function is executed by the background process.
+    """
+
+    fig = pickle.loads(fig_data)
+
+    with matplotlib.rc_context(rc_params):
+        _save_figure(fig, filename, **save_kwargs)
+
+
+# ============
+# get executor
+# ============
+
+def _get_executor():
+    """
+    Returns the background process pool, and creates it on first use, or
+    again after it is broken, such as when its process died.
+    """
+
+    global _executor
+
+    with _async_lock:
+        if _executor is None:
+            # The spawn start method avoids inheriting the (possibly
+            # interactive) pyplot state of the parent process.
+            mp_context = multiprocessing.get_context('spawn')
+            _executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=mp_context,
+                initializer=_initialize_writer,
+                initargs=(_get_tex_cache_config(), ))
+
+            # wait_all is registered once, for all pools
+            atexit.unregister(wait_all)
+            atexit.register(wait_all)
+
+        return _executor
+
+
+# ==============
+# reset executor
+# ==============
+
+def _reset_executor(executor):
+    """
+    Discards a broken process pool, so that the next write creates a new
+    one. The pool is discarded only if it was not replaced already.
+    """
+
+    global _executor
+
+    with _async_lock:
+        if _executor is executor:
+            _executor = None
+
+    executor.shutdown(wait=False)
+
+
+# ===============
+# save plot async
+# ===============
+
+def save_plot_async(plt, filename, **save_kwargs):
+    """
+    Saves plot in the background without blocking.
+
+    Parameters
+    ----------
+
+    plt : matplotlib.pyplot
+        The pyplot module. The current figure is saved.
+
+    filename : str
+        Name of the file. See :func:`texplot.save_plot`.
+
+    save_kwargs : dict
+        Other arguments of :func:`texplot.save_plot`, such as ``formats``,
+        ``dpi``, or ``rasterize``. If ``close`` is `True`, the figure is
+        closed once its copy is taken.
+
+    Returns
+    -------
+
+    future : concurrent.futures.Future
+        A future that completes when all files are written. Its ``result()``
+        is `None`, or raises the error of :func:`texplot.save_plot`.
+
+    See Also
+    --------
+
+    texplot.save_plot
+    texplot.wait_all
+
+    Notes
+    -----
+
+    A copy of the figure and of the rcParams in effect are taken when this
+    function is called, so the figure can be modified or closed right after,
+    and a theme context can be exited. The files are written in order by a
+    background process, which is started on the first call.
+
+    If the figure cannot be copied (for instance, when it holds a lambda
+    function as a tick formatter), it is saved before this function returns,
+    and the returned future is already completed.
+
+    In asyncio code, the future can be awaited with
+    ``await asyncio.wrap_future(future)``. All pending writes are flushed on
+    exit of the interpreter, or by :func:`texplot.wait_all`.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+
+        >>> fig, ax = plt.subplots()
+        >>> ax.plot([0, 1], [0, 1])
+        >>> future = texplot.save_plot_async(plt, 'line', formats=['pdf'])
+        >>> plt.show()
+
+        >>> texplot.wait_all()
+    """
+
+    fig = plt.gcf()
+
+    # The figure is closed in this process, rather than by the writer
+    save_kwargs = dict(save_kwargs)
+    close = save_kwargs.pop('close', False)
+
+    # Relative paths refer to the current directory at the time of the call
+    filename = os.path.abspath(os.path.expanduser(filename))
+
+    fig_data = _pickle_figure(fig)
+
+    if fig_data is None:
+        # Save synchronously
+        future = concurrent.futures.Future()
+        try:
+            _save_figure(fig, filename, **save_kwargs)
+        except Exception as error:
+            future.set_exception(error)
+        else:
+            future.set_result(None)
+
+        if close:
+            _close_figure(fig)
+
+        return future
+
+    rc_params = {key: value for key, value in matplotlib.rcParams.items()
+                 if key not in ['backend', 'interactive']}
+
+    if close:
+        _close_figure(fig)
+
+    # A pool whose process died is broken, and is replaced by a new one
+    executor = _get_executor()
+    try:
+        future = executor.submit(_write_figure, fig_data, rc_params, filename,
+                                 save_kwargs)
+    except BrokenProcessPool:
+        _reset_executor(executor)
+        executor = _get_executor()
+        future = executor.submit(_write_figure, fig_data, rc_params, filename,
+                                 save_kwargs)
+
+    with _async_lock:
+        _pending.add(future)
+    future.add_done_callback(_discard)
+    future.add_done_callback(functools.partial(_check_broken,
+                                               executor=executor))
+
+    return future
+
+
+# =======
+# discard
+# =======
+
+def _discard(future):
+    """
+    Removes a completed future from the pending writes.
+    """
+
+    with _async_lock:
+        _pending.discard(future)
+
+
+# ============
+# check broken
+# ============
+
+def _check_broken(future, executor):
+    """
+    Discards the process pool of a write that failed since the pool is
+    broken.
+    """
+
+    if (not future.cancelled()) and \
+            isinstance(future.exception(), BrokenProcessPool):
+        _reset_executor(executor)
+
+
+# ========
+# wait all
+# ========
+
+def wait_all(timeout=None):
+    """
+    Waits until all files of :func:`texplot.save_plot_async` are written.
+
+    Parameters
+    ----------
+
+    timeout : float, default=None
+        Maximum number of seconds to wait. If `None`, there is no limit.
+
+    Returns
+    -------
+
+    num_pending : int
+        The number of writes that are not completed when the timeout
+        expires, which is zero if there is no timeout.
+
+    See Also
+    --------
+
+    texplot.save_plot_async
+
+    Notes
+    -----
+
+    The errors of the writes are not raised by this function. They are
+    raised by the ``result()`` method of the futures.
+    """
+
+    with _async_lock:
+        pending = list(_pending)
+
+    _, not_done = concurrent.futures.wait(pending, timeout=timeout)
+
+    return len(not_done)
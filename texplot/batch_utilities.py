@@ -0,0 +1,327 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import time
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .tex_cache_utilities import warm_tex_cache, _get_tex_cache_config
+
+__all__ = ['batch']
+
+
+# =================
+# initialize worker
+# =================
+
+def _initialize_worker(theme_kwargs, tex_cache_kwargs):
+    """
+    Initializes a worker process of :func:`batch`. The non-interactive
+    backend is selected and the theme is applied once for all the figures
+    that this worker renders. If the parent process sets the TeX cache, the
+    worker uses the same cache directory.
+    """
+
+    import matplotlib.pyplot as plt
+    from .plot_utilities import set_theme
+    from .tex_cache_utilities import set_tex_cache
+
+    plt.switch_backend('agg')
+    set_theme(**theme_kwargs)
+
+    if tex_cache_kwargs is not None:
+        set_tex_cache(**tex_cache_kwargs)
+
+
+# ===========
+# plot figure
+# ===========
+
+def _plot_figure(plot_function, filename, save_kwargs):
+    """
+    Plots and saves a single figure. Any exception is caught and returned in
+    the report, so that a failing figure does not terminate the batch.
+    """
+
+    import matplotlib.pyplot as plt
+    from .plot_utilities import save_plot
+    from .lifecycle_utilities import _close_figure
+
+    report = {
+        'filename': filename,
+        'plot_time': None,
+        'save_time': None,
+        'error': None,
+    }
+
+    fig = None
+
+    try:
+        t0 = time.perf_counter()
+        fig, ax = plt.subplots()
+        plot_function(ax)
+        t1 = time.perf_counter()
+        report['plot_time'] = t1 - t0
+
+        save_plot(plt, filename, **save_kwargs)
+        report['save_time'] = time.perf_counter() - t1
+
+    except Exception:
+        report['error'] = traceback.format_exc()
+
+    finally:
+        if fig is not None:
+            _close_figure(fig)
+
+    return report
+
+
+# =====
+# batch
+# =====
+
+def batch(
+        plot_functions,
+        filenames,
+        context="notebook",
+        font_scale=1,
+        style=None,
+        use_latex=None,
+        rc=None,
+        save_kwargs=None,
+        tex_strings=None,
+        workers=None,
+        verbose=False):
+    """
+    Plots and saves a batch of figures across a pool of processes.
+
+    Parameters
+    ----------
+
+    plot_functions : list of callable
+        A list of plotting functions, each with the signature ``f(ax)`` where
+        ``ax`` is a matplotlib axes, such as
+        :func:`texplot.examples.plot_function`. For ``workers`` other than
+        `1`, the functions should be picklable, that is, they should be
+        defined at the top level of a module.
+
+    filenames : list of str
+        A list of filenames, one for each plotting function. See
+        :func:`texplot.save_plot` for how the filenames are interpreted.
+
+    context : {'paper', 'notebook', 'talk', 'poster'}, default='notebook'
+        Theme context. See :func:`texplot.set_theme`.
+
+    font_scale : float, default=1
+        Font scale of the theme. See :func:`texplot.set_theme`.
+
+    style : str, default=None
+        Matplotlib style of the theme. See :func:`texplot.set_theme`.
+
+    use_latex : bool, default=None
+        Whether to render text with LaTeX. See :func:`texplot.set_theme`.
+
+    rc : dict, default=None
+        Extra rcParams of the theme. See :func:`texplot.set_theme`.
+
+    save_kwargs : dict, default=None
+        Extra keyword arguments to pass to :func:`texplot.save_plot`, such as
+        ``dpi`` or ``formats``.
+
+    tex_strings : iterable of str, default=None
+        The strings that the figures render with LaTeX, such as titles and
+        axis labels. If given, they are rendered into the cache before the
+        figures are plotted. See :func:`texplot.warm_tex_cache`.
+
+    workers : int, default=None
+        Number of worker processes. If `None`, the number of CPUs is used. If
+        `1`, the figures are plotted sequentially in the current process.
+
+    verbose : bool, default=False
+        If `True`, a line is printed as each figure finishes.
+
+    Returns
+    -------
+
+    reports : list of dict
+        A list with one report per figure, in the same order as
+        ``plot_functions``. Each report contains the keys ``filename``,
+        ``plot_time`` and ``save_time`` (wall times in seconds, or `None` if
+        the step did not complete), and ``error`` (the formatted traceback
+        if the figure failed, otherwise `None`).
+
+    Notes
+    -----
+
+    Each worker process selects the ``agg`` backend and applies the theme
+    once on startup, rather than once per figure. If
+    :func:`texplot.set_tex_cache` is called before, the workers share its
+    cache of the text rendered with LaTeX. A figure that raises an
+    exception is reported in its ``error`` entry and the rest of the batch
+    continues. If a figure kills its worker process (for instance, by a
+    crash of a compiled extension), the figures that are not finished are
+    rendered again by new workers, and only that figure is reported as
+    failed.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import texplot
+        >>> from texplot.examples import plot_function, plot_lorenz
+
+        >>> reports = texplot.batch([plot_function, plot_lorenz],
+        ...                         ['function.pdf', 'lorenz.pdf'],
+        ...                         font_scale=1.2, use_latex=False)
+        >>> failed = [r for r in reports if r['error'] is not None]
+    """
+
+    plot_functions = list(plot_functions)
+    filenames = list(filenames)
+
+    if len(plot_functions) != len(filenames):
+        raise ValueError('"plot_functions" and "filenames" should have the ' +
+                         'same length.')
+
+    theme_kwargs = {
+        'context': context,
+        'font_scale': font_scale,
+        'style': style,
+        'use_latex': use_latex,
+        'rc': rc,
+    }
+
+    save_kwargs = {} if save_kwargs is None else dict(save_kwargs)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(plot_functions)))
+
+    if tex_strings is not None:
+        # Render the LaTeX strings once, and in parallel, rather than once in
+        # each worker as the figures are saved
+        tex_report = warm_tex_cache(tex_strings, **theme_kwargs)
+        if verbose and (tex_report['renders'] > 0):
+            print('Rendered %d LaTeX strings in %0.3f sec (%d cached).'
+                  % (tex_report['renders'], tex_report['time'],
+                     tex_report['cached']))
+
+    reports = []
+
+    if workers == 1:
+
+        # Plot in the current process
+        from .plot_utilities import theme
+        with theme(**theme_kwargs):
+            for plot_function, filename in zip(plot_functions, filenames):
+                report = _plot_figure(plot_function, filename, save_kwargs)
+                reports.append(report)
+                _print_report(report, verbose)
+
+        return reports
+
+    # The spawn start method avoids inheriting the (possibly interactive)
+    # pyplot state of the parent process.
+    mp_context = multiprocessing.get_context('spawn')
+    initargs = (theme_kwargs, _get_tex_cache_config())
+
+    reports = [None] * len(plot_functions)
+    pending = list(range(len(plot_functions)))
+    isolate = False
+
+    while pending:
+
+        # When a worker process dies, all figures that are not finished fail
+        # with BrokenProcessPool, so the figure that killed the worker is not
+        # known. The unfinished figures are then rendered by a single worker,
+        # in order, so that the first figure that breaks the pool is the one
+        # that killed it.
+        max_workers = 1 if isolate else min(workers, len(pending))
+        unfinished = []
+        crashed = False
+
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 mp_context=mp_context,
+                                 initializer=_initialize_worker,
+                                 initargs=initargs) as executor:
+
+            futures = [executor.submit(_plot_figure, plot_functions[index],
+                                       filenames[index], save_kwargs)
+                       for index in pending]
+
+            for index, future in zip(pending, futures):
+                try:
+                    report = future.result()
+                except BrokenProcessPool:
+                    if (not isolate) or crashed:
+                        unfinished.append(index)
+                        continue
+
+                    # The worker process died while rendering this figure
+                    crashed = True
+                    report = _get_error_report(filenames[index])
+                except Exception:
+                    # The task could not be sent to the worker
+                    report = _get_error_report(filenames[index])
+
+                reports[index] = report
+                _print_report(report, verbose)
+
+        # After the figure that killed the worker is found, the other
+        # figures are rendered in parallel again.
+        isolate = (not isolate) and (len(unfinished) > 0)
+        pending = unfinished
+
+    return reports
+
+
+# ================
+# get error report
+# ================
+
+def _get_error_report(filename):
+    """
+    Returns the report of a figure whose task failed in the process pool,
+    with the traceback of the exception that is being handled.
+    """
+
+    return {
+        'filename': filename,
+        'plot_time': None,
+        'save_time': None,
+        'error': traceback.format_exc(),
+    }
+
+
+# ============
+# print report
+# ============
+
+def _print_report(report, verbose):
+    """
+    Prints a one-line summary of the report of a figure.
+    """
+
+    if not verbose:
+        return
+
+    if report['error'] is None:
+        print('Plot "%s": plot %0.3f sec, save %0.3f sec.'
+              % (report['filename'], report['plot_time'],
+                 report['save_time']))
+    else:
+        print('Plot "%s" failed:\n%s' % (report['filename'],
+                                         report['error']))
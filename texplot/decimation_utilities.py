@@ -0,0 +1,161 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import contextlib
+import numpy
+
+__all__ = ['decimate_lines']
+
+
+# =============
+# min max index
+# =============
+
+def _min_max_index(columns, y):
+    """
+    Returns the indices of the points to keep from a line whose points fall
+    into the given pixel columns. The columns should be sorted.
+
+    For each pixel column, the first and last points, and the points with the
+    minimum and maximum of y are kept (also known as the M4 algorithm). The
+    line drawn through these points covers the same pixels as the line drawn
+    through all points.
+    """
+
+    num_points = columns.size
+
+    # First and last index of each run of points in the same column
+    starts = numpy.flatnonzero(numpy.r_[True, columns[1:] != columns[:-1]])
+    ends = numpy.r_[starts[1:], num_points] - 1
+
+    # Group id of each point
+    lengths = ends - starts + 1
+    group = numpy.repeat(numpy.arange(starts.size), lengths)
+
+    # First index of the minimum and maximum of y in each group
+    indices = [starts, ends]
+    for reduce in [numpy.minimum, numpy.maximum]:
+        extremum = reduce.reduceat(y, starts)
+        candidates = numpy.flatnonzero(y == extremum[group])
+        _, first = numpy.unique(group[candidates], return_index=True)
+        indices.append(candidates[first])
+
+    return numpy.unique(numpy.concatenate(indices))
+
+
+# =============
+# decimate line
+# =============
+
+def _decimate_line(line, scale):
+    """
+    Decimates the data of a line in place, and returns the original data, or
+    `None` if the line is not decimated.
+
+    ``scale`` is the ratio of the output dots per inch to the figure dots per
+    inch, which maps the display coordinates to the output pixels.
+    """
+
+    # Markers have to be drawn for every point
+    if line.get_marker() not in [None, 'None', 'none', '', ' ']:
+        return None
+
+    x, y = line.get_data(orig=True)
+    x_ = numpy.asarray(line.convert_xunits(x), dtype=float)
+    y_ = numpy.asarray(line.convert_yunits(y), dtype=float)
+
+    # Each pixel column keeps up to four points
+    if (x_.ndim != 1) or (x_.shape != y_.shape) or (x_.size < 8):
+        return None
+
+    # Gaps (nan) in the line would be closed by the decimation
+    if not (numpy.all(numpy.isfinite(x_)) and numpy.all(numpy.isfinite(y_))):
+        return None
+
+    # Pixel columns at the output resolution
+    x_display = line.get_transform().transform(
+        numpy.column_stack([x_, numpy.zeros_like(x_)]))[:, 0]
+    columns = numpy.floor(x_display * scale)
+
+    # The columns should be monotonic, as for a time series
+    diff = numpy.diff(columns)
+    if numpy.all(diff <= 0):
+        columns = -columns
+    elif not numpy.all(diff >= 0):
+        return None
+
+    index = _min_max_index(columns, y_)
+    if index.size >= x_.size:
+        return None
+
+    line.set_data(numpy.asarray(x)[index], numpy.asarray(y)[index])
+
+    return x, y
+
+
+# ==============
+# decimate lines
+# ==============
+
+@contextlib.contextmanager
+def decimate_lines(fig, dpi):
+    """
+    Context manager that decimates the lines of a figure for rendering at the
+    given dots per inch, and restores the original data on exit.
+
+    Only the lines without markers, with finite data, and with monotonic
+    x-coordinates in display space (such as time series) are decimated. The
+    figure limits should be final before entering the context.
+
+    Yields a dictionary with the keys ``lines`` (the number of decimated
+    lines), ``points`` (the number of points of the decimated lines before
+    decimation), and ``removed`` (the number of removed points).
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.lines import Line2D
+
+    # Resolve the layout (if any) and the data limits, so that the
+    # transforms map the data to their final display location.
+    if fig.get_layout_engine() is not None:
+        fig.draw_without_rendering()
+
+    for ax in fig.get_axes():
+        ax.get_xlim()
+        ax.get_ylim()
+
+    if dpi in [None, 'figure']:
+        scale = 1.0
+    else:
+        scale = float(dpi) / fig.dpi
+
+    stats = {'lines': 0, 'points': 0, 'removed': 0}
+    originals = []
+
+    try:
+        for line in fig.findobj(Line2D):
+            original = _decimate_line(line, scale)
+            if original is None:
+                continue
+
+            originals.append((line, original))
+            num_points = numpy.size(original[0])
+            stats['lines'] += 1
+            stats['points'] += num_points
+            stats['removed'] += num_points - numpy.size(line.get_xdata())
+
+        yield stats
+
+    finally:
+        for line, (x, y) in originals:
+            line.set_data(x, y)
@@ -28,6 +28,10 @@ def is_notebook():
         # Any modern front-end built on ipykernel (Colab, Kaggle, VS Code)
         return True
 
+    if "IPython" not in sys.modules:
+        # Any IPython shell imports IPython first. Avoid importing it here.
+        return False
+
     try:
         from IPython import get_ipython
     except ImportError:
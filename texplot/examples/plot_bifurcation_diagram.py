@@ -20,32 +20,82 @@ __all__ = ['plot_bifurcation_diagram']
 # plot bifurcation diagram
 # ========================
 
-def plot_bifurcation_diagram(ax):
+def plot_bifurcation_diagram(
+        ax,
+        resolution=10000,
+        iterations=150,
+        burn_in=9850,
+        density=False,
+        bins=(1800, 800)):
     """
     Plots bifurcation diagram for Logistic map.
+
+    Parameters
+    ----------
+
+    ax : matplotlib.axes.Axes
+        Axes to plot on.
+
+    resolution : int, default=10000
+        Number of values of the rate of reproduction :math:`r` in the interval
+        :math:`[2.5, 4]`.
+
+    iterations : int, default=150
+        Number of iterates of the map that are plotted for each :math:`r`.
+
+    burn_in : int, default=9850
+        Number of iterates of the map that are discarded before the plotted
+        iterates, so that the transients have decayed.
+
+    density : bool, default=False
+        If `False`, all ``resolution * iterations`` points are plotted as a
+        single artist. If `True`, the points are binned into a 2D histogram
+        which is shown as a raster image, so that the size of the output
+        depends on ``bins`` rather than the number of points.
+
+    bins : tuple, default=(1800, 800)
+        Number of bins along :math:`r` and :math:`x` of the 2D histogram when
+        ``density`` is `True`. The default corresponds to 200 dots per inch.
     """
 
     fig = ax.figure
     fig.set_size_inches(9, 4)
 
     # Parameters for the bifurcation diagram
-    r_values = numpy.linspace(2.5, 4.0, 10000)
-    iterations = 10000
-    last_iterations = 150
+    r_min, r_max = 2.5, 4.0
+    r_values = numpy.linspace(r_min, r_max, resolution)
 
     # Initialize the array to store the values of x for plotting
     x = 0.1 * numpy.ones(r_values.size)
+    x_values = numpy.empty((iterations, resolution), dtype=float)
+
+    # Discard the transient iterates
+    for i in range(burn_in):
+        x = r_values * x * (1 - x)
 
     # Compute the bifurcation diagram
     for i in range(iterations):
         x = r_values * x * (1 - x)
-        if i >= (iterations - last_iterations):
-            ax.plot(r_values, x, ',w', alpha=0.13)
+        x_values[i, :] = x
+
+    if density:
+        # Bin the points into a raster image with a single draw call
+        hist, _, _ = numpy.histogram2d(
+            numpy.broadcast_to(r_values, x_values.shape).ravel(),
+            x_values.ravel(), bins=bins, range=[[r_min, r_max], [0, 1]])
+
+        ax.imshow(numpy.log1p(hist.T), origin='lower', aspect='auto',
+                  extent=[r_min, r_max, 0, 1], cmap='gray',
+                  interpolation='nearest')
+    else:
+        # Plot all points as one artist
+        r_points = numpy.broadcast_to(r_values, x_values.shape)
+        ax.plot(r_points.ravel(), x_values.ravel(), ',w', alpha=0.13)
 
     ax.set_title('Bifurcation Diagram of the Logistic Map')
     ax.set_xlabel(r'Rate of Reproduction $(r)$')
     ax.set_ylabel(r'Population Ratio $(x)$')
-    ax.set_xlim([2.5, 4.0])
+    ax.set_xlim([r_min, r_max])
     ax.set_ylim([0, 1])
 
     fig.tight_layout()
@@ -11,8 +11,33 @@
 # Imports
 # =======
 
+import numpy
+
 __all__ = ['plot_lorenz']
 
+# Butcher tableau of the Runge-Kutta-Fehlberg (RK45) method
+_RKF45_C = numpy.array([0.0, 1/4, 3/8, 12/13, 1.0, 1/2])
+_RKF45_A = numpy.array([
+    [0.0, 0.0, 0.0, 0.0, 0.0],
+    [1/4, 0.0, 0.0, 0.0, 0.0],
+    [3/32, 9/32, 0.0, 0.0, 0.0],
+    [1932/2197, -7200/2197, 7296/2197, 0.0, 0.0],
+    [439/216, -8.0, 3680/513, -845/4104, 0.0],
+    [-8/27, 2.0, -3544/2565, 1859/4104, -11/40]])
+_RKF45_B4 = numpy.array([25/216, 0.0, 1408/2565, 2197/4104, -1/5, 0.0])
+_RKF45_B5 = numpy.array([16/135, 0.0, 6656/12825, 28561/56430, -9/50, 2/55])
+
+# Linear and quadratic parts of the Lorenz system for sigma, rho, beta = 10,
+# 28, 8/3 (see _lorenz_numpy)
+_LORENZ_LINEAR = numpy.array([
+    [-10.0, 28.0, 0.0],
+    [10.0, -1.0, 0.0],
+    [0.0, 0.0, -8/3]])
+_LORENZ_QUADRATIC = numpy.array([
+    [0.0, 0.0, 0.0],
+    [0.0, 0.0, 1.0],
+    [0.0, -1.0, 0.0]])
+
 
 # ===
 # add
@@ -146,6 +171,145 @@ def _solve_ivp(f, t_span, y0, tol=1e-6):
     return t_values, y_values
 
 
+# ===============
+# solve ivp numpy
+# ===============
+
+def _solve_ivp_numpy(f, t_span, y0, tol=1e-6, t_eval=None):
+    """
+    An implementation of the RK45 method with adaptive step size for solving
+    systems of ODEs, where the state is kept in preallocated numpy arrays.
+
+    Parameters:
+        f: Function representing the ODE system (dy/dt = f(t, y)). It should
+            accept and return numpy arrays of the same shape as y0.
+        t_span: Tuple of (start, end) times
+        y0: Initial condition, an array of shape (n, ) for a system of n
+            ODEs, or an array of shape (m, n) for a batch of m initial
+            conditions that are solved at once (with a common step size).
+        tol: Tolerance for adaptive step size control (default is 1e-6)
+        t_eval: Times at which the solution is returned (dense output). If
+            None, the solution is returned at the computed points.
+
+    Returns:
+        t_values: Array of time values at computed points (or t_eval)
+        y_values: Array of solution values of the shape (len(t_values), ) +
+            y0.shape
+
+    Notes:
+        This is the same method as _solve_ivp, but each stage is computed by
+        a matrix product of the Butcher tableau and the stages of the step.
+        The dense output uses cubic Hermite interpolation between the
+        computed points.
+    """
+
+    t0, tf = float(t_span[0]), float(t_span[1])
+    y0 = numpy.asarray(y0, dtype=float)
+    shape = y0.shape
+
+    # Stages of a step, each flattened to a row
+    num_stages = _RKF45_C.size
+    k = numpy.empty((num_stages, y0.size), dtype=float)
+    b_error = _RKF45_B4 - _RKF45_B5
+
+    # Rows of the tableau, and the nodes as Python floats (arithmetic with
+    # numpy scalars is slow)
+    a_rows = [_RKF45_A[i, :i] for i in range(num_stages)]
+    c = _RKF45_C.tolist()
+
+    # Preallocated output, which is grown by doubling when it is full
+    capacity = 1024
+    t_values = numpy.empty((capacity, ), dtype=float)
+    y_values = numpy.empty((capacity, y0.size), dtype=float)
+    dy_values = numpy.empty((capacity, y0.size), dtype=float)
+    size = 1
+
+    t = t0
+    y = y0.ravel().copy()
+    t_values[0] = t
+    y_values[0] = y
+
+    h = min(0.1, tf-t0)  # Initial step size
+
+    # Derivative at the current point, which is also the first stage
+    dy = f(t, y.reshape(shape)).reshape(-1)
+
+    while t < tf:
+        if t + h > tf:
+            h = tf - t
+
+        k[0] = dy
+        for i in range(1, num_stages):
+            y_stage = y + h * (a_rows[i] @ k[:i])
+            k[i] = f(t + c[i] * h, y_stage.reshape(shape)).reshape(-1)
+
+        error = float(numpy.abs(b_error @ k).max())
+
+        # Adjust the step size
+        if error < tol:
+            dy_values[size-1] = dy
+
+            t += h
+            y = y + h * (_RKF45_B5 @ k)
+            dy = f(t, y.reshape(shape)).reshape(-1)
+
+            if size == capacity:
+                capacity *= 2
+                t_values = numpy.resize(t_values, (capacity, ))
+                y_values = numpy.resize(y_values, (capacity, y0.size))
+                dy_values = numpy.resize(dy_values, (capacity, y0.size))
+
+            t_values[size] = t
+            y_values[size] = y
+            size += 1
+
+            if error == 0:
+                h *= 1.5
+            else:
+                h *= min(1.5, (tol / error) ** 0.25)  # Safely increase step
+        else:
+            h *= max(0.5, (tol / error) ** 0.25)  # Reduce step size
+
+    dy_values[size-1] = dy
+
+    t_values = t_values[:size]
+    y_values = y_values[:size]
+    dy_values = dy_values[:size]
+
+    if t_eval is not None:
+        t_eval = numpy.asarray(t_eval, dtype=float)
+        y_values = _hermite_interpolate(t_eval, t_values, y_values,
+                                        dy_values)
+        t_values = t_eval
+
+    return t_values, y_values.reshape((t_values.size, ) + shape)
+
+
+# ===================
+# hermite interpolate
+# ===================
+
+def _hermite_interpolate(t, t_values, y_values, dy_values):
+    """
+    Cubic Hermite interpolation of a solution at the times t, given the
+    solution and its derivatives at the computed points t_values.
+    """
+
+    index = numpy.searchsorted(t_values, t, side='right') - 1
+    index = numpy.clip(index, 0, t_values.size - 2)
+
+    h = (t_values[index+1] - t_values[index])[:, numpy.newaxis]
+    s = (t - t_values[index])[:, numpy.newaxis] / h
+
+    h00 = (1 + 2*s) * (1 - s)**2
+    h10 = s * (1 - s)**2
+    h01 = s**2 * (3 - 2*s)
+    h11 = s**2 * (s - 1)
+
+    return h00 * y_values[index] + h10 * h * dy_values[index] + \
+        h01 * y_values[index+1] + h11 * h * dy_values[index+1]
+
+
 # ======
 # lorenz
 # ======
@@ -164,13 +328,42 @@ def _lorenz(t, x):
     return dx
 
 
+# ============
+# lorenz numpy
+# ============
+
+def _lorenz_numpy(t, x):
+    """
+    Lorenz dynamical system, where x is an array of the shape (3, ) or a
+    batch of states of the shape (m, 3).
+
+    The right-hand side is written as a linear part, x @ L, plus a quadratic
+    part, x_0 * (x @ Q) = x_0 * (0, -x_2, x_1).
+    """
+
+    return x @ _LORENZ_LINEAR + x[..., :1] * (x @ _LORENZ_QUADRATIC)
+
+
 # ===========
 # plot lorenz
 # ===========
 
-def plot_lorenz(ax):
+def plot_lorenz(ax, solver='python'):
     """
     Plots the x variable of the Lorentx dynamical system.
+
+    Parameters
+    ----------
+
+    ax : matplotlib.axes.Axes
+        Axes to plot on.
+
+    solver : {'python', 'numpy'}, default='python'
+        The implementation of the RK45 solver. ``'python'`` uses Python lists
+        only, and ``'numpy'`` keeps the state in numpy arrays. The numpy
+        solver is faster for a batch of initial conditions, but not for the
+        single trajectory of this plot. Since the system is chaotic, the two
+        solvers, which take slightly different steps, diverge at late times.
     """
 
     fig = ax.figure
@@ -178,10 +371,21 @@ def plot_lorenz(ax):
 
     t_span = [0, 90]
     y0 = [1, 1, 1]
-    t, y = _solve_ivp(_lorenz, t_span, y0)
 
-    # Get the first compoent of the vector
-    y_0 = [y_[0] for y_ in y]
+    if solver == 'numpy':
+        t, y = _solve_ivp_numpy(_lorenz_numpy, t_span, y0)
+
+        # Get the first compoent of the vector
+        y_0 = y[:, 0]
+
+    elif solver == 'python':
+        t, y = _solve_ivp(_lorenz, t_span, y0)
+
+        # Get the first compoent of the vector
+        y_0 = [y_[0] for y_ in y]
+
+    else:
+        raise ValueError('"solver" should be either "numpy" or "python".')
 
     ax.plot(t, y_0, label='x(t)', color='k')
     ax.set_xlim(t[0], t[-1])
@@ -0,0 +1,314 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import json
+import types
+import hashlib
+import tempfile
+import threading
+import numpy
+import matplotlib
+
+__all__ = ['fingerprint_figure', 'get_unchanged_files', 'update_manifest']
+
+# Name of the manifest file in each output directory
+_MANIFEST_FILENAME = '.texplot_manifest.json'
+
+# Serializes the updates of the manifests by the threads of this process
+_manifest_lock = threading.Lock()
+
+# Attributes of the artists that are caches or bookkeeping, and do not
+# affect the rendered output
+_SKIPPED_ATTRIBUTES = {
+    'stale', '_stale', 'stale_callback', 'callbacks', '_callbacks',
+    '_remove_method', '_parents', '_invalid', '_invalidx', '_invalidy',
+    '_path_effects_renderer', '_cachedRenderer', '_renderer', '_mouseover',
+    '_subplotspec_cache', '_xy_cache', 'number', '_transformed_path',
+    '_tightbbox', '_cached', '_bbox_patch_cache', '_button_pick_id',
+    '_scroll_pick_id', '_canvas_callbacks', '_mouse_key_ids', 'canvas',
+    '_number',
+}
+
+# Attributes of lines that are recomputed from their original data when they
+# are drawn
+_LINE_CACHE_ATTRIBUTES = {'_x', '_y', '_xy', '_path', '_x_filled'}
+
+# Objects nested deeper than this within an artist are only identified by
+# their type
+_MAX_DEPTH = 6
+
+
+# ==========
+# hash value
+# ==========
+
+def _hash_value(digest, value, depth, visited):
+    """
+    Updates the digest with a value of an artist attribute. Nested artists
+    are skipped, since each artist of the figure is hashed separately.
+    """
+
+    if (value is None) or isinstance(value, (bool, int, float, complex,
+                                             str, bytes)):
+        digest.update(repr(value).encode('utf-8'))
+
+    elif isinstance(value, numpy.ma.MaskedArray):
+        _hash_value(digest, value.data, depth, visited)
+        _hash_value(digest, numpy.ma.getmaskarray(value), depth, visited)
+
+    elif isinstance(value, numpy.ndarray):
+        digest.update(('%s%s' % (value.dtype, value.shape)).encode('utf-8'))
+        if value.dtype == object:
+            for item in value.ravel():
+                _hash_value(digest, item, depth, visited)
+        else:
+            digest.update(numpy.ascontiguousarray(value).tobytes())
+
+    elif isinstance(value, numpy.generic):
+        digest.update(repr(value.item()).encode('utf-8'))
+
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = sorted(value, key=repr) if isinstance(
+            value, (set, frozenset)) else value
+        digest.update(('%s%d' % (type(value).__name__,
+                                 len(items))).encode('utf-8'))
+        for item in items:
+            _hash_value(digest, item, depth, visited)
+
+    elif isinstance(value, dict):
+        digest.update(('dict%d' % len(value)).encode('utf-8'))
+        for key in sorted(value, key=repr):
+            if key in _SKIPPED_ATTRIBUTES:
+                continue
+            _hash_value(digest, key, depth, visited)
+            _hash_value(digest, value[key], depth, visited)
+
+    else:
+        _hash_object(digest, value, depth, visited)
+
+
+# ===========
+# hash object
+# ===========
+
+def _hash_object(digest, value, depth, visited):
+    """
+    Updates the digest with an object that is not a builtin container, such
+    as a path, a transform, a function, or a tick formatter.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.artist import Artist
+    from matplotlib.path import Path
+    from matplotlib.transforms import BboxBase, TransformNode, Affine2DBase
+
+    if isinstance(value, Artist):
+        # Hashed separately as an artist of the figure
+        digest.update(type(value).__qualname__.encode('utf-8'))
+
+    elif isinstance(value, Path):
+        _hash_value(digest, value.vertices, depth, visited)
+        _hash_value(digest, value.codes, depth, visited)
+
+    elif isinstance(value, BboxBase):
+        _hash_value(digest, value.get_points(), depth, visited)
+
+    elif isinstance(value, Affine2DBase):
+        _hash_value(digest, value.get_matrix(), depth, visited)
+
+    elif isinstance(value, TransformNode):
+        # Non-affine transforms are determined by the artists and scales
+        # that create them
+        digest.update(type(value).__qualname__.encode('utf-8'))
+
+    elif isinstance(value, (types.FunctionType, types.MethodType)):
+        function = getattr(value, '__func__', value)
+        digest.update(('%s.%s' % (function.__module__,
+                                  function.__qualname__)).encode('utf-8'))
+        code = getattr(function, '__code__', None)
+        if code is not None:
+            digest.update(code.co_code)
+            _hash_value(digest, code.co_consts, depth, visited)
+
+    elif (depth < _MAX_DEPTH) and hasattr(value, '__dict__') and \
+            (id(value) not in visited):
+        # Other objects, such as formatters, locators, colormaps, norms and
+        # font properties
+        visited.add(id(value))
+        digest.update(type(value).__qualname__.encode('utf-8'))
+        _hash_value(digest, vars(value), depth + 1, visited)
+
+    else:
+        digest.update(type(value).__qualname__.encode('utf-8'))
+
+
+# ==================
+# fingerprint figure
+# ==================
+
+def fingerprint_figure(fig, options=None):
+    """
+    Returns a hash of the content of a figure, the rcParams in effect, and
+    the given options (such as the arguments of ``savefig``).
+
+    The figures that are plotted by the same code with the same data and
+    theme have the same fingerprint in any process. The figure is drawn
+    (without rendering) first, so that the limits, ticks, and layout are
+    resolved, and the fingerprint does not depend on whether the figure was
+    drawn before.
+    """
+
+    fig.draw_without_rendering()
+
+    digest = hashlib.sha256()
+    visited = set()
+
+    _hash_value(digest, matplotlib.__version__, 0, visited)
+
+    rc_params = {key: value for key, value in matplotlib.rcParams.items()
+                 if key not in ['backend', 'interactive']}
+    _hash_value(digest, rc_params, 0, visited)
+    _hash_value(digest, options, 0, visited)
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.lines import Line2D
+
+    for artist in fig.findobj():
+        attributes = vars(artist)
+        if isinstance(artist, Line2D):
+            attributes = {key: value for key, value in attributes.items()
+                          if key not in _LINE_CACHE_ATTRIBUTES}
+
+        digest.update(type(artist).__qualname__.encode('utf-8'))
+        _hash_value(digest, attributes, 0, visited)
+
+    return digest.hexdigest()
+
+
+# =============
+# read manifest
+# =============
+
+def _read_manifest(directory):
+    """
+    Returns the manifest of a directory, or an empty dictionary if it does
+    not exist or cannot be read.
+    """
+
+    try:
+        with open(os.path.join(directory, _MANIFEST_FILENAME), 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(manifest, dict):
+        return {}
+
+    return manifest
+
+
+# =========
+# file stat
+# =========
+
+def _file_stat(filename):
+    """
+    Returns the size and modification time of a file, or `None` if it does
+    not exist.
+    """
+
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# ===================
+# get unchanged files
+# ===================
+
+def get_unchanged_files(fullpath_filenames, fingerprint):
+    """
+    Returns the subset of the files that the manifests of their directories
+    record with the same fingerprint, and that were not modified since they
+    were written.
+    """
+
+    manifests = {}
+    unchanged = []
+
+    for fullpath_filename in fullpath_filenames:
+        directory, basename = os.path.split(fullpath_filename)
+        if directory not in manifests:
+            manifests[directory] = _read_manifest(directory)
+
+        entry = manifests[directory].get(basename, None)
+        if not isinstance(entry, dict):
+            continue
+
+        if (entry.get('fingerprint', None) == fingerprint) and \
+                (entry.get('stat', None) == _file_stat(fullpath_filename)):
+            unchanged.append(fullpath_filename)
+
+    return unchanged
+
+
+# ===============
+# update manifest
+# ===============
+
+def update_manifest(fullpath_filenames, fingerprint):
+    """
+    Records the fingerprint of the written files in the manifests of their
+    directories.
+
+    The manifest is read again just before it is replaced, and it is replaced
+    atomically, so that concurrent processes that save to the same directory
+    only lose each other's entries in a narrow window, in which case the
+    files are written again on the next run. The threads of this process
+    update the manifests one at a time.
+    """
+
+    directories = {}
+    for fullpath_filename in fullpath_filenames:
+        directory, basename = os.path.split(fullpath_filename)
+        directories.setdefault(directory, []).append(
+            (basename, fullpath_filename))
+
+    with _manifest_lock:
+        for directory, files in directories.items():
+            manifest = _read_manifest(directory)
+
+            for basename, fullpath_filename in files:
+                manifest[basename] = {
+                    'fingerprint': fingerprint,
+                    'stat': _file_stat(fullpath_filename),
+                }
+
+            file_descriptor, temp_filename = tempfile.mkstemp(
+                dir=directory, prefix=_MANIFEST_FILENAME, suffix='.tmp')
+
+            try:
+                with os.fdopen(file_descriptor, 'w') as file:
+                    json.dump(manifest, file, indent=1, sort_keys=True)
+                os.replace(temp_filename, os.path.join(directory,
+                                                       _MANIFEST_FILENAME))
+            except OSError:
+                # The manifest is only an optimization
+                try:
+                    os.remove(temp_filename)
+                except OSError:
+                    pass
@@ -0,0 +1,210 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+__all__ = ['get_latex_info', 'reset_latex_info']
+
+# LaTeX packages that are loaded in the preamble of the theme
+_LATEX_PACKAGES = ['amsmath', 'amsfonts']
+
+# Process-wide cache of the LaTeX probe, guarded by a lock
+_latex_info = None
+_latex_info_lock = threading.Lock()
+
+
+# =================
+# get latex version
+# =================
+
+def _get_latex_version(executable):
+    """
+    Returns the first line of ``latex --version``, or `None` if it fails.
+    """
+
+    try:
+        result = subprocess.run([executable, '--version'],
+                                capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    lines = result.stdout.strip().splitlines()
+    if (result.returncode != 0) or (len(lines) == 0):
+        return None
+
+    return lines[0]
+
+
+# ==================
+# compile latex test
+# ==================
+
+def _compile_latex_test(executable, package):
+    """
+    Returns `True` if a small document that loads the given package compiles
+    with the latex executable.
+    """
+
+    document = '\n'.join([
+        r'\documentclass{article}',
+        r'\usepackage{%s}' % package,
+        r'\begin{document}',
+        r'$x$',
+        r'\end{document}',
+        ''])
+
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'probe.tex'), 'w') as file:
+            file.write(document)
+
+        try:
+            result = subprocess.run(
+                [executable, '-interaction=nonstopmode', '-halt-on-error',
+                 'probe.tex'], cwd=directory, capture_output=True,
+                timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+    return result.returncode == 0
+
+
+# ===========
+# probe latex
+# ===========
+
+def _probe_latex():
+    """
+    Returns the cached LaTeX probe, and runs the probe if it is not cached.
+    The returned dictionary is shared and should not be modified.
+    """
+
+    global _latex_info
+
+    # Fast path without the lock, once the probe is cached
+    latex_info = _latex_info
+    if latex_info is not None:
+        return latex_info
+
+    with _latex_info_lock:
+        if _latex_info is None:
+
+            executable = shutil.which('latex')
+
+            if executable is None:
+                version = None
+                packages = {package: False for package in _LATEX_PACKAGES}
+            else:
+                version = _get_latex_version(executable)
+                packages = {
+                    package: _compile_latex_test(executable, package)
+                    for package in _LATEX_PACKAGES}
+
+            available = (executable is not None) and all(packages.values())
+
+            _latex_info = {
+                'executable': executable,
+                'version': version,
+                'packages': packages,
+                'available': available,
+            }
+
+        return _latex_info
+
+
+# ==============
+# get latex info
+# ==============
+
+def get_latex_info(refresh=False):
+    """
+    Returns the capabilities of the LaTeX installation.
+
+    The LaTeX installation is probed once per process and the result is
+    cached, so that the themes do not search the ``PATH`` each time they are
+    created.
+
+    Parameters
+    ----------
+
+    refresh : bool, default=False
+        If `True`, the cache is discarded and LaTeX is probed again. This is
+        the same as calling :func:`texplot.reset_latex_info` first.
+
+    Returns
+    -------
+
+    latex_info : dict
+        A dictionary with the following keys:
+
+        * ``executable``: the path of the ``latex`` executable, or `None` if
+          it is not found.
+        * ``version``: the first line of ``latex --version``, or `None`.
+        * ``packages``: a dictionary that maps each of the packages
+          ``amsmath`` and ``amsfonts`` to whether a document that loads it
+          compiles.
+        * ``available``: `True` if the executable is found and all packages
+          compile.
+
+    See Also
+    --------
+
+    texplot.reset_latex_info
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import texplot
+        >>> texplot.get_latex_info()
+        {'executable': '/usr/bin/latex',
+         'version': 'pdfTeX 3.141592653-2.6-1.40.25 (TeX Live 2023/Debian)',
+         'packages': {'amsmath': True, 'amsfonts': True},
+         'available': True}
+    """
+
+    if refresh:
+        reset_latex_info()
+
+    latex_info = dict(_probe_latex())
+    latex_info['packages'] = dict(latex_info['packages'])
+
+    return latex_info
+
+
+# ================
+# reset latex info
+# ================
+
+def reset_latex_info():
+    """
+    Discards the cached LaTeX probe.
+
+    The next theme or call to :func:`texplot.get_latex_info` probes the LaTeX
+    installation again. This is useful if LaTeX is installed, or the ``PATH``
+    is changed, after the probe is cached.
+
+    See Also
+    --------
+
+    texplot.get_latex_info
+    """
+
+    global _latex_info
+
+    with _latex_info_lock:
+        _latex_info = None
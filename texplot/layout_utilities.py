@@ -0,0 +1,298 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import weakref
+import threading
+import contextlib
+import matplotlib
+from .profile_utilities import _record
+
+__all__ = ['get_tight_bbox']
+
+# The mutation counters and cached tight bboxes of the figures, which are
+# released with the figures
+_figure_states = weakref.WeakKeyDictionary()
+
+# Whether the current thread is drawing a figure for texplot
+_local = threading.local()
+
+
+# ===============
+# get render lock
+# ===============
+
+def _get_render_lock():
+    """
+    Returns the lock that matplotlib holds while drawing any figure, since
+    the font and mathtext caches are shared by the figures, or `None` if it
+    is not available.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.figure import Figure
+
+    return getattr(Figure, '_render_lock', None)
+
+
+# ==========
+# is drawing
+# ==========
+
+def _is_drawing():
+    """
+    Returns `True` if the current thread is drawing a figure for texplot. The
+    artists that are updated during a draw, such as the ticks, mark the
+    figure as stale, which is not a change of the figure.
+    """
+
+    return getattr(_local, 'drawing', 0) > 0
+
+
+# =======
+# drawing
+# =======
+
+@contextlib.contextmanager
+def _drawing():
+    """
+    Context manager within which the current thread draws a figure, whose
+    changes are not counted by :func:`_watch_figure`.
+    """
+
+    _local.drawing = getattr(_local, 'drawing', 0) + 1
+
+    try:
+        yield
+    finally:
+        _local.drawing -= 1
+
+
+# ============
+# watch figure
+# ============
+
+def _watch_figure(fig):
+    """
+    Returns the state of a figure, and installs a stale callback on the
+    figure that counts its changes. Each change of an artist marks its
+    figure as stale, which calls the stale callback of the figure.
+    """
+
+    state = _figure_states.get(fig, None)
+    if (state is not None) and (fig.stale_callback is state['callback']):
+        return state
+
+    # The callback of pyplot, which redraws interactive figures
+    stale_callback = fig.stale_callback
+
+    state = {
+        'mutations': 0,
+        'suspended': 0,
+        'bboxes': {},
+        'mutation': None,
+        'callback': None,
+    }
+
+    # --------
+    # callback
+    # --------
+
+    def callback(artist, value):
+        """
+        Counts the changes of the figure, and calls the original callback.
+        """
+
+        if (state['suspended'] == 0) and (not _is_drawing()):
+            state['mutations'] += 1
+
+        if stale_callback is not None:
+            stale_callback(artist, value)
+
+    state['callback'] = callback
+    fig.stale_callback = callback
+    _figure_states[fig] = state
+
+    return state
+
+
+# =================
+# suspend mutations
+# =================
+
+@contextlib.contextmanager
+def _suspend_mutations(fig):
+    """
+    Context manager within which the changes of a figure are not counted,
+    which is used when texplot changes a figure temporarily to save it.
+    """
+
+    state = _watch_figure(fig)
+    state['suspended'] += 1
+
+    try:
+        yield
+    finally:
+        state['suspended'] -= 1
+
+
+# =====================
+# disable layout engine
+# =====================
+
+@contextlib.contextmanager
+def _disable_layout_engine(fig):
+    """
+    Context manager that removes the layout engine of a figure, after its
+    layout is resolved by :func:`get_tight_bbox`.
+
+    With a layout engine, even the placeholder that ``fig.tight_layout()``
+    leaves, ``savefig`` draws the figure once more to execute the layout
+    before rendering it.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.layout_engine import PlaceHolderLayoutEngine
+
+    layout_engine = fig.get_layout_engine()
+
+    state = _figure_states.get(fig, None)
+    laid_out = (state is not None) and (len(state['bboxes']) > 0) and \
+        (state['mutation'] == state['mutations'])
+
+    if (layout_engine is None) or not \
+            (laid_out or isinstance(layout_engine, PlaceHolderLayoutEngine)):
+        yield
+        return
+
+    fig._layout_engine = None
+    try:
+        yield
+    finally:
+        fig._layout_engine = layout_engine
+
+
+# ==============
+# get tight bbox
+# ==============
+
+def get_tight_bbox(fig, bbox_extra_artists=None, pad_inches=0.1, dpi=None):
+    """
+    Returns the tight bounding box of a figure, which is computed once and
+    cached until the figure is changed.
+
+    Parameters
+    ----------
+
+    fig : matplotlib.figure.Figure
+        The figure.
+
+    bbox_extra_artists : list, default=None
+        A list of extra artists to include in the bounding box.
+
+    pad_inches : float, default=0.1
+        Amount of padding in inches around the bounding box. If `None`,
+        ``rcParams['savefig.pad_inches']`` is used.
+
+    dpi : float, default=None
+        The dots per inch of the file that the bounding box is used for,
+        since the extents of the texts depend on it. If `None`, the dpi of
+        the figure is used.
+
+    Returns
+    -------
+
+    bbox : matplotlib.transforms.Bbox
+        The padded bounding box in inches, which can be passed as the
+        ``bbox_inches`` argument of ``savefig`` for any file format.
+
+    See Also
+    --------
+
+    texplot.save_plot
+
+    Notes
+    -----
+
+    Computing the tight bounding box draws the figure (without rendering) to
+    resolve its layout and the extents of its texts. ``savefig`` with
+    ``bbox_inches='tight'`` repeats this draw for each file, while
+    :func:`texplot.save_plot` uses this function, so the draw is done once
+    for all formats and for the later saves of the same figure.
+
+    A bounding box is cached for each ``dpi``. The cache is invalidated by
+    any change of the figure or its artists, such as new data, limits, or
+    labels, and by a change of its size. Saving the figure with ``savefig``
+    also invalidates it, since ``savefig`` changes the figure temporarily.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+
+        >>> fig, ax = plt.subplots()
+        >>> ax.plot([0, 1], [0, 1])
+        >>> bbox = texplot.get_tight_bbox(fig)
+        >>> fig.savefig('line.svg', bbox_inches=bbox)
+        >>> fig.savefig('line.pdf', bbox_inches=bbox)
+    """
+
+    state = _watch_figure(fig)
+
+    # The default extra artists (None) differ from no extra artists ([])
+    if bbox_extra_artists is None:
+        extra_artists_key = None
+    else:
+        extra_artists_key = tuple(id(artist) for artist in bbox_extra_artists)
+
+    if dpi is None:
+        dpi = fig.dpi
+
+    key = (extra_artists_key, tuple(fig.get_size_inches()), dpi)
+
+    if state['mutation'] != state['mutations']:
+        state['bboxes'] = {}
+
+    bbox = state['bboxes'].get(key, None)
+
+    if bbox is None:
+
+        # Measuring the texts uses the caches that are shared with the draws
+        # of other threads
+        render_lock = _get_render_lock()
+        if render_lock is None:
+            render_lock = contextlib.nullcontext()
+
+        # The texts are measured at the dpi of the file, as savefig does. The
+        # temporary change of the dpi is not a change of the figure.
+        fig_dpi = fig.dpi
+        with _record('bbox', 'save'), render_lock, _drawing():
+            try:
+                if dpi != fig_dpi:
+                    fig.set_dpi(dpi)
+                fig.draw_without_rendering()
+                bbox = fig.get_tightbbox(
+                    bbox_extra_artists=bbox_extra_artists)
+            finally:
+                if fig.dpi != fig_dpi:
+                    fig.set_dpi(fig_dpi)
+
+        state['bboxes'][key] = bbox
+        state['mutation'] = state['mutations']
+
+    if pad_inches is None:
+        pad_inches = matplotlib.rcParams['savefig.pad_inches']
+
+    return bbox.padded(pad_inches)
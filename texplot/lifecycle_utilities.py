@@ -0,0 +1,255 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import gc
+import sys
+import weakref
+import threading
+import numpy
+from .pool_utilities import get_figure_pool_info
+
+__all__ = ['get_figure_info', 'reset_figure_info']
+
+# Figures that texplot saved, and those that it closed, which are counted
+# while they are alive.
+_saved_figures = weakref.WeakSet()
+_closed_figures = weakref.WeakSet()
+_lifecycle_stats = {'saved': 0, 'closed': 0}
+_lifecycle_lock = threading.Lock()
+
+# Attributes of artists that hold their data as arrays
+_ARRAY_ATTRIBUTES = ['_xorig', '_yorig', '_x', '_y', '_xy', '_A', '_offsets']
+
+
+# ============
+# track figure
+# ============
+
+def _track_figure(fig):
+    """
+    Counts a figure that texplot saves.
+    """
+
+    with _lifecycle_lock:
+        _saved_figures.add(fig)
+        _lifecycle_stats['saved'] += 1
+
+
+# ============
+# close figure
+# ============
+
+def _close_figure(fig):
+    """
+    Closes a figure by its object, rather than the current figure of pyplot.
+    The figures of texplot.subplots are not returned to its pool, which is
+    done only by texplot.release_figure.
+    """
+
+    # Imported here, since this module is imported with texplot
+    import matplotlib.pyplot as plt
+
+    plt.close(fig)
+
+    with _lifecycle_lock:
+        _lifecycle_stats['closed'] += 1
+        _closed_figures.add(fig)
+
+
+# =================
+# get figure memory
+# =================
+
+def _get_figure_memory(fig):
+    """
+    Returns an estimate of the memory in bytes that a figure holds, which is
+    the pixel buffer of its renderer and the data arrays of its artists.
+    """
+
+    nbytes = 0
+
+    # Agg canvases keep the renderer of the last draw
+    renderer = getattr(fig.canvas, 'renderer', None)
+    buffer_rgba = getattr(renderer, 'buffer_rgba', None)
+    if buffer_rgba is not None:
+        nbytes += numpy.asarray(buffer_rgba()).nbytes
+
+    arrays = {}
+    for artist in fig.findobj():
+        for name in _ARRAY_ATTRIBUTES:
+            array = getattr(artist, name, None)
+            if isinstance(array, numpy.ndarray):
+                arrays[id(array)] = array
+
+        paths = getattr(artist, '_paths', None)
+        if paths is None:
+            paths = [getattr(artist, '_path', None)]
+        for path in paths:
+            vertices = getattr(path, 'vertices', None)
+            if isinstance(vertices, numpy.ndarray):
+                arrays[id(vertices)] = vertices
+
+    # Arrays that are shared by artists, or are views of other arrays, are
+    # counted once.
+    bases = {}
+    for array in arrays.values():
+        base = array if array.base is None else array.base
+        if isinstance(base, numpy.ndarray):
+            bases[id(base)] = base.nbytes
+        else:
+            bases[id(array)] = array.nbytes
+
+    return nbytes + sum(bases.values())
+
+
+# =======
+# get rss
+# =======
+
+def _get_rss():
+    """
+    Returns the resident set size of the process in bytes, or `None` if it
+    is not available.
+    """
+
+    try:
+        with open('/proc/self/statm', 'r') as file:
+            pages = int(file.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+# ===============
+# get figure info
+# ===============
+
+def get_figure_info(collect=True):
+    """
+    Returns the number of live figures, and the memory that they retain.
+
+    Parameters
+    ----------
+
+    collect : bool, default=True
+        If `True`, the garbage collector is run first, so that the figures
+        that are no longer referenced are not counted.
+
+    Returns
+    -------
+
+    figure_info : dict
+        A dictionary with the following keys:
+
+        * ``open``: the number of figures that are open in pyplot.
+        * ``saved`` and ``closed``: the number of times texplot saved and
+          closed a figure.
+        * ``alive``: the number of figures that texplot saved, and that are
+          not freed yet, whether they are open, closed, or pooled.
+        * ``retained``: the number of figures that texplot closed, but that
+          are not freed since they are still referenced, such as by a
+          variable of the caller. This should not grow in a long-running
+          process.
+        * ``pooled``: the number of idle figures in the pool of
+          :func:`texplot.subplots`.
+        * ``memory``: an estimate of the memory in bytes that the alive
+          figures hold, which is their pixel buffers and the data of their
+          artists.
+        * ``rss``: the resident set size of the process in bytes, or `None`
+          if it is not available on the platform.
+
+    See Also
+    --------
+
+    texplot.reset_figure_info
+    texplot.save_plot
+
+    Notes
+    -----
+
+    :func:`texplot.show_or_save_plot`, and :func:`texplot.save_plot` with
+    ``close=True``, close the figure that they saved by its object, rather
+    than the current figure of pyplot. A figure refers to itself through its
+    canvas and axes, so a closed figure is freed by the garbage collector
+    rather than when it is closed.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+        >>> from texplot.examples import plot_function
+
+        >>> with texplot.theme(use_latex=False):
+        ...     for i in range(100):
+        ...         fig, ax = plt.subplots()
+        ...         plot_function(ax)
+        ...         texplot.save_plot(plt, 'function.svg', close=True)
+
+        >>> info = texplot.get_figure_info()
+        >>> info['open'], info['alive'], info['retained']
+        (0, 0, 0)
+    """
+
+    if collect:
+        gc.collect()
+
+    # Pyplot is not imported for that purpose only
+    plt = sys.modules.get('matplotlib.pyplot', None)
+    num_open = 0 if plt is None else len(plt.get_fignums())
+
+    pooled = get_figure_pool_info()['size']
+
+    with _lifecycle_lock:
+        saved_figures = list(_saved_figures)
+        closed_figures = list(_closed_figures)
+        saved = _lifecycle_stats['saved']
+        closed = _lifecycle_stats['closed']
+
+    memory = sum(_get_figure_memory(fig) for fig in saved_figures)
+
+    return {
+        'open': num_open,
+        'saved': saved,
+        'closed': closed,
+        'alive': len(saved_figures),
+        'retained': len(closed_figures),
+        'pooled': pooled,
+        'memory': memory,
+        'rss': _get_rss(),
+    }
+
+
+# =================
+# reset figure info
+# =================
+
+def reset_figure_info():
+    """
+    Resets the counts of the saved and closed figures of
+    :func:`texplot.get_figure_info`.
+
+    See Also
+    --------
+
+    texplot.get_figure_info
+    """
+
+    with _lifecycle_lock:
+        _saved_figures.clear()
+        _closed_figures.clear()
+        _lifecycle_stats['saved'] = 0
+        _lifecycle_stats['closed'] = 0
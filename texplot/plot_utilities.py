@@ -12,36 +12,61 @@
 # =======
 
 import os
-import platform
 import matplotlib
+import matplotlib.style
 import matplotlib.ticker
 from matplotlib.ticker import PercentFormatter                     # noqa: F401
 from matplotlib.ticker import ScalarFormatter, NullFormatter       # noqa: F401
 from matplotlib.ticker import FormatStrFormatter, FuncFormatter    # noqa: F401
 import contextlib
+import copy
+import pickle
+import threading
+import types
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-import shutil
 from .display_utilities import is_notebook
+from .decimation_utilities import decimate_lines
+from .rasterization_utilities import rasterize_artists
+from .raster_utilities import write_raster_files, _RASTER_EXTENSIONS
+from .fingerprint_utilities import fingerprint_figure, get_unchanged_files, \
+    update_manifest
+from .latex_utilities import _probe_latex
+from .profile_utilities import _record
+from .rc_utilities import _local_rc, _enable_local_rc, _global_rc, \
+    _get_local_rc
+from .lifecycle_utilities import _track_figure, _close_figure
+from .layout_utilities import get_tight_bbox, _suspend_mutations, \
+    _disable_layout_engine
 import logging
 import warnings
 
-# Check DISPLAY
-if ((not bool(os.environ.get('DISPLAY', None))) or
-        (bool(os.environ.get('TEXPLOT_NO_DISPLAY', None)))) and \
-        (not is_notebook()):
 
-    # No display found (used on servers). Using non-interactive backend
-    if platform.system() == 'Darwin':
-        # For MacOS, first, use macos backend, "then" import pyplot
+# ==============
+# select backend
+# ==============
+
+def _select_backend():
+    """
+    Selects the non-interactive ``agg`` backend if no display is found (such
+    as on servers), or if ``TEXPLOT_NO_DISPLAY`` is set, unless running in a
+    Jupyter notebook.
+
+    This function does not import pyplot. If pyplot is not imported yet,
+    selecting the backend only sets ``rcParams['backend']``, and the backend
+    is loaded when pyplot is first used.
+    """
+
+    if ((not bool(os.environ.get('DISPLAY', None))) or
+            (bool(os.environ.get('TEXPLOT_NO_DISPLAY', None)))) and \
+            (not is_notebook()):
+
+        # No display found (used on servers). Using non-interactive backend
         matplotlib.use('agg')
-        import matplotlib.pyplot as plt
-    else:
-        # For Linux and Windows, "first" import pyplot, then use Agg backend.
-        import matplotlib.pyplot as plt
-        plt.switch_backend('agg')
-else:
-    # Display exists. Import pyplot without changing any backend.
-    import matplotlib.pyplot as plt
+
+
+_select_backend()
 
 # Remove plt.tight_layout() warning
 logging.captureWarnings(True)
@@ -52,8 +77,27 @@ warnings.filterwarnings(
         message=('This figure includes Axes that are not compatible with ' +
                  'tight_layout, so results might be incorrect.'))
 
-__all__ = ['theme', 'get_theme', 'set_theme', 'reset_theme', 'save_plot',
-           'show_or_save_plot']
+__all__ = ['theme', 'get_theme', 'set_theme', 'reset_theme',
+           'get_theme_cache_info', 'reset_theme_cache', 'save_plot',
+           'save_figure', 'show_or_save_plot']
+
+# Least-recently-used cache of the themes created by get_theme
+_THEME_CACHE_SIZE = 128
+_theme_cache = OrderedDict()
+_theme_cache_lock = threading.Lock()
+_theme_cache_stats = {'hits': 0, 'misses': 0}
+
+# Settings of the deterministic mode, which are shared by the threads that
+# save figures
+_deterministic_state = {'count': 0, 'source_date_epoch': None,
+                        'hashsalt': None}
+_deterministic_lock = threading.Lock()
+
+# Metadata of each file format that removes the creation date
+_DETERMINISTIC_METADATA = {
+    'pdf': {'CreationDate': None},
+    'svg': {'Date': None},
+}
 
 
 # =====================
@@ -217,20 +261,30 @@ def _customize_theme_text(use_latex):
 
     text_dict = {}
 
-    # LaTeX
-    if shutil.which('latex'):
+    # LaTeX (the probe is cached, see get_latex_info)
+    latex_info = _probe_latex()
+
+    if latex_info['available']:
         text_dict['text.usetex'] = True
         text_dict['text.latex.preamble'] = r'\usepackage{amsmath}' + \
                                            r'\usepackage{amsfonts}'
-    elif use_latex is True:
+    elif (use_latex is True) and (latex_info['executable'] is None):
         raise RuntimeError(
             '"latex" executable not found. Either set "use_latex" to False, '
             'or ensure that LaTeX is installed and included in your system '
             'PATH.')
 
+    elif use_latex is True:
+        missing = [package for package, compiles in
+                   latex_info['packages'].items() if not compiles]
+        raise RuntimeError(
+            'LaTeX packages %s cannot be loaded by "%s". Either set '
+            % (', '.join(missing), latex_info['executable']) +
+            '"use_latex" to False, or install these LaTeX packages.')
+
     else:
-        # use_latex at this point is None, and latex was not found. Fall back
-        # to not using latex silently.
+        # use_latex at this point is None, and latex was not found (or cannot
+        # load the packages). Fall back to not using latex silently.
         pass
 
     # Font (Note: this should be AFTER the plt.style.use)
@@ -240,6 +294,74 @@ def _customize_theme_text(use_latex):
     return text_dict
 
 
+# ============
+# create theme
+# ============
+
+def _create_theme(context, font_scale, use_latex, rc):
+    """
+    Creates the dictionary of rcParams of a theme. See :func:`get_theme`.
+    """
+
+    plt_rc_params = {}
+
+    # Set the style (such as the which background, ticks)
+    plt_rc_params.update(_customize_theme_style())
+
+    # Set the context (such as scaling font sizes)
+    if font_scale is not None:
+        plt_rc_params.update(_customize_theme_context(
+            context=context, font_scale=font_scale))
+
+    # Set text rendering and font (such as using LaTeX)
+    if (use_latex is True) or (use_latex is None):
+        plt_rc_params.update(_customize_theme_text(use_latex))
+
+    # Add extra arguments
+    if rc is not None:
+        plt_rc_params.update(copy.deepcopy(rc))
+
+    return plt_rc_params
+
+
+# ======
+# freeze
+# ======
+
+def _freeze(value):
+    """
+    Converts lists and dictionaries, recursively, to tuples, so that the
+    value can be used as a key of the theme cache.
+    """
+
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(value[key])) for key in value))
+    elif isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    else:
+        return value
+
+
+# ==============
+# make read only
+# ==============
+
+def _make_read_only(value):
+    """
+    Returns a read-only copy of a theme, where the dictionaries, recursively,
+    are read-only mappings, and the lists are tuples. Matplotlib converts
+    the tuples back to lists when the rcParams are updated.
+    """
+
+    if isinstance(value, dict):
+        return types.MappingProxyType(
+            {key: _make_read_only(item) for key, item in value.items()})
+    elif isinstance(value, (list, tuple)):
+        return tuple(_make_read_only(item) for item in value)
+    else:
+        return value
+
+
 # =========
 # get theme
 # =========
@@ -275,27 +397,109 @@ def get_theme(
     By setting font_scale=1, a pre-set of axes tick sizes are applied to the
     plot which are different than the default matplotlib sizes. To disable
     these pre-set sizes, set font_scale=None.
+
+    The returned dictionary is a read-only mapping, whose list values, such
+    as the font families, are tuples. Themes are cached by their arguments,
+    so calling this function again with the same arguments returns the same
+    mapping without rebuilding it. To modify a theme, make a copy with
+    ``dict(get_theme(...))``, or pass the changes with ``rc``. See
+    :func:`get_theme_cache_info` for the cache statistics.
     """
 
-    plt_rc_params = {}
+    # Key of the cache. The LaTeX availability is included, so that the
+    # cached themes follow reset_latex_info. A theme without LaTeX does not
+    # depend on it, so LaTeX is not probed.
+    if use_latex is False:
+        latex_available = None
+    else:
+        latex_available = _probe_latex()['available']
+    key = (context, font_scale, use_latex, _freeze(rc), latex_available)
 
-    # Set the style (such as the which background, ticks)
-    plt_rc_params.update(_customize_theme_style())
+    try:
+        hash(key)
+    except TypeError:
+        # rc contains values that cannot be hashed. Do not cache.
+        with _theme_cache_lock:
+            _theme_cache_stats['misses'] += 1
+        with _record('get_theme', 'theme'):
+            return _make_read_only(
+                _create_theme(context, font_scale, use_latex, rc))
+
+    with _theme_cache_lock:
+        plt_rc_params = _theme_cache.get(key, None)
+        if plt_rc_params is not None:
+            _theme_cache.move_to_end(key)
+            _theme_cache_stats['hits'] += 1
+            return plt_rc_params
+
+        _theme_cache_stats['misses'] += 1
+
+    # Create the theme outside of the lock
+    with _record('get_theme', 'theme'):
+        plt_rc_params = _make_read_only(
+            _create_theme(context, font_scale, use_latex, rc))
+
+    with _theme_cache_lock:
+        _theme_cache[key] = plt_rc_params
+        _theme_cache.move_to_end(key)
+        while len(_theme_cache) > _THEME_CACHE_SIZE:
+            _theme_cache.popitem(last=False)
 
-    # Set the context (such as scaling font sizes)
-    if font_scale is not None:
-        plt_rc_params.update(_customize_theme_context(
-            context=context, font_scale=font_scale))
+    return plt_rc_params
 
-    # Set text rendering and font (such as using LaTeX)
-    if (use_latex is True) or (use_latex is None):
-        plt_rc_params.update(_customize_theme_text(use_latex))
 
-    # Add extra arguments
-    if rc is not None:
-        plt_rc_params.update(rc)
+# ====================
+# get theme cache info
+# ====================
 
-    return plt_rc_params
+def get_theme_cache_info():
+    """
+    Returns the statistics of the cache of :func:`get_theme`.
+
+    Returns
+    -------
+
+    cache_info : dict
+        A dictionary with the keys ``hits`` and ``misses`` (the number of
+        calls to :func:`get_theme` that were, or were not, found in the
+        cache), ``size`` (the number of cached themes), and ``maxsize`` (the
+        maximum number of cached themes, beyond which the least recently used
+        theme is discarded).
+
+    See Also
+    --------
+
+    texplot.reset_theme_cache
+    """
+
+    with _theme_cache_lock:
+        return {
+            'hits': _theme_cache_stats['hits'],
+            'misses': _theme_cache_stats['misses'],
+            'size': len(_theme_cache),
+            'maxsize': _THEME_CACHE_SIZE,
+        }
+
+
+# =================
+# reset theme cache
+# =================
+
+def reset_theme_cache():
+    """
+    Discards the cached themes of :func:`get_theme` and resets the cache
+    statistics.
+
+    See Also
+    --------
+
+    texplot.get_theme_cache_info
+    """
+
+    with _theme_cache_lock:
+        _theme_cache.clear()
+        _theme_cache_stats['hits'] = 0
+        _theme_cache_stats['misses'] = 0
 
 
 # =========
@@ -307,29 +511,105 @@ def set_theme(
         font_scale=1,
         style=None,
         use_latex=None,
-        rc=None):
+        rc=None,
+        thread_local=False):
     """
     Sets a customized theme for plotting.
+
+    If ``thread_local`` is `True`, the theme is set only for the current
+    thread, and the global rcParams and the other threads are not changed.
+    The changes of the rcParams by this thread are then also local to it,
+    until :func:`reset_theme` is called with ``thread_local=True``. This can
+    be used in the initializer of a pool of threads, so that each thread
+    renders with its own theme. See :func:`theme`.
     """
 
-    plt_rc_params = get_theme(context=context, font_scale=font_scale,
-                              use_latex=use_latex, rc=rc)
-    matplotlib.rcParams.update(plt_rc_params)
+    if thread_local:
+        _enable_local_rc(True)
+        rc_scope = contextlib.nullcontext()
+    else:
+        rc_scope = _global_rc()
+
+    with _record('set_theme', 'theme'), rc_scope:
+        plt_rc_params = get_theme(context=context, font_scale=font_scale,
+                                  use_latex=use_latex, rc=rc)
 
-    if style is not None:
-        matplotlib.style.use(style)
+        with _record('rcparams.update', 'theme', keys=len(plt_rc_params)):
+            matplotlib.rcParams.update(plt_rc_params)
+
+        if style is not None:
+            with _record('style.use', 'theme', style=str(style)):
+                matplotlib.style.use(style)
 
 
 # ===========
 # reset theme
 # ===========
 
-def reset_theme():
+def reset_theme(thread_local=False):
     """
     Reset the matplotlib theme back it default.
+
+    If ``thread_local`` is `True`, only the thread-local theme of the current
+    thread, set by :func:`set_theme`, is removed, and the thread uses the
+    global rcParams again.
+    """
+
+    if thread_local:
+        _enable_local_rc(False)
+        return
+
+    with _global_rc():
+        matplotlib.rcParams.update(matplotlib.rcParamsDefault)
+
+
+# ==============
+# get style keys
+# ==============
+
+def _get_style_keys(style):
+    """
+    Returns the set of rcParams keys that a matplotlib style sets, or `None`
+    if the keys cannot be determined without applying the style (such as for
+    the ``default`` style, or a style file).
+    """
+
+    if isinstance(style, (str, os.PathLike)) or hasattr(style, 'keys'):
+        styles = [style]
+    else:
+        styles = style
+
+    keys = set()
+    for style_ in styles:
+        if hasattr(style_, 'keys'):
+            keys.update(style_.keys())
+        elif isinstance(style_, str) and (style_ != 'default') and \
+                (style_ in matplotlib.style.library):
+            keys.update(matplotlib.style.library[style_].keys())
+        else:
+            return None
+
+    return keys
+
+
+# =============
+# get rc params
+# =============
+
+def _get_rc_params(keys=None):
+    """
+    Returns a dictionary of the current values of the given rcParams keys. If
+    ``keys`` is `None`, all rcParams are returned.
     """
 
-    matplotlib.rcParams.update(matplotlib.rcParamsDefault)
+    if keys is None:
+        rc_params = matplotlib.rcParams.copy()
+
+        # Reading "backend" from the global rcParams may resolve the backend.
+        # The backend is never changed by a theme.
+        return {key: rc_params[key] for key in rc_params if key != 'backend'}
+
+    return {key: matplotlib.rcParams[key] for key in keys}
 
 
 # =====
@@ -342,23 +622,504 @@ def theme(
         font_scale=1,
         style=None,
         use_latex=None,
-        rc=None):
+        rc=None,
+        thread_local=False):
+    """
+    Context manager that sets a customized theme within its scope.
+
+    The arguments are the same as those of :func:`set_theme`.
+
+    Example
+    =======
+
+    .. code-block:: python
+
+        >>> with texplot.theme(font_scale=1.2, use_latex=False):
+        >>>     fig, ax = plt.subplots()
+        >>>     ...
+
+    On entry, only the rcParams that the theme sets (including those set by
+    ``style``) are recorded, and on exit, only those whose values were changed
+    by the theme are restored. Hence, other rcParams that are modified within
+    the scope of the context are not restored on exit.
+
+    If ``thread_local`` is `True`, the theme applies only to the current
+    thread, so several threads can render figures with different themes
+    concurrently, without a lock. The rcParams that this thread changes
+    within the context, such as by ``matplotlib.rc_context``, are also local
+    to it, and all of them are discarded on exit. Each figure should be
+    created and saved in the same thread, since matplotlib reads some
+    rcParams when it creates the artists, and others when it draws them.
+
+    .. code-block:: python
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> import matplotlib.pyplot as plt
+        >>> from matplotlib.figure import Figure
+
+        >>> def render(font_scale):
+        ...     with texplot.theme(font_scale=font_scale, use_latex=False,
+        ...                        thread_local=True):
+        ...         fig = Figure()
+        ...         ax = fig.subplots()
+        ...         ax.plot([0, 1], [0, 1])
+        ...         texplot.save_figure(fig, 'line-%g.svg' % font_scale)
+
+        >>> with ThreadPoolExecutor(max_workers=2) as executor:
+        ...     list(executor.map(render, [1, 2]))
+    """
+
+    if thread_local:
+        with _local_rc():
+            set_theme(context=context, font_scale=font_scale, style=style,
+                      use_latex=use_latex, rc=rc, thread_local=True)
+            yield
+        return
+
+    # Keys that the theme sets
+    keys = set(get_theme(context=context, font_scale=font_scale,
+                         use_latex=use_latex, rc=rc).keys())
+
+    if style is not None:
+        style_keys = _get_style_keys(style)
+        if style_keys is None:
+            # The style keys are unknown. Record all rcParams.
+            keys = None
+        else:
+            keys.update(style_keys)
+
+    # The global theme is recorded and restored, even if this thread has a
+    # thread-local theme
+    with _global_rc():
+        original_rc_params = _get_rc_params(keys)
+
+    try:
+        set_theme(
+            context=context,
+            font_scale=font_scale,
+            style=style,
+            use_latex=use_latex,
+            rc=rc)
+
+        # Only restore the rcParams that are actually changed
+        with _global_rc():
+            original_rc_params = {
+                key: value for key, value in original_rc_params.items()
+                if matplotlib.rcParams[key] != value}
+
+        yield
+
+    finally:
+        with _record('rcparams.update', 'theme',
+                     keys=len(original_rc_params)), _global_rc():
+            matplotlib.rcParams.update(original_rc_params)
+
+
+# ==============
+# get extensions
+# ==============
+
+def _get_extensions(fig, formats):
+    """
+    Returns a list of file extensions (with the leading dot) for the given
+    list of file formats, and checks that the figure canvas supports them.
+    """
+
+    if formats is None:
+        formats = ['svg', 'pdf']
+    elif isinstance(formats, str):
+        formats = [formats]
+
+    supported_formats = fig.canvas.get_supported_filetypes()
+
+    extensions = []
+    for format_ in formats:
+        format_ = format_.lstrip('.').lower()
+        if format_ not in supported_formats:
+            raise ValueError(
+                '"%s" is not a supported file format. Supported formats ' %
+                format_ + 'are: %s.' % ', '.join(sorted(supported_formats)))
+
+        extension = '.' + format_
+        if extension not in extensions:
+            extensions.append(extension)
+
+    return extensions
+
+
+# =============
+# pickle figure
+# =============
+
+def _pickle_figure(fig):
+    """
+    Serializes a figure so that each worker can render its own copy. Returns
+    ``None`` if the figure cannot be pickled (for instance, when it holds a
+    lambda function as a tick formatter).
+    """
+
+    manager = fig.canvas.manager
+
+    try:
+        # Detach the figure manager so that the unpickled copies are not
+        # registered as new pyplot figures.
+        fig.canvas.manager = None
+        return pickle.dumps(fig)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return None
+    finally:
+        fig.canvas.manager = manager
+
+
+# ================
+# save figure copy
+# ================
+
+def _save_figure_copy(fig_data, fullpath_filename, savefig_kwargs,
+                      local_rc=None):
     """
+    Unpickles a copy of a figure and saves it to a file. This function is
+    executed by the workers of the thread pool in :func:`save_plot`.
+
+    The workers are new threads, so the thread-local theme of the calling
+    thread, ``local_rc``, is applied to them.
     """
 
-    original_rc_params = matplotlib.rcParams.copy()
+    if local_rc is None:
+        rc_scope = contextlib.nullcontext()
+    else:
+        rc_scope = _local_rc(local_rc)
+
+    with rc_scope:
+        fig = pickle.loads(fig_data)
+
+        with _record('write', 'save', filename=fullpath_filename,
+                     format=os.path.splitext(fullpath_filename)[1]):
+            fig.savefig(fullpath_filename, **savefig_kwargs)
+
+
+# ==================
+# get savefig kwargs
+# ==================
+
+def _get_savefig_kwargs(fullpath_filename, savefig_kwargs, deterministic):
+    """
+    Returns the arguments of ``savefig`` for a file. In the deterministic
+    mode, the metadata entries of the creation date are removed.
+    """
+
+    if not deterministic:
+        return savefig_kwargs
+
+    extension = os.path.splitext(fullpath_filename)[1].lstrip('.').lower()
+    metadata = _DETERMINISTIC_METADATA.get(extension, None)
+    if metadata is None:
+        return savefig_kwargs
+
+    savefig_kwargs = dict(savefig_kwargs)
+    savefig_kwargs['metadata'] = metadata
+
+    return savefig_kwargs
+
+
+# =====================
+# deterministic context
+# =====================
+
+@contextlib.contextmanager
+def _deterministic_context():
+    """
+    Context manager that fixes the salt of the ids in svg files, and the
+    creation date of PostScript files (which cannot be removed by the
+    metadata), so that the same figure is written to identical files.
+
+    The settings are global, so they are applied when the first thread
+    enters this context, and restored when the last thread exits it, even if
+    these threads have thread-local themes.
+    """
 
-    set_theme(
-        context=context,
-        font_scale=font_scale,
-        style=style,
-        use_latex=use_latex,
-        rc=rc)
+    with _deterministic_lock, _global_rc():
+        if _deterministic_state['count'] == 0:
+            source_date_epoch = os.environ.get('SOURCE_DATE_EPOCH', None)
+            if source_date_epoch is None:
+                os.environ['SOURCE_DATE_EPOCH'] = '0'
+
+            hashsalt = matplotlib.rcParams['svg.hashsalt']
+            if hashsalt is None:
+                matplotlib.rcParams['svg.hashsalt'] = 'texplot'
+
+            _deterministic_state['source_date_epoch'] = source_date_epoch
+            _deterministic_state['hashsalt'] = hashsalt
+
+        _deterministic_state['count'] += 1
 
     try:
         yield
     finally:
-        matplotlib.rcParams.update(original_rc_params)
+        with _deterministic_lock, _global_rc():
+            _deterministic_state['count'] -= 1
+
+            if _deterministic_state['count'] == 0:
+                if _deterministic_state['source_date_epoch'] is None:
+                    os.environ.pop('SOURCE_DATE_EPOCH', None)
+                if _deterministic_state['hashsalt'] is None:
+                    matplotlib.rcParams['svg.hashsalt'] = None
+
+
+# ============
+# get save dpi
+# ============
+
+def _get_save_dpi(fig, dpi):
+    """
+    Returns the dots per inch that ``savefig`` uses for the given ``dpi``
+    argument.
+    """
+
+    if dpi is None:
+        dpi = matplotlib.rcParams['savefig.dpi']
+
+    if isinstance(dpi, str) and (dpi == 'figure'):
+        dpi = fig.dpi
+
+    return dpi
+
+
+# ===========
+# write files
+# ===========
+
+def _write_files(fig, fullpath_filenames, savefig_kwargs, workers, verbose,
+                 deterministic=False):
+    """
+    Saves a figure to each of the files, either sequentially or concurrently
+    with a pool of threads.
+    """
+
+    # Number of concurrent workers
+    if workers is None:
+        workers = min(len(fullpath_filenames), os.cpu_count() or 1)
+    else:
+        workers = min(len(fullpath_filenames), max(1, int(workers)))
+
+    # Since a figure cannot be rendered concurrently by several backends,
+    # each worker renders its own copy of the figure. The draws of all
+    # figures are serialized by matplotlib, so this only helps when the
+    # backends spend their time outside of the draw, such as compressing.
+    fig_data = None
+    if workers > 1:
+        fig_data = _pickle_figure(fig)
+
+    if fig_data is None:
+        # For each extension, save a file sequentially
+        for fullpath_filename in fullpath_filenames:
+            with _record('write', 'save', filename=fullpath_filename,
+                         format=os.path.splitext(fullpath_filename)[1]):
+                fig.savefig(fullpath_filename, **_get_savefig_kwargs(
+                    fullpath_filename, savefig_kwargs, deterministic))
+
+            if verbose:
+                print('Plot saved to "%s".' % fullpath_filename)
+
+    else:
+        # Write all file formats concurrently
+        local_rc = _get_local_rc()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_save_figure_copy, fig_data,
+                                       fullpath_filename,
+                                       _get_savefig_kwargs(
+                                           fullpath_filename, savefig_kwargs,
+                                           deterministic),
+                                       local_rc)
+                       for fullpath_filename in fullpath_filenames]
+
+            for fullpath_filename, future in zip(fullpath_filenames,
+                                                 futures):
+                future.result()
+
+                if verbose:
+                    print('Plot saved to "%s".' % fullpath_filename)
+
+
+# ===========
+# save figure
+# ===========
+
+def _save_figure(
+        fig,
+        filename,
+        transparent_background=True,
+        bbox_extra_artists=None,
+        dpi=200,
+        bbox_inches='tight',
+        pad_inches=0.1,
+        formats=None,
+        workers=1,
+        decimate=False,
+        rasterize=None,
+        incremental=False,
+        deterministic=False,
+        verbose=False):
+    """
+    Saves a figure. This implements :func:`save_plot` for a given figure,
+    which is not necessarily the current figure of pyplot.
+    """
+
+    _track_figure(fig)
+
+    # Expand the home directory symbol and remove redundant separators
+    filename = os.path.normpath(os.path.expanduser(filename))
+
+    # Extract the directory, base filename, and file extension
+    directory, base_and_ext = os.path.split(filename)
+    base_filename, extension = os.path.splitext(base_and_ext)
+
+    # If no directory specified, write in the current working directory
+    if not os.path.isabs(directory):
+        directory = os.path.join(os.getcwd(), directory)
+
+    # Determine whether a file extension is provided or not.
+    if bool(extension):
+        # filename contains an extension
+        extensions = [extension]
+    else:
+        # No extension is provided. Save to all given formats
+        extensions = _get_extensions(fig, formats)
+
+    if not os.access(directory, os.W_OK):
+        raise RuntimeError(
+            'Cannot save plot to %s. Directory is not writable.' % directory)
+
+    # For several dots per inch, the raster formats are rendered once at the
+    # highest resolution and downsampled for the others.
+    if isinstance(dpi, (list, tuple)):
+        dpis = sorted(set(dpi), reverse=True)
+        if len(dpis) == 0:
+            raise ValueError('"dpi" should not be an empty list.')
+        dpi = dpis[0]
+    else:
+        dpis = None
+
+    fullpath_filenames = []
+    raster_targets = []
+    for extension in extensions:
+        if (dpis is not None) and (extension.lower() in _RASTER_EXTENSIONS):
+            for dpi_ in dpis:
+                raster_targets.append((dpi_, os.path.join(
+                    directory, base_filename + '-%gdpi' % dpi_ + extension)))
+        else:
+            fullpath_filenames.append(
+                os.path.join(directory, base_filename + extension))
+
+    if incremental:
+        # Skip the files that were written from the same figure before
+        options = {
+            'dpi': dpi if dpis is None else dpis,
+            'transparent': transparent_background,
+            'bbox_inches': bbox_inches,
+            'pad_inches': pad_inches,
+            'bbox_extra_artists': bbox_extra_artists,
+            'decimate': decimate,
+            'rasterize': rasterize,
+            'deterministic': deterministic,
+        }
+
+        with _record('fingerprint', 'save'):
+            fingerprint = fingerprint_figure(fig, options)
+
+        unchanged = get_unchanged_files(
+            fullpath_filenames + [target[1] for target in raster_targets],
+            fingerprint)
+        fullpath_filenames = [fullpath_filename for fullpath_filename in
+                              fullpath_filenames
+                              if fullpath_filename not in unchanged]
+        raster_targets = [target for target in raster_targets
+                          if target[1] not in unchanged]
+
+        if verbose:
+            for fullpath_filename in unchanged:
+                print('Plot "%s" is unchanged.' % fullpath_filename)
+
+        if len(fullpath_filenames) + len(raster_targets) == 0:
+            return
+
+    with contextlib.ExitStack() as stack:
+
+        # The temporary changes of the figure while saving it do not
+        # invalidate its cached tight bbox
+        stack.enter_context(_suspend_mutations(fig))
+
+        # Decimate dense lines before computing the bbox and rendering
+        if decimate:
+            with _record('decimate', 'save'):
+                decimation_stats = stack.enter_context(
+                    decimate_lines(fig, dpi))
+
+            if verbose and (decimation_stats['lines'] > 0):
+                print('Decimated %d line(s): removed %d of %d points.'
+                      % (decimation_stats['lines'],
+                         decimation_stats['removed'],
+                         decimation_stats['points']))
+
+        # Rasterize dense artists, after the decimation reduced their points
+        with _record('rasterize', 'save'):
+            rasterization_stats = stack.enter_context(
+                rasterize_artists(fig, rasterize))
+
+        if verbose and (rasterization_stats['artists'] > 0):
+            print('Rasterized %d artist(s) with %d points.'
+                  % (rasterization_stats['artists'],
+                     rasterization_stats['points']))
+
+        # Compute the tight bbox once for all formats, or reuse it from a
+        # previous save of the unchanged figure. Since this resolves the
+        # layout, savefig does not need to draw the figure again to execute
+        # the layout engine. The texts are measured at the dots per inch of
+        # each raster file, so their bboxes differ slightly. The highest dots
+        # per inch, which is rendered, is measured last.
+        raster_bboxes = None
+        if isinstance(bbox_inches, str) and (bbox_inches == 'tight'):
+            if len(raster_targets) > 0:
+                raster_bboxes = {
+                    dpi_: get_tight_bbox(
+                        fig, bbox_extra_artists=bbox_extra_artists,
+                        pad_inches=pad_inches, dpi=dpi_)
+                    for dpi_ in reversed(dpis)}
+
+            bbox_inches = get_tight_bbox(
+                fig, bbox_extra_artists=bbox_extra_artists,
+                pad_inches=pad_inches, dpi=_get_save_dpi(fig, dpi))
+
+        stack.enter_context(_disable_layout_engine(fig))
+
+        # bbox_extra_artists and pad_inches are only used for the tight
+        # bbox, which is now resolved.
+        savefig_kwargs = {
+            'dpi': dpi,
+            'transparent': transparent_background,
+            'bbox_inches': bbox_inches,
+        }
+
+        if deterministic:
+            stack.enter_context(_deterministic_context())
+
+        if len(fullpath_filenames) > 0:
+            _write_files(fig, fullpath_filenames, savefig_kwargs, workers,
+                         verbose, deterministic=deterministic)
+
+        write_raster_files(fig, raster_targets, savefig_kwargs, verbose,
+                           bboxes=raster_bboxes)
+
+    if incremental:
+        update_manifest(fullpath_filenames +
+                        [target[1] for target in raster_targets],
+                        fingerprint)
+
+    # Refresh an interactive canvas, as pyplot.savefig does, since savefig
+    # changes the colors of a transparent figure temporarily. Other canvases
+    # would render the figure once more for nothing.
+    if type(fig.canvas).required_interactive_framework is not None:
+        fig.canvas.draw_idle()
 
 
 # =========
@@ -373,6 +1134,13 @@ def save_plot(
         dpi=200,
         bbox_inches='tight',
         pad_inches=0.1,
+        formats=None,
+        workers=1,
+        decimate=False,
+        rasterize=None,
+        incremental=False,
+        deterministic=False,
+        close=False,
         verbose=False):
     """
     Saves plot as svg format in the current working directory.
@@ -386,49 +1154,229 @@ def save_plot(
     :param transparent_background: Sets the background of svg file to be
         transparent.
     :type transparent_background: bool
+
+    :param dpi: Dots per inch of the raster formats and of the rasterized
+        artists. If a list, each raster format (``png``, ``jpg``, ``tif``,
+        and ``webp``) is saved once for each dots per inch with the suffix
+        ``-<dpi>dpi`` in its filename. The figure is rendered only once at
+        the highest dots per inch, and the other resolutions are downsampled
+        from it. The vector formats use the highest dots per inch.
+    :type dpi: int or list
+
+    :param formats: List of file formats, such as ``svg``, ``pdf``, ``png``,
+        ``eps``, and ``pgf``, to be saved when ``filename`` has no extension.
+        If `None`, the plot is saved as both ``svg`` and ``pdf``.
+    :type formats: list
+
+    :param workers: Number of threads to write the file formats concurrently.
+        If `1` (default), the files are written sequentially. If `None`, it
+        is set to the smaller of the number of formats and the number of
+        CPUs. Matplotlib draws one figure at a time, so each worker renders a
+        pickled copy of the figure, and the files are rarely written faster
+        than sequentially.
+    :type workers: int
+
+    :param decimate: If `True`, the dense lines (without markers) are
+        decimated before rendering, by keeping only the first, last, minimum,
+        and maximum points within each pixel column at the given ``dpi``. The
+        output looks the same, but vector files are smaller and faster to
+        write. The original data of the lines are restored after saving.
+    :type decimate: bool
+
+    :param rasterize: Policy to rasterize dense artists in vector formats. If
+        `None` or `False`, no artist is rasterized. If an integer, the lines
+        and collections (such as scatter plots) with more points than this
+        number are rasterized at the given ``dpi``, while text, axes, and
+        labels remain vectors. If `True`, the threshold is 10,000 points.
+    :type rasterize: bool or int
+
+    :param incremental: If `True`, a fingerprint of the figure (its artists,
+        the rcParams in effect, and the arguments of this function) is
+        recorded in a manifest file ``.texplot_manifest.json`` in the output
+        directory, and the files whose recorded fingerprint matches and that
+        were not modified since are not written again.
+    :type incremental: bool
+
+    :param deterministic: If `True`, the same figure is written to
+        byte-identical files on every run. The creation date is removed from
+        the metadata of ``pdf`` and ``svg`` files, the ids in ``svg`` files
+        are hashed with a fixed salt (unless ``svg.hashsalt`` is set), and the
+        creation date of ``ps`` and ``eps`` files is set by
+        ``SOURCE_DATE_EPOCH`` (if it is not set, to ``0``).
+    :type deterministic: bool
+
+    :param close: If `True`, the saved figure is closed after it is written,
+        by its object rather than as the current figure of pyplot. A figure
+        of :func:`texplot.subplots` is not returned to its pool, which is
+        done by :func:`texplot.release_figure`. See
+        :func:`texplot.get_figure_info` to monitor the figures that are not
+        freed.
+    :type close: bool
+
+    .. note::
+
+        When ``bbox_inches`` is ``'tight'``, the tight bounding box is computed
+        once and shared by all file formats, rather than being recomputed with
+        an extra draw of the figure for each format. It is also cached with
+        the figure until the figure is changed, so saving the same figure
+        again does not compute it again. See :func:`texplot.get_tight_bbox`.
     """
 
-    # Is filename contain path, use the current path
-    if os.path.isabs(filename) or os.path.isabs(os.path.expanduser(filename)):
+    fig = plt.gcf()
 
-        # Remove redundant separators
-        filename = os.path.normpath(filename)
+    with _record('save_plot', 'save'):
+        _save_figure(fig, filename,
+                     transparent_background=transparent_background,
+                     bbox_extra_artists=bbox_extra_artists, dpi=dpi,
+                     bbox_inches=bbox_inches, pad_inches=pad_inches,
+                     formats=formats, workers=workers, decimate=decimate,
+                     rasterize=rasterize, incremental=incremental,
+                     deterministic=deterministic, verbose=verbose)
 
-        # Extract the directory, base filename, and file extension
-        directory, base_and_ext = os.path.split(filename)
-        base_filename, extension = os.path.splitext(base_and_ext)
+    if close:
+        _close_figure(fig)
 
-        # Initialize a list of extensions
-        extensions = [extension]
 
-    else:
-        # If no directory specified, write in the current working directory
-        directory = os.getcwd()
-        base_filename, extension = os.path.splitext(filename)
-
-        # Determine whether a file extension is provided or not.
-        if bool(extension):
-            # filename contains an extension
-            extensions = [extension]
-        else:
-            # No extension is provided. Save to both svg and pdf
-            extensions = ['.svg', '.pdf']
+# =============
+# attach canvas
+# =============
 
-    if not os.access(directory, os.W_OK):
-        raise RuntimeError(
-            'Cannot save plot to %s. Directory is not writable.' % directory)
+@contextlib.contextmanager
+def _attach_canvas(fig):
+    """
+    Context manager that attaches a new Agg canvas to a figure whose canvas
+    is interactive, or is not an Agg canvas, and restores the original canvas
+    on exit. The figure manager of pyplot, if any, is not changed.
+    """
 
-    # For each extension, save a file
-    for extension in extensions:
-        fullpath_filename = os.path.join(directory, base_filename + extension)
+    # Imported here, since this module is imported with texplot
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
 
-        plt.savefig(
-                fullpath_filename, dpi=dpi,
-                transparent=transparent_background, pad_inches=pad_inches,
-                bbox_extra_artists=bbox_extra_artists, bbox_inches=bbox_inches)
+    canvas = fig.canvas
+    if isinstance(canvas, FigureCanvasAgg) and \
+            (type(canvas).required_interactive_framework is None):
+        yield
+        return
 
-        if verbose:
-            print('Plot saved to "%s".' % fullpath_filename)
+    # The new canvas attaches itself to the figure
+    FigureCanvasAgg(fig)
+    try:
+        yield
+    finally:
+        fig.set_canvas(canvas)
+
+
+# ===========
+# save figure
+# ===========
+
+def save_figure(
+        fig,
+        filename,
+        transparent_background=True,
+        bbox_extra_artists=None,
+        dpi=200,
+        bbox_inches='tight',
+        pad_inches=0.1,
+        formats=None,
+        workers=1,
+        decimate=False,
+        rasterize=None,
+        incremental=False,
+        deterministic=False,
+        verbose=False):
+    """
+    Saves a figure without pyplot, which is safe to call from several threads
+    for different figures.
+
+    Parameters
+    ----------
+
+    fig : matplotlib.figure.Figure
+        The figure, such as one created by ``matplotlib.figure.Figure()``
+        without pyplot.
+
+    filename : str
+        Name of the file. If it has no extension, the figure is saved in all
+        formats given by ``formats``. See :func:`texplot.save_plot`.
+
+    transparent_background, bbox_extra_artists, dpi, bbox_inches, \
+    pad_inches, formats, workers, decimate, rasterize, incremental, \
+    deterministic, verbose
+        The same as the arguments of :func:`texplot.save_plot`.
+
+    Raises
+    ------
+
+    ValueError
+        If a format is not supported.
+
+    RuntimeError
+        If the directory is not writable.
+
+    See Also
+    --------
+
+    texplot.save_plot
+    texplot.save_plot_async
+
+    Notes
+    -----
+
+    Unlike :func:`texplot.save_plot`, which saves the current figure of
+    pyplot, this function saves the given figure and does not use pyplot. If
+    the canvas of the figure is interactive, such as a window of pyplot, the
+    figure is rendered with a new Agg canvas (from which matplotlib switches
+    to a PDF or SVG canvas for those formats), and its canvas and figure
+    manager are restored after saving. The window is not refreshed.
+
+    Different figures can be saved concurrently by a pool of threads.
+    Matplotlib draws one figure at a time, so the threads overlap in the
+    work outside of drawing, such as encoding and writing the files. The
+    same figure should not be changed or saved by two threads at the same
+    time. The deterministic mode and the manifest of the incremental mode
+    are shared by the threads safely.
+
+    Matplotlib measures texts outside of drawing with caches that are not
+    safe to share between threads, such as in ``fig.tight_layout()``. Such
+    functions should be called before the figures are passed to the threads,
+    or replaced by a layout engine, such as ``Figure(layout='tight')``,
+    which is executed when the figure is drawn. To render with different
+    themes in each thread, use :func:`texplot.theme` with
+    ``thread_local=True``.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> from matplotlib.figure import Figure
+        >>> import texplot
+        >>> from texplot.examples import plot_function
+
+        >>> texplot.set_theme(use_latex=False)
+        >>> figures = []
+        >>> for i in range(8):
+        ...     fig = Figure()
+        ...     plot_function(fig.subplots())
+        ...     figures.append(fig)
+
+        >>> def save(i):
+        ...     texplot.save_figure(figures[i], 'function-%d.svg' % i)
+
+        >>> with ThreadPoolExecutor(max_workers=4) as executor:
+        ...     list(executor.map(save, range(8)))
+    """
+
+    with _record('save_figure', 'save'), _attach_canvas(fig):
+        _save_figure(fig, filename,
+                     transparent_background=transparent_background,
+                     bbox_extra_artists=bbox_extra_artists, dpi=dpi,
+                     bbox_inches=bbox_inches, pad_inches=pad_inches,
+                     formats=formats, workers=workers, decimate=decimate,
+                     rasterize=rasterize, incremental=incremental,
+                     deterministic=deterministic, verbose=verbose)
 
 
 # =================
@@ -444,6 +1392,12 @@ def show_or_save_plot(
         dpi=200,
         bbox_inches='tight',
         pad_inches=0.1,
+        formats=None,
+        workers=1,
+        decimate=False,
+        rasterize=None,
+        incremental=False,
+        deterministic=False,
         show_and_save=False,
         verbose=False):
     """
@@ -456,9 +1410,9 @@ def show_or_save_plot(
         If `False`, the plot is neither shown nor saved. If `True` or `None`,
         the plot is shown. If string, the plot is saved instead, where the
         filename is the given string. If the filename contains no file
-        extension, the plot is saved as both ``svg`` and ``pdf`` format. If the
-        filename contains no directory path, the plot is saved in the current
-        directory.
+        extension, the plot is saved in all formats given by ``formats``. If
+        the filename contains no directory path, the plot is saved in the
+        current directory.
 
     default_filename : str, default=None
         If the plot cannot be shown (such as when no graphical backend exists),
@@ -472,16 +1426,53 @@ def show_or_save_plot(
     bbox_extra_artist : list, default=None
         A list of extra artists to pass to the renderer.
 
-    dpi : int, default=200
-        Dots per inch for rendering plots.
+    dpi : int or list, default=200
+        Dots per inch for rendering plots. If a list, the raster formats are
+        saved at each dots per inch from a single rendering. See
+        :func:`save_plot`.
 
     bbox_inches: str, default='tight'
-        Bbox in inches.
+        Bbox in inches. The tight bounding box is computed once and cached
+        with the figure until it is changed. See :func:`get_tight_bbox`.
 
     pad_inches: float, default=0.1
         Amount of padding in inches around the figure when ``bbox_inches`` is
         ``tight``.
 
+    formats : list, default=None
+        List of file formats, such as ``svg``, ``pdf``, ``png``, ``eps``, and
+        ``pgf``, to be saved when ``filename`` has no file extension. If
+        `None`, the plot is saved as both ``svg`` and ``pdf``.
+
+    workers : int, default=1
+        Number of threads to write the file formats concurrently. If `1`, the
+        files are written sequentially. If `None`, it is set to the smaller
+        of the number of formats and the number of CPUs. See
+        :func:`save_plot`.
+
+    decimate : bool, default=False
+        If `True`, the dense lines are decimated before saving, which keeps
+        the first, last, minimum, and maximum points within each pixel column
+        at the given ``dpi``. See :func:`save_plot`.
+
+    rasterize : bool or int, default=None
+        Policy to rasterize dense artists in vector formats. If an integer,
+        the lines and collections with more points than this number are
+        rasterized at the given ``dpi``, while text and axes remain vectors.
+        If `True`, the threshold is 10,000 points. If `None` or `False`, no
+        artist is rasterized.
+
+    incremental : bool, default=False
+        If `True`, the files are not written again if they were written from
+        a figure with the same fingerprint (artists, rcParams, and saving
+        arguments), as recorded in a manifest file in the output directory.
+        See :func:`save_plot`.
+
+    deterministic : bool, default=False
+        If `True`, the creation dates are removed from the metadata and the
+        ids of ``svg`` files are hashed with a fixed salt, so that the same
+        figure is written to byte-identical files. See :func:`save_plot`.
+
     show_and_save : bool, default=False
         By default, the plot is either shown xor saved. But when this argument
         is `True`, the plot is forced to both be shown and saved.
@@ -545,15 +1536,22 @@ def show_or_save_plot(
     # Save plot to file(s)
     if save:
 
+        # The saved figure is closed by its object below, even if the current
+        # figure changes meanwhile.
+        fig = plt.gcf()
+
         # write the plot as SVG file in the current working directory
         save_plot(plt, filename,
                   transparent_background=transparent_background,
                   bbox_extra_artists=bbox_extra_artists, pad_inches=pad_inches,
-                  bbox_inches=bbox_inches, dpi=dpi, verbose=verbose)
+                  bbox_inches=bbox_inches, dpi=dpi, formats=formats,
+                  workers=workers, decimate=decimate, rasterize=rasterize,
+                  incremental=incremental, deterministic=deterministic,
+                  verbose=verbose)
 
         # Closing is necessary especially if a large number of plots are saved.
         if not show:
-            plt.close()
+            _close_figure(fig)
 
     # Show plot
     if show:
@@ -0,0 +1,647 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import weakref
+import threading
+from collections import OrderedDict
+import numpy
+import matplotlib
+from .profile_utilities import _record
+from .rc_utilities import _get_rc_items
+
+__all__ = ['subplots', 'release_figure', 'set_figure_pool',
+           'get_figure_pool_info', 'reset_figure_pool']
+
+# Maximum number of idle figures in the pool
+_POOL_SIZE = 8
+
+# Idle figures by their key, in the order of their release, and the state of
+# the figures that were created by the pool, which are released with the
+# figures.
+_pool = OrderedDict()
+_pool_lock = threading.Lock()
+_pool_stats = {'hits': 0, 'misses': 0, 'discarded': 0}
+_pool_config = {'max_size': _POOL_SIZE}
+_figure_states = weakref.WeakKeyDictionary()
+
+# Texts of an axes that are kept when it is reused
+_AXES_TEXTS = ['title', '_left_title', '_right_title']
+
+
+# ==========
+# get rc key
+# ==========
+
+def _get_rc_key():
+    """
+    Returns a hashable key of the current rcParams, which determine the
+    style of a new figure.
+    """
+
+    # Values such as the property cycler are not hashable, but their
+    # representation is. The thread-local theme, if any, is included.
+    return tuple((key, repr(value)) for key, value in
+                 sorted(_get_rc_items().items()))
+
+
+# ==============
+# get text state
+# ==============
+
+def _get_text_state(text):
+    """
+    Returns the properties of a text that are kept when a figure is reused,
+    other than its string and its position, which is updated at each draw.
+    """
+
+    # The font properties are hashed, since they are changed in place
+    return (text.get_visible(), text.get_color(),
+            hash(text.get_fontproperties()), text.get_rotation(),
+            text.get_horizontalalignment(), text.get_verticalalignment(),
+            text.get_bbox_patch() is None, text.get_alpha(),
+            text.get_zorder(), text.get_usetex())
+
+
+# ==============
+# get tick state
+# ==============
+
+def _get_tick_state(tick):
+    """
+    Returns the properties of a tick, which are copied to the ticks that are
+    created when the axis is drawn.
+    """
+
+    lines = tuple((line.get_visible(), line.get_color(), line.get_linewidth(),
+                   line.get_linestyle(), line.get_markersize())
+                  for line in [tick.tick1line, tick.tick2line, tick.gridline])
+
+    return (_get_text_state(tick.label1), _get_text_state(tick.label2), lines)
+
+
+# ==============
+# get axis state
+# ==============
+
+def _get_axis_state(axis):
+    """
+    Returns the properties of an x or y axis that are kept when a figure is
+    reused.
+    """
+
+    get_converter = getattr(axis, 'get_converter', None)
+    converter = axis.converter if get_converter is None else get_converter()
+
+    return (axis.get_visible(), axis.get_label_position(),
+            axis.get_ticks_position(), axis.get_units() is None,
+            converter is None, axis.get_inverted(),
+            getattr(axis, '_autolabelpos', None), _get_text_state(axis.label),
+            _get_text_state(axis.offsetText),
+            _get_tick_state(axis.majorTicks[0]),
+            _get_tick_state(axis.minorTicks[0]))
+
+
+# ==============
+# get axes state
+# ==============
+
+def _get_axes_state(ax):
+    """
+    Returns the properties of an axes that are kept when a figure is reused.
+    The properties that are restored on release are not included.
+    """
+
+    spines = tuple((name, spine.get_visible(), spine.get_position(),
+                    spine.get_edgecolor(), spine.get_linewidth(),
+                    spine.get_linestyle(), spine.get_bounds())
+                   for name, spine in ax.spines.items())
+
+    return (ax.get_visible(), ax.axison, ax.get_frame_on(),
+            ax.get_facecolor(), ax.get_axisbelow(), ax.get_navigate(),
+            ax.get_aspect(), ax.get_box_aspect(), ax.get_anchor(),
+            ax.get_adjustable(), ax.get_zorder(), ax.get_alpha(),
+            tuple(ax.get_position(original=True).bounds),
+            tuple(ax.titleOffsetTrans.get_matrix().ravel()),
+            getattr(ax, '_autotitlepos', None),
+            tuple(_get_text_state(getattr(ax, name))
+                  for name in _AXES_TEXTS),
+            _get_axis_state(ax.xaxis), _get_axis_state(ax.yaxis), spines)
+
+
+# ================
+# get figure state
+# ================
+
+def _get_figure_state(fig):
+    """
+    Returns the properties of a figure and its axes that are kept when the
+    figure is reused. A figure is pooled only if these properties are the
+    same as when it was created.
+    """
+
+    return (fig.get_facecolor(), fig.get_edgecolor(), fig.get_frameon(),
+            fig.get_layout_engine() is None, len(fig.subfigs),
+            len(fig.texts), len(fig.legends), len(fig.images),
+            len(fig.lines), len(fig.patches), len(fig.artists),
+            tuple(id(ax) for ax in fig.axes),
+            tuple(_get_axes_state(ax) for ax in fig.axes))
+
+
+# ==========
+# reset axes
+# ==========
+
+def _reset_axes(ax, axes_state):
+    """
+    Removes the artists that were added to an axes, and restores the
+    properties that plots commonly change, such as the titles, labels,
+    scales, ticks, and limits.
+
+    ``ax.clear()`` restores all properties, but it takes longer than creating
+    a new figure, since it creates the ticks and spines anew.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.transforms import Bbox
+
+    for artist in list(ax.get_children()):
+        if (id(artist) not in axes_state['children']) and \
+                (artist.axes is ax):
+            artist.remove()
+
+    ax.containers.clear()
+    ax.legend_ = None
+
+    for name in _AXES_TEXTS:
+        getattr(ax, name).set_text('')
+    ax.xaxis.label.set_text('')
+    ax.yaxis.label.set_text('')
+
+    # Setting the scales also restores the default locators and formatters
+    ax.set_xscale('linear')
+    ax.set_yscale('linear')
+
+    # Restore the tick and grid parameters, such as by ax.grid(). The ticks
+    # are created anew only if the parameters were changed, since creating
+    # them takes most of the time of the reset.
+    for axis, name in [(ax.xaxis, 'x'), (ax.yaxis, 'y')]:
+        tick_kw = axes_state[name + '_tick_kw']
+        minor_tick_kw = axes_state[name + '_minor_tick_kw']
+        if (axis._major_tick_kw != tick_kw) or \
+                (axis._minor_tick_kw != minor_tick_kw):
+            axis._major_tick_kw = dict(tick_kw)
+            axis._minor_tick_kw = dict(minor_tick_kw)
+            axis.reset_ticks()
+
+    ax.set_prop_cycle(None)
+    ax.set_aspect(axes_state['aspect'])
+    ax.set_xmargin(matplotlib.rcParams['axes.xmargin'])
+    ax.set_ymargin(matplotlib.rcParams['axes.ymargin'])
+
+    # Forget the data limits, and autoscale the view limits at the next plot
+    ax.dataLim.set_points(Bbox.null().get_points())
+    ax.ignore_existing_data_limits = True
+    ax.set_xlim(0, 1, auto=True)
+    ax.set_ylim(0, 1, auto=True)
+    ax.stale = True
+
+
+# ============
+# reset figure
+# ============
+
+def _reset_figure(fig, state):
+    """
+    Restores a figure to its state when it was created, and returns `False`
+    if the figure was changed in a way that cannot be restored.
+    """
+
+    # Axes that were added or removed, such as by ax.twinx()
+    if tuple(id(ax) for ax in fig.axes) != state['axes']:
+        return False
+
+    for ax, axes_state in zip(fig.axes, state['axes_states']):
+        _reset_axes(ax, axes_state)
+
+    fig.set_size_inches(state['size'], forward=False)
+    fig.set_dpi(state['dpi'])
+    fig.subplots_adjust(**state['subplotpars'])
+    fig.set_layout_engine(state['layout_engine'])
+
+    return _get_figure_state(fig) == state['figure_state']
+
+
+# ============
+# is supported
+# ============
+
+def _is_supported(plt, fig, ax):
+    """
+    Returns whether a figure can be pooled. The pool uses private attributes
+    of matplotlib to restore the ticks and to register a reused figure with
+    pyplot, and the figures are only closed on release without them.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib import _pylab_helpers
+
+    if not hasattr(plt, '_get_backend_mod') or \
+            not hasattr(_pylab_helpers.Gcf, '_set_new_active_manager'):
+        return False
+
+    for ax_ in fig.axes:
+        for axis in [ax_.xaxis, ax_.yaxis]:
+            if not all(hasattr(axis, name) for name in
+                       ['_major_tick_kw', '_minor_tick_kw', 'reset_ticks']):
+                return False
+
+    # The axes that are returned for a reused figure are those of the figure
+    return [id(ax_) for ax_ in numpy.ravel(ax)] == \
+        [id(ax_) for ax_ in fig.axes]
+
+
+# ========
+# get axes
+# ========
+
+def _get_axes(fig, shape):
+    """
+    Returns the axes of a figure in the shape that ``plt.subplots`` returned
+    them, which is `None` for a single axes.
+    """
+
+    if shape is None:
+        return fig.axes[0]
+
+    ax = numpy.empty(len(fig.axes), dtype=object)
+    ax[:] = fig.axes
+
+    return ax.reshape(shape)
+
+
+# ===============
+# register figure
+# ===============
+
+def _register_figure(plt, fig):
+    """
+    Registers a figure with pyplot as the current figure, with a new figure
+    manager of the current backend.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib import _pylab_helpers
+
+    num = max(plt.get_fignums(), default=0) + 1
+    manager = plt._get_backend_mod().new_figure_manager_given_figure(num, fig)
+    _pylab_helpers.Gcf._set_new_active_manager(manager)
+
+
+# ========
+# subplots
+# ========
+
+def subplots(
+        nrows=1,
+        ncols=1,
+        figsize=None,
+        dpi=None,
+        sharex=False,
+        sharey=False,
+        squeeze=True,
+        subplot_kw=None,
+        gridspec_kw=None):
+    """
+    Creates a figure and a grid of axes, or reuses an idle figure of the
+    pool with the same layout and theme.
+
+    Parameters
+    ----------
+
+    nrows, ncols : int, default=1
+        Number of rows and columns of the grid of axes.
+
+    figsize : tuple, default=None
+        Width and height of the figure in inches. If `None`,
+        ``rcParams['figure.figsize']`` is used.
+
+    dpi : float, default=None
+        Dots per inch of the figure. If `None`, ``rcParams['figure.dpi']`` is
+        used.
+
+    sharex, sharey : bool or {'none', 'all', 'row', 'col'}, default=False
+        Share the x or y axis among the axes. See
+        ``matplotlib.pyplot.subplots``.
+
+    squeeze : bool, default=True
+        If `True`, the extra dimensions of the returned array of axes are
+        removed. See ``matplotlib.pyplot.subplots``.
+
+    subplot_kw : dict, default=None
+        Keyword arguments to create each axes, such as ``projection``.
+
+    gridspec_kw : dict, default=None
+        Keyword arguments of the grid of axes, such as ``width_ratios``.
+
+    Returns
+    -------
+
+    fig : matplotlib.figure.Figure
+        The figure, which is registered with pyplot as the current figure.
+
+    ax : matplotlib.axes.Axes or numpy.ndarray
+        The axes of the figure, as returned by ``matplotlib.pyplot.subplots``.
+
+    See Also
+    --------
+
+    texplot.release_figure
+    texplot.get_figure_pool_info
+
+    Notes
+    -----
+
+    This function can replace ``plt.subplots``. After the figure is saved,
+    :func:`texplot.release_figure` returns it to the pool, from which the
+    next call with the same arguments takes it, instead of creating a new
+    figure. Figures are pooled only when they are released explicitly, and
+    :func:`texplot.show_or_save_plot` and :func:`texplot.save_plot` with
+    ``close=True`` only close them.
+
+    Figures are pooled by the arguments of this function and by the current
+    rcParams, so a figure is reused only within the same theme.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+        >>> from texplot.examples import plot_function
+
+        >>> with texplot.theme(use_latex=False):
+        ...     for i in range(10):
+        ...         fig, ax = texplot.subplots()
+        ...         plot_function(ax)
+        ...         texplot.save_plot(plt, 'function-%d.svg' % i)
+        ...         texplot.release_figure(fig)
+
+        >>> texplot.get_figure_pool_info()['hits']
+        9
+    """
+
+    # Imported here, since this module is imported with texplot
+    import matplotlib.pyplot as plt
+
+    arguments = (nrows, ncols, figsize, dpi, sharex, sharey, squeeze,
+                 subplot_kw, gridspec_kw)
+
+    try:
+        key = (repr(arguments), _get_rc_key())
+    except Exception:
+        key = None
+
+    fig = None
+    if key is not None:
+        with _pool_lock:
+            figures = _pool.get(key, None)
+            if figures:
+                fig = figures.pop()
+                if not figures:
+                    del _pool[key]
+                _pool_stats['hits'] += 1
+            else:
+                _pool_stats['misses'] += 1
+
+    if fig is not None:
+        with _record('subplots', 'pool', pooled=True):
+            _register_figure(plt, fig)
+        return fig, _get_axes(fig, _figure_states[fig]['shape'])
+
+    with _record('subplots', 'pool', pooled=False):
+        fig, ax = plt.subplots(
+            nrows=nrows, ncols=ncols, figsize=figsize, dpi=dpi, sharex=sharex,
+            sharey=sharey, squeeze=squeeze, subplot_kw=subplot_kw,
+            gridspec_kw=gridspec_kw)
+
+    # The state does not refer to the figure or its axes, so that a figure
+    # that is closed without being released is freed.
+    if (key is not None) and _is_supported(plt, fig, ax):
+        subplotpars = fig.subplotpars
+        _figure_states[fig] = {
+            'key': key,
+            'shape': numpy.shape(ax) if isinstance(ax, numpy.ndarray)
+            else None,
+            'size': tuple(fig.get_size_inches()),
+            'dpi': fig.dpi,
+            'subplotpars': {name: getattr(subplotpars, name) for name in
+                            ['left', 'bottom', 'right', 'top', 'wspace',
+                             'hspace']},
+            'layout_engine': fig.get_layout_engine(),
+            'axes': tuple(id(ax_) for ax_ in fig.axes),
+            'axes_states': [{
+                'children': {id(artist) for artist in ax_.get_children()},
+                'aspect': ax_.get_aspect(),
+                'x_tick_kw': dict(ax_.xaxis._major_tick_kw),
+                'x_minor_tick_kw': dict(ax_.xaxis._minor_tick_kw),
+                'y_tick_kw': dict(ax_.yaxis._major_tick_kw),
+                'y_minor_tick_kw': dict(ax_.yaxis._minor_tick_kw),
+            } for ax_ in fig.axes],
+            'figure_state': _get_figure_state(fig),
+        }
+
+    return fig, ax
+
+
+# ==============
+# release figure
+# ==============
+
+def release_figure(fig):
+    """
+    Closes a figure and returns it to the pool of :func:`texplot.subplots`.
+
+    Parameters
+    ----------
+
+    fig : matplotlib.figure.Figure
+        The figure. If it was not created by :func:`texplot.subplots`, or if
+        the installed matplotlib lacks the private attributes that the pool
+        uses, it is only closed.
+
+    Returns
+    -------
+
+    pooled : bool
+        `True` if the figure was returned to the pool, and `False` if it was
+        only closed.
+
+    See Also
+    --------
+
+    texplot.subplots
+    texplot.reset_figure_pool
+
+    Notes
+    -----
+
+    The figure is cleared by removing the artists that were added to its
+    axes, and by restoring the titles, labels, scales, ticks, grids, limits,
+    aspect, and property cycle of the axes, and the size, dpi, and layout of
+    the figure. The figure is not pooled if it was changed in other ways,
+    such as by adding axes or figure texts, or changing the spines or
+    colors, which are checked after the figure is cleared.
+
+    If the pool is full, the figure that was released first is discarded.
+    The figure should not be used after it is released.
+    """
+
+    # Imported here, since this module is imported with texplot
+    import matplotlib.pyplot as plt
+
+    plt.close(fig)
+
+    state = _figure_states.get(fig, None)
+    if state is None:
+        return False
+
+    with _record('release_figure', 'pool'):
+        pooled = _reset_figure(fig, state)
+
+    with _pool_lock:
+        if not pooled or (_pool_config['max_size'] == 0):
+            _pool_stats['discarded'] += 1
+            _figure_states.pop(fig, None)
+            return False
+
+        _pool.setdefault(state['key'], []).append(fig)
+        _pool.move_to_end(state['key'])
+
+        # Discard the idle figures that were released first
+        size = sum(len(figures) for figures in _pool.values())
+        while size > _pool_config['max_size']:
+            key, figures = next(iter(_pool.items()))
+            _figure_states.pop(figures.pop(0), None)
+            if not figures:
+                del _pool[key]
+            _pool_stats['discarded'] += 1
+            size -= 1
+
+    return True
+
+
+# ===============
+# set figure pool
+# ===============
+
+def set_figure_pool(max_size=_POOL_SIZE):
+    """
+    Sets the maximum number of idle figures in the pool of
+    :func:`texplot.subplots`.
+
+    Parameters
+    ----------
+
+    max_size : int, default=8
+        Maximum number of idle figures. The figures that are in use are not
+        counted. If `0`, figures are not pooled.
+
+    Raises
+    ------
+
+    ValueError
+        If ``max_size`` is negative.
+
+    See Also
+    --------
+
+    texplot.get_figure_pool_info
+    """
+
+    if max_size < 0:
+        raise ValueError('"max_size" should be non-negative.')
+
+    with _pool_lock:
+        _pool_config['max_size'] = int(max_size)
+
+        while sum(len(figures) for figures in _pool.values()) > max_size:
+            key, figures = next(iter(_pool.items()))
+            _figure_states.pop(figures.pop(0), None)
+            if not figures:
+                del _pool[key]
+            _pool_stats['discarded'] += 1
+
+
+# ====================
+# get figure pool info
+# ====================
+
+def get_figure_pool_info():
+    """
+    Returns the statistics of the pool of :func:`texplot.subplots`.
+
+    Returns
+    -------
+
+    pool_info : dict
+        A dictionary with the following keys:
+
+        * ``hits`` and ``misses``: the number of calls to
+          :func:`texplot.subplots` that reused a figure, or created one.
+        * ``discarded``: the number of released figures that were not pooled,
+          either since they could not be cleared, or since the pool was full.
+        * ``size``: the number of idle figures in the pool.
+        * ``maxsize``: the maximum number of idle figures.
+
+    See Also
+    --------
+
+    texplot.set_figure_pool
+    texplot.reset_figure_pool
+    """
+
+    with _pool_lock:
+        return {
+            'hits': _pool_stats['hits'],
+            'misses': _pool_stats['misses'],
+            'discarded': _pool_stats['discarded'],
+            'size': sum(len(figures) for figures in _pool.values()),
+            'maxsize': _pool_config['max_size'],
+        }
+
+
+# =================
+# reset figure pool
+# =================
+
+def reset_figure_pool():
+    """
+    Discards the idle figures of the pool of :func:`texplot.subplots`, and
+    resets the pool statistics.
+
+    See Also
+    --------
+
+    texplot.get_figure_pool_info
+    """
+
+    with _pool_lock:
+        for figures in _pool.values():
+            for fig in figures:
+                _figure_states.pop(fig, None)
+        _pool.clear()
+
+        _pool_stats['hits'] = 0
+        _pool_stats['misses'] = 0
+        _pool_stats['discarded'] = 0
@@ -0,0 +1,289 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import json
+import time
+import atexit
+import threading
+import contextlib
+
+__all__ = ['profile']
+
+# Reports of the active profiles. Events are recorded only if this list is
+# not empty, so the instrumentation costs a list lookup when disabled.
+_active = []
+_profile_lock = threading.Lock()
+
+# Original draw method of matplotlib figures, while it is instrumented
+_figure_draw = None
+
+
+# ======
+# record
+# ======
+
+@contextlib.contextmanager
+def _record(name, category, **args):
+    """
+    Context manager that records the wall time of its scope as an event of
+    the active profiles.
+    """
+
+    if not _active:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        event = {
+            'name': name,
+            'category': category,
+            'start': start,
+            'duration': duration,
+            'thread': threading.get_ident(),
+            'args': args,
+        }
+
+        with _profile_lock:
+            for report in _active:
+                report['events'].append(event)
+
+
+# ===============
+# instrument draw
+# ===============
+
+def _instrument_draw(enable):
+    """
+    Replaces the draw method of matplotlib figures with one that records
+    each draw, or restores the original method.
+    """
+
+    global _figure_draw
+
+    from matplotlib.figure import Figure
+
+    if enable and (_figure_draw is None):
+        _figure_draw = Figure.draw
+
+        def draw(self, renderer):
+            with _record('draw', 'draw',
+                         renderer=type(renderer).__name__):
+                return _figure_draw(self, renderer)
+
+        draw.__doc__ = _figure_draw.__doc__
+        draw.__wrapped__ = _figure_draw
+        Figure.draw = draw
+
+    elif (not enable) and (_figure_draw is not None):
+        Figure.draw = _figure_draw
+        _figure_draw = None
+
+
+# =========
+# summarize
+# =========
+
+def _summarize(events):
+    """
+    Returns the count, total, mean and maximum wall time of the events of
+    each name.
+    """
+
+    summary = {}
+    for event in events:
+        entry = summary.setdefault(event['name'], {
+            'category': event['category'],
+            'count': 0,
+            'total': 0.0,
+            'max': 0.0,
+        })
+        entry['count'] += 1
+        entry['total'] += event['duration']
+        entry['max'] = max(entry['max'], event['duration'])
+
+    for entry in summary.values():
+        entry['mean'] = entry['total'] / entry['count']
+
+    return summary
+
+
+# ============
+# write report
+# ============
+
+def _write_report(report, filename, format):
+    """
+    Writes a profile to a JSON file, either as the report itself, or as
+    events in the Chrome trace format (which can be opened in
+    ``chrome://tracing`` or https://ui.perfetto.dev).
+    """
+
+    if format == 'json':
+        data = report
+
+    elif format == 'chrome':
+        pid = os.getpid()
+        origin = min([event['start'] for event in report['events']],
+                     default=0.0)
+        data = {
+            'traceEvents': [{
+                'name': event['name'],
+                'cat': event['category'],
+                'ph': 'X',
+                'ts': (event['start'] - origin) * 1e6,
+                'dur': event['duration'] * 1e6,
+                'pid': pid,
+                'tid': event['thread'],
+                'args': event['args'],
+            } for event in report['events']],
+            'displayTimeUnit': 'ms',
+        }
+
+    else:
+        raise ValueError('"format" should be "json" or "chrome".')
+
+    with open(os.path.expanduser(filename), 'w') as file:
+        json.dump(data, file, indent=1, default=str)
+
+
+# =======
+# profile
+# =======
+
+@contextlib.contextmanager
+def profile(filename=None, format='json'):
+    """
+    Context manager that records the time spent in texplot and matplotlib
+    within its scope.
+
+    Parameters
+    ----------
+
+    filename : str, default=None
+        If given, the profile is written to this file on exit.
+
+    format : {'json', 'chrome'}, default='json'
+        Format of the file. ``json`` writes the report that this context
+        yields. ``chrome`` writes the events in the Chrome trace format,
+        which can be opened in ``chrome://tracing`` or
+        https://ui.perfetto.dev.
+
+    Yields
+    ------
+
+    report : dict
+        A dictionary with the following keys:
+
+        * ``events``: a list of events, each a dictionary with the keys
+          ``name``, ``category``, ``start`` and ``duration`` (in seconds),
+          ``thread``, and ``args``.
+        * ``summary``: a dictionary that maps each event name to its
+          ``category``, ``count``, and ``total``, ``mean``, and ``max`` wall
+          times in seconds. It is filled on exit.
+
+    Notes
+    -----
+
+    The following events are recorded:
+
+    * ``get_theme`` (when a theme is created rather than read from the
+      cache), ``set_theme``, and ``rcparams.update`` (when a theme is applied
+      or restored).
+    * ``save_plot``, and within it, ``fingerprint``, ``decimate``,
+      ``rasterize``, ``bbox`` (the tight bounding box), and ``write`` for each
+      file, with its filename and format.
+    * ``draw`` for each draw of a matplotlib figure, including the draws
+      within ``savefig``.
+    * ``tex.make_dvi`` and ``tex.make_png`` for each string rendered with
+      LaTeX, and whether it was cached.
+    * ``subplots``, with whether the figure was taken from the pool, and
+      ``release_figure`` (see :func:`texplot.subplots`).
+
+    Profiling can also be enabled for a whole script by setting the
+    environment variable ``TEXPLOT_PROFILE`` to a filename, and optionally
+    ``TEXPLOT_PROFILE_FORMAT`` to ``chrome``. The profile is then written when
+    the interpreter exits.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+        >>> from texplot.examples import plot_function
+
+        >>> with texplot.profile('profile.json', format='chrome') as report:
+        ...     with texplot.theme(use_latex=False):
+        ...         fig, ax = plt.subplots()
+        ...         plot_function(ax)
+        ...         texplot.save_plot(plt, 'function')
+
+        >>> report['summary']['draw']['count']
+        3
+    """
+
+    if format not in ['json', 'chrome']:
+        raise ValueError('"format" should be "json" or "chrome".')
+
+    # Imported here, since it imports plot_utilities, which imports this
+    # module.
+    from .tex_cache_utilities import _install
+
+    report = {'events': [], 'summary': {}}
+
+    with _profile_lock:
+        _active.append(report)
+        _instrument_draw(True)
+
+    # Count the LaTeX renders
+    _install()
+
+    try:
+        yield report
+
+    finally:
+        with _profile_lock:
+            _active.remove(report)
+            if not _active:
+                _instrument_draw(False)
+
+        report['summary'] = _summarize(report['events'])
+
+        if filename is not None:
+            _write_report(report, filename, format)
+
+
+# ====================
+# profile from environ
+# ====================
+
+def _profile_from_environ():
+    """
+    Starts a profile for the lifetime of the interpreter if the environment
+    variable ``TEXPLOT_PROFILE`` is set.
+    """
+
+    filename = os.environ.get('TEXPLOT_PROFILE', '')
+    if filename == '':
+        return
+
+    format = os.environ.get('TEXPLOT_PROFILE_FORMAT', 'json')
+    context = profile(filename, format=format)
+    context.__enter__()
+    atexit.register(context.__exit__, None, None, None)
@@ -0,0 +1,270 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import io
+import os
+import numpy
+from .profile_utilities import _record
+
+__all__ = ['write_raster_files']
+
+# Raster formats that are encoded from a rendered buffer
+_RASTER_EXTENSIONS = ['.png', '.jpg', '.jpeg', '.tif', '.tiff', '.webp']
+
+# Formats of the raster extensions that are named differently by Pillow
+_IMAGE_FORMATS = {
+    '.jpg': 'jpeg',
+    '.tif': 'tiff',
+}
+
+
+# ===========
+# render rgba
+# ===========
+
+def _render_rgba(fig, savefig_kwargs):
+    """
+    Renders a figure once with Agg and returns its pixels as an array of
+    shape ``(height, width, 4)`` with ``uint8`` RGBA values.
+    """
+
+    # The pixels are copied from the buffer of the Agg renderer, which is
+    # passed to the draw event, rather than decoded from an image file.
+    renderers = []
+
+    def capture_renderer(event):
+        renderers.append(event.renderer)
+
+    callback_id = fig.canvas.mpl_connect('draw_event', capture_renderer)
+    try:
+        fig.savefig(io.BytesIO(), format='rgba', **savefig_kwargs)
+    finally:
+        fig.canvas.mpl_disconnect(callback_id)
+
+    return numpy.array(renderers[-1].buffer_rgba())
+
+
+# ===========
+# premultiply
+# ===========
+
+def _premultiply(rgba):
+    """
+    Converts an RGBA image with ``uint8`` values to an image with ``float32``
+    values, where the colors are multiplied by the alpha channel.
+    """
+
+    image = rgba.astype(numpy.float32)
+    image[..., :3] *= image[..., 3:] / 255.0
+
+    return image
+
+
+# =============
+# unpremultiply
+# =============
+
+def _unpremultiply(image):
+    """
+    Converts a premultiplied image with ``float32`` values back to an RGBA
+    image with ``uint8`` values.
+    """
+
+    rgba = numpy.empty(image.shape, dtype=numpy.uint8)
+
+    alpha = image[..., 3:]
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        color = numpy.where(alpha > 0, image[..., :3] * (255.0 / alpha), 0)
+
+    rgba[..., :3] = color.round().clip(0, 255)
+    rgba[..., 3:] = alpha.round().clip(0, 255)
+
+    return rgba
+
+
+# ==========
+# box reduce
+# ==========
+
+def _box_reduce(image, factor):
+    """
+    Downsamples a premultiplied image by an integer factor, where each output
+    pixel is the average of a block of ``factor x factor`` input pixels. The
+    blocks are summed over strided views of the input, without copying it.
+    """
+
+    height = image.shape[0] // factor
+    width = image.shape[1] // factor
+
+    output = numpy.zeros((height, width, image.shape[2]), dtype=image.dtype)
+    for i in range(factor):
+        for j in range(factor):
+            output += image[i:height * factor:factor, j:width * factor:factor]
+
+    output *= 1.0 / factor**2
+
+    return output
+
+
+# ==========
+# box resize
+# ==========
+
+def _box_resize(rgba, size, box):
+    """
+    Resamples the region ``box`` (left, top, right, bottom in pixels) of an
+    RGBA image to an image of the given ``(width, height)``, with box
+    resampling of the premultiplied image.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from PIL import Image
+
+    height, width = rgba.shape[:2]
+    box = (max(0.0, box[0]), max(0.0, box[1]), min(float(width), box[2]),
+           min(float(height), box[3]))
+
+    image = Image.fromarray(rgba, 'RGBA').convert('RGBa')
+    image = image.resize(size, Image.Resampling.BOX, box=box)
+
+    return numpy.asarray(image.convert('RGBA'))
+
+
+# ========
+# get size
+# ========
+
+def _get_size(bbox, dpi):
+    """
+    Returns the ``(width, height)`` in pixels of the image that ``savefig``
+    renders for a bounding box in inches. As the canvas does, the size is
+    truncated to integers, but rounded up within a tolerance of ``1e-8``
+    pixel to account for floating-point errors.
+    """
+
+    return (int(bbox.width * dpi + 1e-8), int(bbox.height * dpi + 1e-8))
+
+
+# ===========
+# get factor
+# ===========
+
+def _get_factor(source_dpi, dpi):
+    """
+    Returns the integer ratio of two dots per inch, or `None` if the ratio is
+    not an integer.
+    """
+
+    factor = source_dpi / dpi
+    if abs(factor - round(factor)) < 1e-9:
+        return int(round(factor))
+
+    return None
+
+
+# ==================
+# write raster files
+# ==================
+
+def write_raster_files(fig, targets, savefig_kwargs, verbose=False,
+                       bboxes=None):
+    """
+    Renders a figure once at the highest dots per inch of the targets, and
+    writes each target by downsampling the rendered image.
+
+    ``targets`` is a list of ``(dpi, filename)`` tuples, where the format of
+    each file is one of ``_RASTER_EXTENSIONS``. The ``dpi`` of
+    ``savefig_kwargs`` is replaced by the highest dots per inch.
+
+    ``bboxes`` is a dictionary of the bounding box in inches of each dots per
+    inch, which differ slightly since the texts are measured at each dots
+    per inch. If `None`, the ``bbox_inches`` of ``savefig_kwargs`` (or the
+    whole figure) is used for all of them. Each image has the size that
+    ``savefig`` gives for its bounding box and dots per inch.
+    """
+
+    if len(targets) == 0:
+        return
+
+    # Imported here, since this module is imported with texplot
+    import matplotlib.image
+    from matplotlib.transforms import Bbox
+
+    max_dpi = max(dpi for dpi, _ in targets)
+    savefig_kwargs = dict(savefig_kwargs)
+    savefig_kwargs['dpi'] = max_dpi
+
+    if bboxes is None:
+        bbox = savefig_kwargs.get('bbox_inches', None)
+        if bbox is None:
+            bbox = Bbox.from_bounds(0, 0, *fig.get_size_inches())
+        bboxes = {dpi: bbox for dpi, _ in targets}
+
+    savefig_kwargs['bbox_inches'] = bboxes[max_dpi]
+
+    with _record('render', 'save', dpi=max_dpi):
+        rgba = _render_rgba(fig, savefig_kwargs)
+
+    # The downsampled images by their dots per inch, both premultiplied (to
+    # be reduced further) and as RGBA (to be written)
+    premultiplied = {}
+    images = {max_dpi: rgba}
+
+    for dpi, fullpath_filename in sorted(targets, reverse=True):
+        if dpi not in images:
+            bbox = bboxes[dpi]
+            size = _get_size(bbox, dpi)
+
+            # Reduce the smallest image whose dots per inch is an integer
+            # multiple of this dots per inch, and whose size is an integer
+            # multiple of this size, which is the least work.
+            sources = [
+                source_dpi for source_dpi in images
+                if (_get_factor(source_dpi, dpi) is not None) and
+                numpy.allclose(bboxes[source_dpi].bounds, bbox.bounds) and
+                (images[source_dpi].shape[1::-1] ==
+                 tuple(_get_factor(source_dpi, dpi) * length
+                       for length in size))]
+
+            if len(sources) == 0:
+                # Resample the region of this bounding box in the rendered
+                # image to the size of this image
+                max_bbox = bboxes[max_dpi]
+                left = (bbox.x0 - max_bbox.x0) * max_dpi
+                top = (max_bbox.y1 - bbox.y1) * max_dpi
+                box = (left, top, left + bbox.width * max_dpi,
+                       top + bbox.height * max_dpi)
+                images[dpi] = _box_resize(rgba, size, box)
+
+            else:
+                source_dpi = min(sources)
+                if source_dpi not in premultiplied:
+                    premultiplied[source_dpi] = _premultiply(
+                        images[source_dpi])
+
+                premultiplied[dpi] = _box_reduce(
+                    premultiplied[source_dpi],
+                    _get_factor(source_dpi, dpi))
+                images[dpi] = _unpremultiply(premultiplied[dpi])
+
+        # Pillow does not recognize the format names of some extensions
+        extension = os.path.splitext(fullpath_filename)[1].lower()
+        image_format = _IMAGE_FORMATS.get(extension, extension[1:])
+
+        with _record('write', 'save', filename=fullpath_filename,
+                     format=extension):
+            matplotlib.image.imsave(fullpath_filename, images[dpi], dpi=dpi,
+                                    format=image_format)
+
+        if verbose:
+            print('Plot saved to "%s".' % fullpath_filename)
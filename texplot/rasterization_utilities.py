@@ -0,0 +1,131 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import contextlib
+import numpy
+
+__all__ = ['rasterize_artists']
+
+# Default number of points above which an artist is rasterized
+_RASTERIZE_THRESHOLD = 10000
+
+
+# ============
+# count points
+# ============
+
+def _count_points(artist):
+    """
+    Returns the number of data points of an artist, or `None` if the artist
+    is not a line or a collection.
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.lines import Line2D
+    from matplotlib.collections import Collection, QuadMesh
+
+    if isinstance(artist, Line2D):
+        return numpy.size(artist.get_xdata(orig=False))
+
+    elif isinstance(artist, QuadMesh):
+        return numpy.prod(artist.get_coordinates().shape[:2])
+
+    elif isinstance(artist, Collection):
+        # Scatter plots have one offset per point, and line collections have
+        # one path per line.
+        num_offsets = len(artist.get_offsets())
+        num_vertices = sum(len(path.vertices) for path in artist.get_paths())
+        return max(num_offsets, num_vertices)
+
+    return None
+
+
+# =============
+# get threshold
+# =============
+
+def _get_threshold(rasterize):
+    """
+    Returns the point-count threshold of the rasterization policy, or `None`
+    if no artist should be rasterized.
+    """
+
+    if (rasterize is None) or (rasterize is False):
+        return None
+    elif rasterize is True:
+        return _RASTERIZE_THRESHOLD
+    elif isinstance(rasterize, (int, numpy.integer)) and (rasterize >= 0):
+        return int(rasterize)
+    else:
+        raise ValueError('"rasterize" should be boolean, None, or a ' +
+                         'non-negative integer.')
+
+
+# =================
+# rasterize artists
+# =================
+
+@contextlib.contextmanager
+def rasterize_artists(fig, rasterize):
+    """
+    Context manager that rasterizes the dense artists of a figure when it is
+    saved to a vector format, and restores their original setting on exit.
+
+    Parameters
+    ----------
+
+    fig : matplotlib.figure.Figure
+        Figure to be saved.
+
+    rasterize : bool, int, or None
+        If `None` or `False`, no artist is rasterized. If an integer, the
+        lines and collections (such as scatter plots) with more points than
+        this number are rasterized. If `True`, the threshold is 10,000 points.
+
+    Notes
+    -----
+
+    Text, axes, ticks, and spines are never rasterized, so labels (including
+    LaTeX labels) remain vectors. The rasterized artists are rendered at the
+    dots per inch passed to ``savefig``.
+
+    Yields a dictionary with the keys ``artists`` (the number of rasterized
+    artists) and ``points`` (their total number of points).
+    """
+
+    threshold = _get_threshold(rasterize)
+
+    stats = {'artists': 0, 'points': 0}
+    rasterized = []
+
+    try:
+        if threshold is not None:
+            for ax in fig.get_axes():
+                for artist in ax.get_children():
+                    if artist.get_rasterized():
+                        continue
+
+                    num_points = _count_points(artist)
+                    if (num_points is None) or (num_points <= threshold):
+                        continue
+
+                    artist.set_rasterized(True)
+                    rasterized.append(artist)
+                    stats['artists'] += 1
+                    stats['points'] += int(num_points)
+
+        yield stats
+
+    finally:
+        for artist in rasterized:
+            artist.set_rasterized(False)
@@ -0,0 +1,206 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import threading
+import contextlib
+import matplotlib
+
+__all__ = []
+
+# The rcParams that each thread sets within a thread-local theme, which
+# override the global rcParams in that thread. A thread without a
+# thread-local theme has no overlay (None).
+_local = threading.local()
+_install_lock = threading.Lock()
+
+# The private methods of matplotlib.RcParams that the thread-local rcParams
+# override. These are used by matplotlib since version 3.9.
+_RC_PARAMS_METHODS = ['_get', '_set', '_update_raw']
+
+
+# ======================
+# thread local rc params
+# ======================
+
+class _ThreadLocalRcParams(matplotlib.RcParams):
+    """
+    The class of the global rcParams once a thread-local theme is used.
+
+    Matplotlib reads and writes the rcParams through the ``_get``, ``_set``,
+    and ``_update_raw`` methods, which use the overlay of the current thread
+    if it has one, and the global values otherwise. Copies of the rcParams
+    have no overlay.
+    """
+
+    def _get(self, key):
+        overlay = getattr(_local, 'overlay', None)
+        if (overlay is not None) and (key in overlay) and \
+                (self is matplotlib.rcParams):
+            return overlay[key]
+
+        return dict.__getitem__(self, key)
+
+    def _set(self, key, val):
+        overlay = getattr(_local, 'overlay', None)
+        if (overlay is not None) and (self is matplotlib.rcParams):
+            overlay[key] = val
+        else:
+            dict.__setitem__(self, key, val)
+
+    def _update_raw(self, other_params):
+        overlay = getattr(_local, 'overlay', None)
+        if (overlay is not None) and (self is matplotlib.rcParams):
+            if isinstance(other_params, matplotlib.RcParams):
+                other_params = {key: other_params._get(key)
+                                for key in other_params}
+
+            # Matplotlib restores all rcParams at once, such as on the exit
+            # of rc_context. Only those that differ from the global values
+            # are kept, so that the thread still follows the other global
+            # rcParams.
+            for key, val in other_params.items():
+                if (key in overlay) or \
+                        (val != dict.get(self, key, None)):
+                    overlay[key] = val
+        else:
+            super()._update_raw(other_params)
+
+
+# =======
+# install
+# =======
+
+def _install():
+    """
+    Changes the class of the global rcParams, so that it reads the overlays
+    of the threads. Until a thread-local theme is used, the rcParams are not
+    changed, and reading them has no overhead.
+
+    If the rcParams of the installed matplotlib do not have the methods that
+    are overridden, the rcParams would not read the overlays, so a
+    ``RuntimeError`` is raised.
+    """
+
+    missing = [name for name in _RC_PARAMS_METHODS
+               if not hasattr(matplotlib.RcParams, name)]
+    if len(missing) > 0:
+        raise RuntimeError(
+            'Thread-local themes require matplotlib 3.9 or newer, but the '
+            'installed matplotlib %s does not have "RcParams.%s".'
+            % (matplotlib.__version__, missing[0]))
+
+    with _install_lock:
+        rc_params = matplotlib.rcParams
+        if not isinstance(rc_params, _ThreadLocalRcParams):
+            rc_params.__class__ = _ThreadLocalRcParams
+
+
+# ========
+# local rc
+# ========
+
+@contextlib.contextmanager
+def _local_rc(rc=None):
+    """
+    Context manager within which the changes of the rcParams by the current
+    thread are local to the thread, and are discarded on exit. The
+    thread-local rcParams ``rc`` of another thread, returned by
+    :func:`_get_local_rc`, can be applied within the context.
+    """
+
+    _install()
+
+    overlay = getattr(_local, 'overlay', None)
+    _local.overlay = {} if overlay is None else dict(overlay)
+    if rc is not None:
+        _local.overlay.update(rc)
+
+    try:
+        yield
+    finally:
+        _local.overlay = overlay
+
+
+# ===============
+# enable local rc
+# ===============
+
+def _enable_local_rc(enable):
+    """
+    Makes the changes of the rcParams by the current thread local to the
+    thread until this function is called with `False`, which discards them.
+    """
+
+    if enable:
+        _install()
+        if getattr(_local, 'overlay', None) is None:
+            _local.overlay = {}
+    else:
+        _local.overlay = None
+
+
+# =========
+# global rc
+# =========
+
+@contextlib.contextmanager
+def _global_rc():
+    """
+    Context manager within which the current thread reads and writes the
+    global rcParams, even if it has a thread-local theme.
+    """
+
+    overlay = getattr(_local, 'overlay', None)
+    _local.overlay = None
+
+    try:
+        yield
+    finally:
+        _local.overlay = overlay
+
+
+# ============
+# get local rc
+# ============
+
+def _get_local_rc():
+    """
+    Returns a copy of the thread-local rcParams of the current thread, or
+    `None` if it has no thread-local theme. These can be applied to another
+    thread, such as a worker of a thread pool, with :func:`_local_rc`.
+    """
+
+    overlay = getattr(_local, 'overlay', None)
+    if overlay is None:
+        return None
+
+    return dict(overlay)
+
+
+# ============
+# get rc items
+# ============
+
+def _get_rc_items():
+    """
+    Returns a dictionary of the rcParams in effect in the current thread,
+    without the validation and the deprecation checks of reading each key.
+    """
+
+    items = dict(dict.items(matplotlib.rcParams))
+
+    overlay = getattr(_local, 'overlay', None)
+    if overlay:
+        items.update(overlay)
+
+    return items
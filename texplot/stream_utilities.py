@@ -0,0 +1,347 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import shutil
+import subprocess
+import contextlib
+import numpy
+import matplotlib
+from .profile_utilities import _record
+
+__all__ = ['stream_frames']
+
+# Arguments of ffmpeg to encode the frames for each video format
+_FFMPEG_CODECS = {
+    '.mp4': ['-vcodec', 'libx264', '-pix_fmt', 'yuv420p'],
+    '.mkv': ['-vcodec', 'libx264', '-pix_fmt', 'yuv420p'],
+    '.mov': ['-vcodec', 'libx264', '-pix_fmt', 'yuv420p'],
+    '.avi': ['-vcodec', 'mpeg4', '-pix_fmt', 'yuv420p'],
+    '.webm': ['-vcodec', 'libvpx-vp9', '-pix_fmt', 'yuva420p'],
+    '.gif': [],
+}
+
+# The yuv420p pixel format needs even width and height
+_FFMPEG_EVEN_SIZE = ['-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2']
+
+
+# ================
+# open ffmpeg pipe
+# ================
+
+def _open_ffmpeg_pipe(fullpath_filename, width, height, fps, ffmpeg_args):
+    """
+    Starts an ffmpeg process that reads raw RGBA frames from its standard
+    input and encodes them to a video file.
+    """
+
+    extension = os.path.splitext(fullpath_filename)[1].lower()
+
+    ffmpeg_path = matplotlib.rcParams['animation.ffmpeg_path']
+    if shutil.which(ffmpeg_path) is None:
+        raise RuntimeError('"%s" was not found. Install ffmpeg, set ' %
+                           ffmpeg_path + 'rcParams["animation.ffmpeg_path"], '
+                           'or stream the frames to a png sequence.')
+
+    if ffmpeg_args is None:
+        ffmpeg_args = list(_FFMPEG_CODECS[extension])
+        if 'yuv420p' in ffmpeg_args:
+            ffmpeg_args += _FFMPEG_EVEN_SIZE
+
+    command = [ffmpeg_path, '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-vcodec', 'rawvideo',
+               '-s', '%dx%d' % (width, height), '-pix_fmt', 'rgba',
+               '-r', str(fps), '-i', '-'] + list(ffmpeg_args) + \
+        [fullpath_filename]
+
+    return subprocess.Popen(command, stdin=subprocess.PIPE,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE)
+
+
+# =================
+# close ffmpeg pipe
+# =================
+
+def _close_ffmpeg_pipe(process):
+    """
+    Waits for ffmpeg to encode the remaining frames, and raises its error if
+    it failed.
+    """
+
+    try:
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+
+    error = process.stderr.read()
+    process.stderr.close()
+
+    if process.wait() != 0:
+        raise RuntimeError('ffmpeg failed with the error: %s' %
+                           error.decode('utf-8', 'replace').strip())
+
+
+# =================
+# get frame pattern
+# =================
+
+def _get_frame_pattern(fullpath_filename):
+    """
+    Returns the filename pattern of a png sequence, such as
+    ``frame-%05d.png``.
+    """
+
+    if '%' in os.path.basename(fullpath_filename):
+        return fullpath_filename
+
+    base, extension = os.path.splitext(fullpath_filename)
+
+    return base + '-%05d' + extension
+
+
+# =============
+# stream frames
+# =============
+
+@contextlib.contextmanager
+def stream_frames(
+        fig,
+        filename,
+        artists=None,
+        fps=30,
+        dpi=None,
+        ffmpeg_args=None,
+        verbose=False):
+    """
+    Context manager that writes the frames of an animation to a video or a
+    png sequence, drawing only the artists that change in each frame.
+
+    Parameters
+    ----------
+
+    fig : matplotlib.figure.Figure
+        The figure to stream. It stays alive during the context, and its
+        artists are updated between the frames.
+
+    filename : str
+        Name of the output file. The extension determines the output:
+
+        * ``.png``: a sequence of png files. If the name contains a format
+          specifier, such as ``frame%03d.png``, it is replaced by the frame
+          index, otherwise ``-00000``, ``-00001``, etc. are appended to the
+          name.
+        * ``.mp4``, ``.mkv``, ``.mov``, ``.avi``, ``.webm``, or ``.gif``: a
+          video encoded by an ``ffmpeg`` subprocess, to which the frames are
+          piped as raw pixels.
+
+    artists : list of matplotlib.artist.Artist, default=None
+        The artists that change between the frames, such as the lines whose
+        data are updated. The rest of the figure is drawn once, and each
+        frame only draws these artists over it (blitting). If `None`, the
+        whole figure is drawn for each frame.
+
+    fps : float, default=30
+        Frames per second of the video.
+
+    dpi : float, default=None
+        Resolution of the frames in dots per inch. If `None`, the dpi of the
+        figure is used.
+
+    ffmpeg_args : list of str, default=None
+        Output arguments of ffmpeg, such as
+        ``['-vcodec', 'libx264', '-crf', '18']``. If `None`, a codec is chosen
+        by the extension of the file.
+
+    verbose : bool, default=False
+        If `True`, the output filename and the number of frames are printed
+        on exit.
+
+    Yields
+    ------
+
+    write_frame : callable
+        A function that writes the current state of the figure as the next
+        frame, and returns the index of the frame. Call
+        ``write_frame(redraw=True)`` to draw the whole figure for one frame,
+        for instance, after the axis limits or a title are changed, which
+        also updates the static part of the next frames.
+
+    Raises
+    ------
+
+    ValueError
+        If the extension of the file is not supported.
+
+    RuntimeError
+        If ffmpeg is not found, or fails to encode the video.
+
+    See Also
+    --------
+
+    texplot.save_plot
+
+    Notes
+    -----
+
+    The figure is drawn with the Agg renderer, and the pixel buffer of each
+    frame is passed to the writer without encoding it to an image first.
+    ffmpeg encodes the frames in a separate process while the next frames
+    are drawn.
+
+    The given ``artists`` are set to be animated during the context, so they
+    are not part of the static background. They are drawn on top of it, so
+    they overlap the spines and the other artists regardless of their
+    ``zorder``. The animated state, the dpi, and the canvas of the figure are
+    restored on exit.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import numpy
+        >>> import matplotlib.pyplot as plt
+        >>> import texplot
+
+        >>> t = numpy.linspace(0, 10, 1000)
+        >>> with texplot.theme(use_latex=False):
+        ...     fig, ax = plt.subplots()
+        ...     line, = ax.plot([], [], color='k')
+        ...     ax.set_xlim(0, 10)
+        ...     ax.set_ylim(-1, 1)
+        ...
+        ...     with texplot.stream_frames(fig, 'wave.mp4', artists=[line],
+        ...                                fps=30) as write_frame:
+        ...         for i in range(1, t.size, 10):
+        ...             line.set_data(t[:i], numpy.sin(t[:i]))
+        ...             write_frame()
+    """
+
+    # Imported here, since this module is imported with texplot
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from PIL import Image
+
+    fullpath_filename = os.path.abspath(os.path.expanduser(filename))
+    extension = os.path.splitext(fullpath_filename)[1].lower()
+
+    if (extension != '.png') and (extension not in _FFMPEG_CODECS):
+        raise ValueError('"filename" should have one of the extensions: ' +
+                         ', '.join(['.png'] + list(_FFMPEG_CODECS)) + '.')
+
+    if artists is None:
+        artists = []
+    else:
+        artists = sorted(artists, key=lambda artist: artist.get_zorder())
+
+    # Draw with Agg regardless of the backend of the figure
+    original_canvas = fig.canvas
+    original_dpi = fig.dpi
+    original_animated = [artist.get_animated() for artist in artists]
+
+    if not isinstance(original_canvas, FigureCanvasAgg):
+        FigureCanvasAgg(fig)
+    canvas = fig.canvas
+
+    if dpi is not None:
+        fig.set_dpi(dpi)
+
+    for artist in artists:
+        artist.set_animated(True)
+
+    # The static part of the figure, restored before each frame
+    state = {'background': None, 'index': 0}
+    process = None
+
+    # ----------
+    # draw frame
+    # ----------
+
+    def draw_frame(redraw):
+        """
+        Draws the figure and returns its pixels.
+        """
+
+        if (not artists) or redraw or (state['background'] is None):
+            canvas.draw()
+            if artists:
+                state['background'] = canvas.copy_from_bbox(fig.bbox)
+        else:
+            canvas.restore_region(state['background'])
+
+        for artist in artists:
+            fig.draw_artist(artist)
+
+        return numpy.asarray(canvas.buffer_rgba())
+
+    # -----------
+    # write frame
+    # -----------
+
+    def write_frame(redraw=False):
+        """
+        Writes the current state of the figure as the next frame.
+        """
+
+        nonlocal process
+
+        index = state['index']
+
+        with _record('frame', 'stream', index=index):
+            rgba = draw_frame(redraw)
+
+            if extension == '.png':
+                frame_filename = _get_frame_pattern(fullpath_filename) % index
+                Image.fromarray(rgba, 'RGBA').save(frame_filename)
+
+            else:
+                if process is None:
+                    height, width = rgba.shape[:2]
+                    process = _open_ffmpeg_pipe(fullpath_filename, width,
+                                                height, fps, ffmpeg_args)
+
+                try:
+                    process.stdin.write(rgba.tobytes())
+                except BrokenPipeError:
+                    # The error of ffmpeg is raised when it is closed
+                    _close_ffmpeg_pipe(process)
+                    raise
+
+        state['index'] += 1
+
+        return index
+
+    try:
+        yield write_frame
+
+        if process is not None:
+            _close_ffmpeg_pipe(process)
+            process = None
+
+    finally:
+        if process is not None:
+            process.kill()
+            process.wait()
+
+        for artist, animated in zip(artists, original_animated):
+            artist.set_animated(animated)
+
+        fig.set_dpi(original_dpi)
+        fig.set_canvas(original_canvas)
+
+    if verbose:
+        if extension == '.png':
+            output = _get_frame_pattern(fullpath_filename)
+        else:
+            output = fullpath_filename
+        print('%d frames saved to "%s".' % (state['index'], output))
@@ -0,0 +1,693 @@
+# SPDX-FileCopyrightText: Copyright 2021, Siavash Ameli <sameli@berkeley.edu>
+# SPDX-License-Identifier: BSD-3-Clause
+# SPDX-FileType: SOURCE
+#
+# This program is free software: you can redistribute it and/or modify it
+# under the terms of the license found in the LICENSE.txt file in the root
+# directory of this source tree.
+
+
+# =======
+# Imports
+# =======
+
+import os
+import time
+import shutil
+import inspect
+import threading
+import matplotlib
+from concurrent.futures import ThreadPoolExecutor
+from .plot_utilities import theme
+from .profile_utilities import _record
+
+__all__ = ['set_tex_cache', 'get_tex_cache_info', 'reset_tex_cache',
+           'warm_tex_cache']
+
+# rcParams of the font sizes of the titles, labels, tick labels and legends
+_FONT_SIZE_KEYS = ['font.size', 'axes.titlesize', 'axes.labelsize',
+                   'xtick.labelsize', 'ytick.labelsize', 'legend.fontsize',
+                   'figure.titlesize']
+
+# Files modified within this many seconds are not evicted, since another
+# process may be about to read them.
+_EVICTION_GRACE = 60.0
+
+# Number of misses after which the size of the cache is recomputed, since
+# other processes may write to the same cache.
+_EVICTION_INTERVAL = 64
+
+# Process-wide state of the TeX cache, guarded by a lock. The size is the
+# size of the cache at its last scan plus the size of the files rendered
+# since, or None if it is not scanned yet.
+_tex_cache = {
+    'directory': None,
+    'max_size': None,
+    'installed': False,
+    'size': None,
+    'scan_misses': 0,
+}
+_tex_cache_stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+_tex_cache_lock = threading.Lock()
+
+# The make_png method of the TeX manager calls make_dvi, which is counted
+# only by the outermost call of each thread.
+_local = threading.local()
+
+
+# ===============
+# get tex manager
+# ===============
+
+def _get_tex_manager():
+    """
+    Returns the TeX manager class of matplotlib.
+    """
+
+    # Imported here, since it is only needed when text is rendered with LaTeX
+    from matplotlib.texmanager import TexManager
+    return TexManager
+
+
+# =================
+# get tex cache dir
+# =================
+
+def _get_tex_cache_dir():
+    """
+    Returns the directory where matplotlib caches the rendered TeX strings.
+    """
+
+    tex_manager = _get_tex_manager()
+
+    if hasattr(tex_manager, '_cache_dir'):
+        return str(tex_manager._cache_dir)
+    else:
+        # matplotlib earlier than 3.9
+        return str(tex_manager._texcache)
+
+
+# =================
+# set tex cache dir
+# =================
+
+def _set_tex_cache_dir(directory):
+    """
+    Points the TeX manager of matplotlib to a cache directory.
+    """
+
+    import pathlib
+
+    tex_manager = _get_tex_manager()
+    os.makedirs(directory, exist_ok=True)
+
+    if hasattr(tex_manager, '_cache_dir'):
+        tex_manager._cache_dir = pathlib.Path(directory)
+    else:
+        # matplotlib earlier than 3.9
+        tex_manager._texcache = directory
+
+
+# ===========
+# wrap method
+# ===========
+
+def _wrap_method(tex_manager, name, suffix):
+    """
+    Replaces a ``make_*`` class method of the TeX manager with one that
+    counts the cache hits and misses, and evicts old files after a miss.
+    """
+
+    original = getattr(tex_manager, name).__func__
+
+    # The arguments are bound by name, since they can be passed either by
+    # position or by keyword, and dpi can be omitted
+    signature = inspect.signature(original)
+
+    def method(cls, *args, **kwargs):
+        if getattr(_local, 'depth', 0) > 0:
+            return original(cls, *args, **kwargs)
+
+        try:
+            arguments = signature.bind(cls, *args, **kwargs)
+        except TypeError:
+            # The original method raises the error of the invalid arguments
+            return original(cls, *args, **kwargs)
+
+        arguments.apply_defaults()
+        tex = arguments.arguments['tex']
+        fontsize = arguments.arguments['fontsize']
+        dpi = arguments.arguments.get('dpi', None)
+        path = cls.get_basefile(tex, fontsize, dpi) + suffix
+
+        hit = os.path.exists(path)
+        if hit:
+            # Mark the file as recently used for the eviction
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+        _local.depth = 1
+        try:
+            with _record('tex.' + name, 'tex', tex=tex, fontsize=fontsize,
+                         cached=hit):
+                result = original(cls, *args, **kwargs)
+        finally:
+            _local.depth = 0
+
+        with _tex_cache_lock:
+            _tex_cache_stats['hits' if hit else 'misses'] += 1
+            max_size = _tex_cache['max_size']
+
+        if (not hit) and (max_size is not None) and _should_evict(path):
+            _evict(_get_tex_cache_dir(), max_size)
+
+        return result
+
+    method.__doc__ = original.__doc__
+    method.__wrapped__ = original
+    setattr(tex_manager, name, classmethod(method))
+
+
+# ============
+# should evict
+# ============
+
+def _should_evict(path):
+    """
+    Adds the size of a rendered file to the size of the cache, and returns
+    `True` if the cache should be scanned for eviction. The cache is scanned
+    when its size first exceeds its maximum size, and after every
+    ``_EVICTION_INTERVAL`` misses, rather than after each miss.
+    """
+
+    try:
+        file_size = os.path.getsize(path)
+    except OSError:
+        file_size = 0
+
+    with _tex_cache_lock:
+        _tex_cache['scan_misses'] += 1
+
+        size = _tex_cache['size']
+        if size is None:
+            return True
+
+        _tex_cache['size'] = size + file_size
+        max_size = _tex_cache['max_size']
+
+        return (size <= max_size < _tex_cache['size']) or \
+            (_tex_cache['scan_misses'] >= _EVICTION_INTERVAL)
+
+
+# =======
+# install
+# =======
+
+def _install():
+    """
+    Installs the counting methods on the TeX manager once per process.
+    """
+
+    with _tex_cache_lock:
+        if _tex_cache['installed']:
+            return
+        _tex_cache['installed'] = True
+
+    tex_manager = _get_tex_manager()
+    _wrap_method(tex_manager, 'make_dvi', '.dvi')
+    _wrap_method(tex_manager, 'make_png', '.png')
+
+
+# ==========
+# list files
+# ==========
+
+def _list_files(directory):
+    """
+    Returns a list of ``(mtime, size, path)`` for the files of the cache.
+    The temporary directories of the renders in progress are skipped.
+    """
+
+    files = []
+
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = [name for name in dirs if not name.startswith('tmp')]
+
+        for name in names:
+            path = os.path.join(root, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Removed by another process
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+    return files
+
+
+# ================
+# set scanned size
+# ================
+
+def _set_scanned_size(size):
+    """
+    Sets the size of the cache after it is scanned.
+    """
+
+    with _tex_cache_lock:
+        _tex_cache['size'] = size
+        _tex_cache['scan_misses'] = 0
+
+
+# =====
+# evict
+# =====
+
+def _evict(directory, max_size):
+    """
+    Removes the least recently used files of the cache until its total size
+    is at most ``max_size`` bytes, and returns the number of removed files.
+    """
+
+    files = _list_files(directory)
+    size = sum(file[1] for file in files)
+    if size <= max_size:
+        _set_scanned_size(size)
+        return 0
+
+    now = time.time()
+    num_evicted = 0
+
+    for mtime, file_size, path in sorted(files):
+        if size <= max_size:
+            break
+        if now - mtime < _EVICTION_GRACE:
+            break
+
+        try:
+            os.remove(path)
+        except OSError:
+            # Removed by another process
+            pass
+
+        size -= file_size
+        num_evicted += 1
+
+    _set_scanned_size(size)
+
+    with _tex_cache_lock:
+        _tex_cache_stats['evicted'] += num_evicted
+
+    return num_evicted
+
+
+# =============
+# set tex cache
+# =============
+
+def set_tex_cache(directory=None, max_size=None):
+    """
+    Sets the on-disk cache of the text rendered with LaTeX.
+
+    Parameters
+    ----------
+
+    directory : str, default=None
+        Directory of the cache. The directory is created if it does not exist
+        and can be shared by several processes, such as the workers of
+        :func:`texplot.batch` or separate runs of a script. If `None`, the
+        default cache directory of matplotlib is used.
+
+    max_size : int, default=None
+        Maximum total size of the cache in bytes. When the cache grows beyond
+        this size, the least recently used files are removed. If `None`, the
+        size of the cache is not bounded. The files that other processes
+        write to a shared cache are only noticed every 64 renders, so the
+        cache can briefly exceed this size.
+
+    See Also
+    --------
+
+    texplot.get_tex_cache_info
+    texplot.reset_tex_cache
+
+    Notes
+    -----
+
+    Matplotlib renders each string to a file named by a hash of the complete
+    TeX source, which includes the preamble (``text.latex.preamble``), the
+    font and font size, and the string. Since the name depends only on the
+    content, a cached file is valid for any process that uses the same
+    directory. The files are written to a temporary directory and then moved
+    into place, so concurrent processes never read a partial file.
+
+    This function also counts the cache hits and misses of the current
+    process, which are reported by :func:`texplot.get_tex_cache_info`. The
+    workers of :func:`texplot.batch` use the same cache as the parent
+    process.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import texplot
+        >>> texplot.set_tex_cache('~/.cache/texplot', max_size=2**28)
+    """
+
+    if (max_size is not None) and \
+            ((not isinstance(max_size, int)) or (max_size < 0)):
+        raise ValueError('"max_size" should be None or a non-negative ' +
+                         'integer.')
+
+    _install()
+
+    if directory is None:
+        directory = os.path.join(matplotlib.get_cachedir(), 'tex.cache')
+    else:
+        directory = os.path.abspath(os.path.expanduser(directory))
+
+    _set_tex_cache_dir(directory)
+
+    with _tex_cache_lock:
+        _tex_cache['directory'] = directory
+        _tex_cache['max_size'] = max_size
+        _tex_cache['size'] = None
+
+    if max_size is not None:
+        _evict(directory, max_size)
+
+
+# ==================
+# get tex cache info
+# ==================
+
+def get_tex_cache_info():
+    """
+    Returns the statistics of the on-disk cache of the text rendered with
+    LaTeX.
+
+    Returns
+    -------
+
+    info : dict
+        A dictionary with the following keys:
+
+        * ``directory``: the cache directory.
+        * ``hits``: the number of strings of the current process that were
+          found in the cache.
+        * ``misses``: the number of strings of the current process that were
+          rendered with LaTeX.
+        * ``evicted``: the number of files that the current process removed
+          from the cache.
+        * ``files``: the number of files in the cache.
+        * ``size``: the total size of the cache in bytes.
+        * ``max_size``: the maximum size of the cache in bytes, or `None`.
+
+    See Also
+    --------
+
+    texplot.set_tex_cache
+    texplot.reset_tex_cache
+
+    Notes
+    -----
+
+    The hits and misses are only counted after :func:`texplot.set_tex_cache`
+    is called.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import texplot
+        >>> texplot.set_tex_cache()
+        >>> texplot.get_tex_cache_info()
+        {'directory': '/home/user/.cache/matplotlib/tex.cache', 'hits': 0,
+         'misses': 0, 'evicted': 0, 'files': 12, 'size': 30512,
+         'max_size': None}
+    """
+
+    directory = _get_tex_cache_dir()
+    files = _list_files(directory)
+
+    with _tex_cache_lock:
+        info = {'directory': directory}
+        info.update(_tex_cache_stats)
+        info['files'] = len(files)
+        info['size'] = sum(file[1] for file in files)
+        info['max_size'] = _tex_cache['max_size']
+
+    return info
+
+
+# ===============
+# reset tex cache
+# ===============
+
+def reset_tex_cache(clear=False):
+    """
+    Resets the statistics of the on-disk cache of the text rendered with
+    LaTeX.
+
+    Parameters
+    ----------
+
+    clear : bool, default=False
+        If `True`, the files of the cache are also removed. Other processes
+        that use the same directory render their strings again.
+
+    See Also
+    --------
+
+    texplot.set_tex_cache
+    texplot.get_tex_cache_info
+    """
+
+    with _tex_cache_lock:
+        for key in _tex_cache_stats:
+            _tex_cache_stats[key] = 0
+
+    if clear:
+        directory = _get_tex_cache_dir()
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+        _set_scanned_size(0)
+
+        # Strings that are already rasterized in memory
+        grey_arrays = getattr(_get_tex_manager(), '_grey_arrayd', None)
+        if grey_arrays is not None:
+            grey_arrays.clear()
+
+
+# ====================
+# get tex cache config
+# ====================
+
+def _get_tex_cache_config():
+    """
+    Returns the arguments of :func:`set_tex_cache` of the current process, or
+    `None` if it is not called, so that worker processes use the same cache.
+    """
+
+    with _tex_cache_lock:
+        if _tex_cache['directory'] is None:
+            return None
+        return {
+            'directory': _tex_cache['directory'],
+            'max_size': _tex_cache['max_size'],
+        }
+
+
+# ==============
+# get font sizes
+# ==============
+
+def _get_font_sizes():
+    """
+    Returns the sorted font sizes in points of the titles, labels, tick labels
+    and legends of the current rcParams.
+    """
+
+    from matplotlib.font_manager import FontProperties
+
+    font_sizes = set()
+    for key in _FONT_SIZE_KEYS:
+        size = FontProperties(size=matplotlib.rcParams[key])
+        font_sizes.add(float(size.get_size_in_points()))
+
+    return sorted(font_sizes)
+
+
+# ==========
+# render tex
+# ==========
+
+def _render_tex(tex, fontsize, dpi):
+    """
+    Renders a string with LaTeX into the cache. Returns a tuple of whether
+    the string was already cached, and the error message if it fails.
+    """
+
+    tex_manager = _get_tex_manager()
+
+    basefile = tex_manager.get_basefile(tex, fontsize)
+    cached = os.path.exists(basefile + '.dvi')
+    if dpi is not None:
+        basefile = tex_manager.get_basefile(tex, fontsize, dpi)
+        cached = cached and os.path.exists(basefile + '.png')
+
+    try:
+        if dpi is None:
+            tex_manager.make_dvi(tex, fontsize)
+        else:
+            tex_manager.make_png(tex, fontsize, dpi)
+    except RuntimeError as error:
+        return cached, str(error)
+
+    return cached, None
+
+
+# ==============
+# warm tex cache
+# ==============
+
+def warm_tex_cache(
+        strings,
+        context="notebook",
+        font_scale=1,
+        style=None,
+        use_latex=None,
+        rc=None,
+        fontsizes=None,
+        dpi=None,
+        workers=None):
+    """
+    Renders strings with LaTeX into the cache before plotting.
+
+    Parameters
+    ----------
+
+    strings : iterable of str
+        The strings that the figures use, such as titles, axis labels and
+        tick labels. Duplicates are rendered once.
+
+    context : {'paper', 'notebook', 'talk', 'poster'}, default='notebook'
+        Theme context. See :func:`texplot.set_theme`.
+
+    font_scale : float, default=1
+        Font scale of the theme. See :func:`texplot.set_theme`.
+
+    style : str, default=None
+        Matplotlib style of the theme. See :func:`texplot.set_theme`.
+
+    use_latex : bool, default=None
+        Whether to render text with LaTeX. See :func:`texplot.set_theme`.
+
+    rc : dict, default=None
+        Extra rcParams of the theme. See :func:`texplot.set_theme`.
+
+    fontsizes : list of float, default=None
+        Font sizes in points to render each string at. If `None`, the font
+        sizes of the titles, axis labels, tick labels and legends of the
+        theme are used.
+
+    dpi : float, default=None
+        If given, the strings are also rasterized at this dots per inch,
+        which is used by the raster formats such as ``png``. The vector
+        formats only need the LaTeX output, which is always rendered.
+
+    workers : int, default=None
+        Number of LaTeX subprocesses that run at the same time. If `None`,
+        the number of CPUs is used.
+
+    Returns
+    -------
+
+    report : dict
+        A dictionary with the following keys:
+
+        * ``renders``: the number of pairs of string and font size.
+        * ``cached``: the number of them that were already in the cache.
+        * ``compiled``: the number of them that were rendered with LaTeX.
+        * ``failed``: a list of the strings that LaTeX could not render.
+        * ``time``: the wall time in seconds.
+
+    See Also
+    --------
+
+    texplot.set_tex_cache
+    texplot.batch
+
+    Notes
+    -----
+
+    The rendered output depends on the font, the font size and the LaTeX
+    preamble, so the strings are rendered within the same theme as the
+    figures (see :func:`texplot.theme`). The string should be the same as
+    the text of the figure, for instance, the tick labels of a scalar axis
+    are written as ``$\\mathdefault{0.5}$``. If the theme does not render
+    text with LaTeX, nothing is rendered.
+
+    Example
+    -------
+
+    .. code-block:: python
+
+        >>> import texplot
+        >>> texplot.set_tex_cache('~/.cache/texplot')
+        >>> labels = [r'Time $t$', r'Energy $E(t)$', r'$\\sin(x)$']
+        >>> report = texplot.warm_tex_cache(labels, font_scale=1.2)
+    """
+
+    strings = list(dict.fromkeys(strings))
+
+    report = {
+        'renders': 0,
+        'cached': 0,
+        'compiled': 0,
+        'failed': [],
+        'time': 0.0,
+    }
+
+    t0 = time.perf_counter()
+
+    with theme(context=context, font_scale=font_scale, style=style,
+               use_latex=use_latex, rc=rc):
+
+        if not matplotlib.rcParams['text.usetex']:
+            return report
+
+        if fontsizes is None:
+            fontsizes = _get_font_sizes()
+
+        jobs = [(tex, float(fontsize)) for tex in strings
+                for fontsize in fontsizes]
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(int(workers), len(jobs)))
+
+        # The rendering runs in subprocesses, so threads run in parallel.
+        # The threads are joined within the theme, since the LaTeX source
+        # depends on the rcParams.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda job: _render_tex(job[0], job[1], dpi), jobs))
+
+    for (tex, _), (cached, error) in zip(jobs, results):
+        report['renders'] += 1
+        if error is not None:
+            if tex not in report['failed']:
+                report['failed'].append(tex)
+        elif cached:
+            report['cached'] += 1
+        else:
+            report['compiled'] += 1
+
+    report['time'] = time.perf_counter() - t0
+
+    return report